@@ -167,6 +167,10 @@ class Application(object):
                 self._name, message, level, timestamp, attributes=attributes, priority=priority
             )
 
+    def defer_log_event(self, message, level=None, timestamp=None, attributes=None, priority=None):
+        if self.active:
+            self._agent.defer_log_event(self._name, message, level, timestamp, attributes=attributes, priority=priority)
+
     def normalize_name(self, name, rule_type="url"):
         if self.active:
             return self._agent.normalize_name(self._name, name, rule_type)
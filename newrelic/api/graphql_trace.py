@@ -13,12 +13,29 @@
 # limitations under the License.
 
 import functools
+import random
+from operator import attrgetter
 
 from newrelic.api.time_trace import TimeTrace, current_trace
 from newrelic.api.transaction import current_transaction
 from newrelic.common.async_wrapper import async_wrapper as get_async_wrapper
 from newrelic.common.object_wrapper import FunctionWrapper, wrap_object
-from newrelic.core.graphql_node import GraphQLOperationNode, GraphQLResolverNode
+from newrelic.core.graphql_node import (
+    GraphQLOperationNode,
+    GraphQLResolverNode,
+    GraphQLResolverRollupNode,
+)
+
+
+class _ResolverRollup(object):
+    __slots__ = ("field_return_type", "field_path", "start_time", "end_time", "durations")
+
+    def __init__(self, field_return_type, field_path, start_time):
+        self.field_return_type = field_return_type
+        self.field_path = field_path
+        self.start_time = start_time
+        self.end_time = start_time
+        self.durations = []
 
 
 class GraphQLOperationTrace(TimeTrace):
@@ -37,6 +54,7 @@ class GraphQLOperationTrace(TimeTrace):
         self.graphql_format = None
         self.statement = None
         self.product = "GraphQL"
+        self.resolver_rollups = {}
 
     def __repr__(self):
         return "<%s object at 0x%x %s>" % (
@@ -79,6 +97,17 @@ class GraphQLOperationTrace(TimeTrace):
         self.graphql = graphql = self.formatted[:limit]
         self._add_agent_attribute("graphql.operation.query", graphql)
 
+        # Turn resolutions folded into this trace into one child node
+        # for each field, keeping the children in order of start time.
+        if self.resolver_rollups:
+            for (field_parent_type, field_name), rollup in self.resolver_rollups.items():
+                node = self._create_rollup_node(field_name, field_parent_type, rollup)
+                transaction._process_node(node)
+                self.children.append(node)
+
+            self.children.sort(key=attrgetter("start_time"))
+            self.resolver_rollups = {}
+
         return super(GraphQLOperationTrace, self).finalize_data(transaction, exc=None, value=None, tb=None)
 
     def create_node(self):
@@ -98,6 +127,51 @@ class GraphQLOperationTrace(TimeTrace):
             product=self.product,
         )
 
+    def rollup_resolver(self, field_name, field_parent_type, field_return_type, field_path, start_time, duration):
+        """Record a resolution of a field, completed synchronously while
+        this trace was current, without creating a trace for it.
+        Resolutions of the same field are reported as a single node.
+
+        """
+        key = (field_parent_type, field_name)
+        rollup = self.resolver_rollups.get(key)
+        if rollup is None:
+            rollup = self.resolver_rollups[key] = _ResolverRollup(field_return_type, field_path, start_time)
+
+        rollup.durations.append(duration)
+        rollup.end_time = max(rollup.end_time, start_time + duration)
+
+        # As for a child trace, the time taken is not exclusive to this
+        # trace.
+        self.exclusive -= duration
+
+    def _create_rollup_node(self, field_name, field_parent_type, rollup):
+        durations = rollup.durations
+        total = sum(durations)
+
+        agent_attributes = {
+            "graphql.field.name": field_name,
+            "graphql.field.parentType": field_parent_type,
+            "graphql.field.returnType": rollup.field_return_type,
+            "graphql.field.path": rollup.field_path,
+            "graphql.field.callCount": len(durations),
+            "graphql.field.maxDuration": max(durations),
+        }
+
+        return GraphQLResolverRollupNode(
+            field_name=field_name,
+            children=[],
+            start_time=rollup.start_time,
+            end_time=rollup.end_time,
+            duration=total,
+            exclusive=total,
+            guid="%016x" % random.getrandbits(64),
+            agent_attributes=agent_attributes,
+            user_attributes={},
+            product=self.product,
+            durations=durations,
+        )
+
     def set_transaction_name(self, priority=None):
         transaction = current_transaction()
         if transaction:
@@ -14,18 +14,39 @@
 
 import logging
 import sys
+import threading
 
 from newrelic.packages import six
 
 _logger = logging.getLogger(__name__)
 
 try:
-    from importlib.util import find_spec
+    from importlib.util import find_spec, spec_from_loader
 except ImportError:
     find_spec = None
+    spec_from_loader = None
 
 _import_hooks = {}
 
+# Names of modules with import hooks registered which haven't been called
+# yet. Used to notice when such a module has been loaded without passing
+# through the import hook finder, for example by another finder placed
+# ahead of it in sys.meta_path.
+
+_pending_import_hooks = set()
+
+# Lock held while checking for and taking the import hooks pending for a
+# module. Modules loaded through other means are noticed when any thread
+# looks for a module, outside of the import lock for the module, so this
+# makes sure only one thread calls the import hooks for a module.
+
+_import_hooks_lock = threading.Lock()
+
+# Tables of import hooks not yet registered, each paired with the function
+# to call to register those for a module when it is first looked for.
+
+_lazy_import_hooks = []
+
 _ok_modules = (
     # These modules are imported by the newrelic package and/or do not do
     # nested imports, so they're ok to import before newrelic.
@@ -116,6 +137,7 @@ def register_import_hook(name, callable):  # pylint: disable=redefined-builtin
                 # and add current hook.
 
                 _import_hooks[name] = [callable]
+                _pending_import_hooks.add(name)
 
         else:
 
@@ -129,19 +151,81 @@ def register_import_hook(name, callable):  # pylint: disable=redefined-builtin
             imp.release_lock()
 
 
+def register_lazy_import_hooks(hooks, register):
+    """Defers registering import hooks until the modules they are for are
+    imported. The hooks are given as a mapping from the name of a module
+    to a tuple of further arguments, and when the module is first looked
+    for register is called with the name and those arguments.
+
+    """
+
+    _lazy_import_hooks.append((dict(hooks), register))
+
+
+def _register_lazy_import_hooks(name):
+    for hooks, register in _lazy_import_hooks:
+        args = hooks.pop(name, None)
+        if args is not None:
+            register(name, *args)
+
+
+def _register_loaded_lazy_import_hooks():
+
+    # Registers the import hooks deferred for any modules which have been
+    # added to sys.modules without the import hook finder being asked for
+    # them. As the modules are loaded the import hooks fire immediately.
+
+    for hooks, register in _lazy_import_hooks:
+        for name in six.viewkeys(hooks) & six.viewkeys(sys.modules):
+            if _module_loaded(sys.modules.get(name, None)):
+                _register_lazy_import_hooks(name)
+
+
+def _module_loaded(module):
+
+    # Whether a module found in sys.modules has finished being executed.
+    # Modules still being executed are left for the loader, or a later
+    # check, to handle. Only the import system of Python 3 marks when a
+    # module has finished, so a module without a spec, or loaded by a
+    # loader only providing load_module(), is also left to the loader.
+
+    spec = getattr(module, "__spec__", None)
+
+    return getattr(spec, "_initializing", None) is False
+
+
 def _notify_import_hooks(name, module):
 
-    # Is assumed that this function is called with the global
-    # import lock held. This should be the case as should only
-    # be called from load_module() of the import hook loader.
+    # Can be called from any thread looking for a module, as well as from
+    # the import hook loader, so the import hooks are taken from the
+    # registry under the lock and then called once it is released.
 
-    hooks = _import_hooks.get(name, None)
+    with _import_hooks_lock:
+        hooks = _import_hooks.get(name, None)
+
+        if hooks is None:
+            return
 
-    if hooks is not None:
         _import_hooks[name] = None
+        _pending_import_hooks.discard(name)
+
+    for hook in hooks:
+        hook(module)
+
+
+def _notify_loaded_import_hooks():
 
-        for hook in hooks:
-            hook(module)
+    # Calls the import hooks for any modules which have been added to
+    # sys.modules without our loader being used.
+
+    with _import_hooks_lock:
+        pending = list(_pending_import_hooks)
+
+    for name in pending:
+        module = sys.modules.get(name, None)
+
+        if _module_loaded(module):
+            _notify_import_hooks(name, module)
 
 
 class _ImportHookLoader:
@@ -180,6 +264,70 @@ class _ImportHookChainedLoader:
 class ImportHookFinder:
     def __init__(self):
         self._skip = {}
+        self._modules_count = 0
+
+    def _check_loaded_modules(self):
+
+        # Watch for modules with pending or deferred import hooks which
+        # have been loaded through some other means. This is only done
+        # when the set of loaded modules has changed since the last check.
+
+        if (_pending_import_hooks or _lazy_import_hooks) and len(sys.modules) != self._modules_count:
+            self._modules_count = len(sys.modules)
+
+            if _lazy_import_hooks:
+                _register_loaded_lazy_import_hooks()
+
+            if _pending_import_hooks:
+                _notify_loaded_import_hooks()
+
+    def _find_spec(self, fullname, path, target=None):
+
+        # Ask the finders which follow this one in sys.meta_path for the
+        # spec directly, rather than calling back into the import system
+        # which would go through all the finders a second time.
+
+        if path is None and "." in fullname:
+            parent = sys.modules.get(fullname.rpartition(".")[0], None)
+            path = getattr(parent, "__path__", None)
+
+            if path is None:
+                # Only when called directly for a submodule of a package
+                # which hasn't been imported, so leave it to importlib.
+
+                return find_spec(fullname)
+
+        meta_path = sys.meta_path
+
+        try:
+            index = meta_path.index(self) + 1
+        except ValueError:
+            index = 0
+
+        for finder in meta_path[index:]:
+            if isinstance(finder, ImportHookFinder):
+                continue
+
+            _find_spec = getattr(finder, "find_spec", None)
+
+            if _find_spec is not None:
+                spec = _find_spec(fullname, path, target)
+
+            else:
+                # Legacy finders only providing find_module().
+
+                _find_module = getattr(finder, "find_module", None)
+
+                if _find_module is None:
+                    continue
+
+                loader = _find_module(fullname, path)
+                spec = loader and spec_from_loader(fullname, loader)
+
+            if spec is not None:
+                return spec
+
+        return None
 
     def find_module(self, fullname, path=None):
         """
@@ -190,6 +338,13 @@ class ImportHookFinder:
         https://docs.python.org/3/library/importlib.html#importlib.abc.MetaPathFinder.find_module
         """
 
+        self._check_loaded_modules()
+
+        # Register any import hooks deferred until the module was used.
+
+        if _lazy_import_hooks:
+            _register_lazy_import_hooks(fullname)
+
         # If not something we are interested in we can return.
 
         if fullname not in _import_hooks:
@@ -201,19 +356,19 @@ class ImportHookFinder:
         if fullname in self._skip:
             return None
 
-        # We are now going to call back into import. We set a
-        # flag to see we are handling the module so that check
-        # above drops out on subsequent pass and we don't go
-        # into an infinite loop.
+        # We may be going to call back into import. We set a flag
+        # to see we are handling the module so that check above
+        # drops out on subsequent pass and we don't go into an
+        # infinite loop.
 
         self._skip[fullname] = True
 
         try:
-            # For Python 3 we need to use find_spec() from the importlib
-            # module.
+            # For Python 3 we find the spec using the remaining finders
+            # in sys.meta_path.
 
             if find_spec:
-                spec = find_spec(fullname)
+                spec = self._find_spec(fullname, path)
                 loader = getattr(spec, "loader", None)
 
                 if loader and not isinstance(loader, (_ImportHookChainedLoader, _ImportHookLoader)):
@@ -241,40 +396,38 @@ class ImportHookFinder:
         https://docs.python.org/3/library/importlib.html#importlib.abc.MetaPathFinder.find_spec
         """
 
+        self._check_loaded_modules()
+
+        # Register any import hooks deferred until the module was used.
+
+        if _lazy_import_hooks:
+            _register_lazy_import_hooks(fullname)
+
         # If not something we are interested in we can return.
 
         if fullname not in _import_hooks:
             return None
 
         # Check whether this is being called on the second time
-        # through and return.
+        # through and return. This can only happen if a finder
+        # following this one calls back into import.
 
         if fullname in self._skip:
             return None
 
-        # We are now going to call back into import. We set a
-        # flag to see we are handling the module so that check
-        # above drops out on subsequent pass and we don't go
-        # into an infinite loop.
-
         self._skip[fullname] = True
 
         try:
-            # For Python 3 we need to use find_spec() from the importlib
-            # module.
-
-            if find_spec:
-                spec = find_spec(fullname)
-                loader = getattr(spec, "loader", None)
+            # Find the spec using the remaining finders in sys.meta_path
+            # and chain our loader onto the loader it gives.
 
-                if loader and not isinstance(loader, (_ImportHookChainedLoader, _ImportHookLoader)):
-                    spec.loader = _ImportHookChainedLoader(loader)
+            spec = self._find_spec(fullname, path, target)
+            loader = getattr(spec, "loader", None)
 
-                return spec
+            if loader and not isinstance(loader, (_ImportHookChainedLoader, _ImportHookLoader)):
+                spec.loader = _ImportHookChainedLoader(loader)
 
-            else:
-                # Not possible, Python 3 defines find_spec and Python 2 does not have find_spec on Finders
-                return None
+            return spec
 
         finally:
             del self._skip[fullname]
@@ -21,6 +21,7 @@ from newrelic.api.function_trace import FunctionTrace
 from newrelic.api.time_trace import current_trace
 from newrelic.common.object_names import callable_name
 from newrelic.common.object_wrapper import FunctionWrapper, wrap_object
+from newrelic.core.trace_cache import trace_cache
 from newrelic.packages import six
 
 AGENT_PACKAGE_DIRECTORY = os.path.dirname(AGENT_PACKAGE_FILE) + "/"
@@ -45,7 +46,7 @@ class ProfileTrace(object):
         # coroutine systems based on greenlets so don't run
         # if we detect may be using greenlets.
 
-        if hasattr(sys, "_current_frames") and parent.thread_id not in sys._current_frames():
+        if trace_cache().in_coroutine(parent.thread_id):
             return
 
         co = frame.f_code
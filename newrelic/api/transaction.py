@@ -18,7 +18,6 @@ import logging
 import os
 import random
 import re
-import sys
 import threading
 import time
 import warnings
@@ -32,6 +31,7 @@ import newrelic.core.transaction_node
 from newrelic.api.application import application_instance
 from newrelic.api.time_trace import TimeTrace, get_linking_metadata
 from newrelic.common.encoding_utils import (
+    DistributedTraceHeaderTemplate,
     DistributedTracePayload,
     NrTraceState,
     W3CTraceParent,
@@ -294,6 +294,7 @@ class Transaction(object):
         self._sampled = None
 
         self._distributed_trace_state = 0
+        self._distributed_trace_header_template = None
 
         self.client_cross_process_id = None
         self.client_account_id = None
@@ -346,9 +347,13 @@ class Transaction(object):
             self._log_events = SampledDataSet(
                 capacity=self._settings.event_harvest_config.harvest_limits.log_event_data
             )
+            self._deferred_log_events = SampledDataSet(
+                capacity=self._settings.event_harvest_config.harvest_limits.log_event_data
+            )
         else:
             self._custom_events = SampledDataSet(capacity=CUSTOM_EVENT_RESERVOIR_SIZE)
             self._log_events = SampledDataSet(capacity=LOG_EVENT_RESERVOIR_SIZE)
+            self._deferred_log_events = SampledDataSet(capacity=LOG_EVENT_RESERVOIR_SIZE)
             self._ml_events = SampledDataSet(capacity=ML_EVENT_RESERVOIR_SIZE)
 
     def __del__(self):
@@ -395,7 +400,7 @@ class Transaction(object):
         # For now we only do this if we know it is an
         # actual thread and not a greenlet.
 
-        if not hasattr(sys, "_current_frames") or self.thread_id in sys._current_frames():
+        if not trace_cache().in_coroutine(self.thread_id):
             thread_instance = threading.current_thread()
 
             self._utilization_tracker = utilization_tracker(self.application.name)
@@ -598,6 +603,7 @@ class Transaction(object):
             custom_events=self._custom_events,
             ml_events=self._ml_events,
             log_events=self._log_events,
+            deferred_log_events=self._deferred_log_events,
             apdex_t=self.apdex,
             suppress_apdex=self.suppress_apdex,
             custom_metrics=self._custom_metrics,
@@ -1135,23 +1141,30 @@ class Transaction(object):
         try:
             data = data or self._create_distributed_trace_data()
             if data:
-                traceparent = W3CTraceParent(data).text()
-                yield ("traceparent", traceparent)
+                newrelic_header = not self._settings.distributed_tracing.exclude_newrelic_header
+
+                # The text of the headers is rendered from a template kept
+                # for the transaction, which only needs to be created again
+                # if anything other than the span ID and timestamp changes,
+                # such as the priority or whether the trace is sampled.
+
+                template = self._distributed_trace_header_template
+                key = DistributedTraceHeaderTemplate.template_key(data, self.tracestate, newrelic_header)
+
+                if template is None or template.key != key:
+                    template = DistributedTraceHeaderTemplate(data, self.tracestate, newrelic_header)
+                    self._distributed_trace_header_template = template
+
+                traceparent, tracestate, newrelic = template.render(data)
 
-                tracestate = NrTraceState(data).text()
-                if self.tracestate:
-                    tracestate += "," + self.tracestate
+                yield ("traceparent", traceparent)
                 yield ("tracestate", tracestate)
 
                 self._record_supportability("Supportability/TraceContext/Create/Success")
 
-                if not self._settings.distributed_tracing.exclude_newrelic_header:
+                if newrelic_header:
                     # Insert New Relic dt headers for backwards compatibility
-                    payload = DistributedTracePayload(
-                        v=DistributedTracePayload.version,
-                        d=data,
-                    )
-                    yield ("newrelic", payload.http_safe())
+                    yield ("newrelic", newrelic)
                     self._record_supportability("Supportability/DistributedTrace/CreatePayload/Success")
 
         except:
@@ -1331,13 +1344,12 @@ class Transaction(object):
             if tracestate:
                 tracestate = ensure_str(tracestate)
                 try:
-                    vendors = W3CTraceState.decode(tracestate)
                     trusted_account_key = self._settings.trusted_account_key or (
                         self._settings.serverless_mode.enabled and self._settings.account_id
                     )
-                    payload = vendors.pop(trusted_account_key + "@nr", "")
-                    self.tracing_vendors = ",".join(vendors.keys())
-                    self.tracestate = vendors.text(limit=31)
+                    payload, self.tracestate, self.tracing_vendors = W3CTraceState.extract(
+                        tracestate, trusted_account_key + "@nr"
+                    )
                 except:
                     self._record_supportability("Supportability/TraceContext/TraceState/Parse/Exception")
                 else:
@@ -1611,6 +1623,14 @@ class Transaction(object):
 
         self._log_events.add(event, priority=priority)
 
+    def _defer_log_event(self, message, level, created, attributes=None, trace=None):
+        """Keeps only what was logged, leaving the log event to be created
+        when the transaction is recorded. The trace is that current when
+        it was logged, for the span ID of the log event.
+
+        """
+        self._deferred_log_events.add((message, level, created, attributes, trace and trace.guid))
+
     # This function has been deprecated (and will be removed eventually)
     # and therefore does not need to be included in coverage analysis
     def record_exception(self, exc=None, value=None, tb=None, params=None, ignore_errors=None):  # pragma: no cover
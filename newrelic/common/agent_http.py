@@ -16,6 +16,7 @@ from __future__ import print_function
 
 import os
 import sys
+import threading
 import time
 import zlib
 from pprint import pprint
@@ -100,6 +101,7 @@ class BaseClient(object):
         max_payload_size_in_bytes=1000000,
         audit_log_fp=None,
         default_content_encoding_header="Identity",
+        max_connections=1,
     ):
         self._audit_log_fp = audit_log_fp
 
@@ -252,6 +254,7 @@ class HttpClient(BaseClient):
         max_payload_size_in_bytes=1000000,
         audit_log_fp=None,
         default_content_encoding_header="Identity",
+        max_connections=1,
     ):
         self._host = host
         port = self._port = port
@@ -267,6 +270,7 @@ class HttpClient(BaseClient):
         self._headers = dict(self.BASE_HEADERS)
         self._connection_kwargs = connection_kwargs = {
             "timeout": timeout,
+            "maxsize": max_connections,
         }
         self._urlopen_kwargs = urlopen_kwargs = {}
 
@@ -314,6 +318,7 @@ class HttpClient(BaseClient):
         self._proxy = proxy
 
         self._connection_attr = None
+        self._connection_lock = threading.Lock()
 
     @staticmethod
     def _parse_proxy(scheme, host, port, username, password):
@@ -356,11 +361,16 @@ class HttpClient(BaseClient):
         if self._connection_attr:
             return self._connection_attr
 
-        retries = urllib3.Retry(total=False, connect=None, read=None, redirect=0, status=None)
-        self._connection_attr = self.CONNECTION_CLS(
-            self._host, self._port, strict=True, retries=retries, **self._connection_kwargs
-        )
-        return self._connection_attr
+        # Requests may be made concurrently during a harvest, so ensure
+        # only one connection pool is created.
+
+        with self._connection_lock:
+            if not self._connection_attr:
+                retries = urllib3.Retry(total=False, connect=None, read=None, redirect=0, status=None)
+                self._connection_attr = self.CONNECTION_CLS(
+                    self._host, self._port, strict=True, retries=retries, **self._connection_kwargs
+                )
+            return self._connection_attr
 
     def close_connection(self):
         if self._connection_attr:
@@ -493,6 +503,7 @@ class InsecureHttpClient(HttpClient):
         max_payload_size_in_bytes=1000000,
         audit_log_fp=None,
         default_content_encoding_header="Identity",
+        max_connections=1,
     ):
         proxy = self._parse_proxy(proxy_scheme, proxy_host, None, None, None)
         if proxy and proxy.scheme == "https":
@@ -520,6 +531,7 @@ class InsecureHttpClient(HttpClient):
             max_payload_size_in_bytes,
             audit_log_fp,
             default_content_encoding_header,
+            max_connections,
         )
 
 
@@ -33,6 +33,9 @@ from newrelic.packages import six
 
 HEXDIGLC_RE = re.compile("^[0-9a-f]+$")
 DELIMITER_FORMAT_RE = re.compile("[ \t]*,[ \t]*")
+TRACEPARENT_RE = re.compile("([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}(-.*)?\\Z", re.DOTALL)
+TRACESTATE_RE = re.compile("[^,=\\s]{0,256}=[^,=\\s]{0,256}(?:,[^,=\\s]{0,256}=[^,=\\s]{0,256}){0,31}\\Z")
+TRACESTATE_VALUE_RE = re.compile("=[^,]*")
 PARENT_TYPE = {
     "0": "App",
     "1": "Browser",
@@ -49,7 +52,17 @@ BASE64_DECODE_STR = getattr(base64, "decodestring", None)
 # defaults.
 
 
-def json_encode(obj, **kwargs):
+def _json_encode_default(o):
+    if isinstance(o, bytes):
+        return o.decode("latin-1")
+    elif isinstance(o, types.GeneratorType):
+        return list(o)
+    elif hasattr(o, "__iter__"):
+        return list(iter(o))
+    raise TypeError(repr(o) + " is not JSON serializable")
+
+
+def _json_encode_kwargs(kwargs):
     _kwargs = {}
 
     # This wrapper function needs to deal with a few issues.
@@ -83,16 +96,7 @@ def json_encode(obj, **kwargs):
     if type(b"") is type(""):  # noqa, pylint: disable=C0123
         _kwargs["encoding"] = "latin-1"
 
-    def _encode(o):
-        if isinstance(o, bytes):
-            return o.decode("latin-1")
-        elif isinstance(o, types.GeneratorType):
-            return list(o)
-        elif hasattr(o, "__iter__"):
-            return list(iter(o))
-        raise TypeError(repr(o) + " is not JSON serializable")
-
-    _kwargs["default"] = _encode
+    _kwargs["default"] = _json_encode_default
 
     _kwargs["separators"] = (",", ":")
 
@@ -103,7 +107,21 @@ def json_encode(obj, **kwargs):
 
     _kwargs.update(kwargs)
 
-    return json.dumps(obj, **_kwargs)
+    return _kwargs
+
+
+def json_encode(obj, **kwargs):
+    return json.dumps(obj, **_json_encode_kwargs(kwargs))
+
+
+def json_encoder(**kwargs):
+    """Returns a JSON encoder with the same defaults as json_encode(),
+    for use where many separate values are to be encoded and the cost of
+    creating an encoder for each should be avoided.
+
+    """
+
+    return json.JSONEncoder(**_json_encode_kwargs(kwargs))
 
 
 def json_decode(s, **kwargs):
@@ -366,6 +384,43 @@ def ensure_str(s):
     return s
 
 
+def payload_size(value):
+    """Returns the size in bytes of a message payload. Bytes-like values
+    are measured through the buffer protocol without being copied, and
+    text containing only ASCII characters by its length. Anything else is
+    measured as the UTF-8 encoding of its string form.
+
+    """
+    if value is None:
+        return 0
+
+    try:
+        view = memoryview(value)
+    except TypeError:
+        pass
+    else:
+        try:
+            return view.nbytes
+        except AttributeError:
+            # Memory views on Python 2 have no nbytes.
+            return len(view) * view.itemsize
+
+    if not isinstance(value, six.string_types):
+        value = str(value)
+
+    if isinstance(value, six.binary_type):
+        return len(value)
+
+    try:
+        if value.isascii():
+            return len(value)
+    except AttributeError:
+        # Python < 3.7
+        pass
+
+    return len(value.encode("utf-8"))
+
+
 def serverless_payload_decode(text):
     """This method takes in a string or UTF-8 input. The input will be
     base64 decoded, gzip decompressed, and json decoded. Returns a
@@ -451,37 +506,19 @@ class W3CTraceParent(dict):
 
     @classmethod
     def decode(cls, payload):
-        # Only traceparent with at least 55 chars should be parsed
-        if len(payload) < 55:
-            return None
-
-        fields = payload.split("-", 4)
-
-        # Expect that there are at least 4 fields
-        if len(fields) < 4:
+        # Validate and extract the fields in one pass. A version other
+        # than 00 may be followed by further fields, which are ignored.
+        match = TRACEPARENT_RE.match(payload)
+        if not match:
             return None
 
-        version = fields[0]
+        version, trace_id, parent_id, extra = match.groups()
 
-        # version must be a valid 2-char hex digit
-        if len(version) != 2 or not HEXDIGLC_RE.match(version):
+        # Version 255 is invalid, and version 00 has exactly 4 fields
+        if version == "ff" or (version == "00" and extra is not None):
             return None
 
-        # Version 255 is invalid
-        if version == "ff":
-            return None
-
-        # Expect exactly 4 fields if version 00
-        if version == "00" and len(fields) != 4:
-            return None
-
-        # Check field lengths and values
-        for field, expected_length in zip(fields[1:4], (32, 16, 2)):
-            if len(field) != expected_length or not HEXDIGLC_RE.match(field):
-                return None
-
         # trace_id or parent_id of all 0's are invalid
-        trace_id, parent_id = fields[1:3]
         if parent_id == "0" * 16 or trace_id == "0" * 32:
             return None
 
@@ -507,6 +544,55 @@ class W3CTraceState(OrderedDict):
 
         return vendors
 
+    @classmethod
+    def extract(cls, tracestate, vendor):
+        """Returns the value of the entry for the vendor, the text of the
+        other entries to propagate and the comma separated keys of those
+        entries, the same as when decoding the tracestate, popping the
+        entry for the vendor and encoding what is left with a limit of
+        31 entries. The text of the other entries is sliced from the
+        tracestate as is when it is already in canonical form, falling
+        back to decoding it otherwise.
+
+        """
+
+        prefix = vendor + "="
+
+        if tracestate.startswith(prefix):
+            start = 0
+        else:
+            start = tracestate.find("," + prefix)
+            if start != -1:
+                start += 1
+
+        count = tracestate.count(",") + 1
+
+        if start == -1:
+            end = 0
+            value = ""
+            others = tracestate
+        else:
+            end = tracestate.find(",", start)
+            if end == -1:
+                end = len(tracestate)
+
+            value = tracestate[start + len(prefix) : end]
+            others = tracestate[: start - 1] + tracestate[end:] if start else tracestate[end + 1 :]
+            count -= 1
+
+        # Fall back to decoding the tracestate unless it is made up of no
+        # more than 31 other entries, with no whitespace, each of a key
+        # and a value of no more than 256 characters and none repeated.
+        if count <= 31 and TRACESTATE_RE.match(tracestate) and tracestate.find("," + prefix, end) == -1:
+            keys = TRACESTATE_VALUE_RE.sub("", others)
+            if count < 2 or len(set(keys.split(","))) == count:
+                return value, others, keys
+
+        vendors = cls.decode(tracestate)
+        value = vendors.pop(vendor, "")
+
+        return value, vendors.text(limit=31), ",".join(vendors.keys())
+
 
 class NrTraceState(dict):
     FIELDS = ("ty", "ac", "ap", "id", "tx", "sa", "pr")
@@ -570,6 +656,113 @@ class NrTraceState(dict):
             return data
 
 
+class DistributedTraceHeaderTemplate(object):
+    """Holds the text of the outbound distributed tracing headers for the
+    data for a transaction, rendered with placeholders in place of the
+    span ID and timestamp, the only fields which change between calls.
+    The part of the newrelic header before the first placeholder is kept
+    already base64 encoded, so only the remainder has to be encoded for
+    each call. Templates can be reused for as long as the key for the
+    data, the inbound tracestate and whether the newrelic header is to
+    be included stays the same.
+
+    """
+
+    VARIABLE_FIELDS = ("id", "ti")
+
+    # Placeholders which are substituted into the data when rendering
+    # the templates. The timestamp is an integer so it is not quoted
+    # when encoded as JSON.
+
+    _SPAN_ID = "nr-template-span-id"
+    _TIMESTAMP = -7040518342187295
+
+    def __init__(self, data, tracestate="", newrelic_header=True):
+        self.key = self.template_key(data, tracestate, newrelic_header)
+        self.has_span_id = "id" in data
+
+        data = dict(data, ti=self._TIMESTAMP)
+
+        if self.has_span_id:
+            data["id"] = self._SPAN_ID
+
+        # The traceparent header always has a span ID, a random one being
+        # used if the data doesn't have one.
+
+        self.traceparent = self._format(W3CTraceParent(data, id=self._SPAN_ID).text())
+
+        tracestate_text = NrTraceState(data).text()
+        if tracestate:
+            tracestate_text += "," + tracestate
+
+        self.tracestate = self._format(tracestate_text)
+
+        self.newrelic_prefix = b""
+        self.newrelic = None
+
+        if newrelic_header:
+            text = DistributedTracePayload(v=DistributedTracePayload.version, d=data).text()
+
+            # Base64 encodes each 3 bytes of input separately, so as much
+            # of the text before the first placeholder as is a multiple of
+            # 3 bytes long can be encoded up front.
+
+            end = text.index(str(self._TIMESTAMP))
+            if self.has_span_id:
+                end = min(end, text.index(self._SPAN_ID))
+
+            end -= end % 3
+
+            self.newrelic_prefix = base64.b64encode(text[:end].encode("utf-8"))
+            self.newrelic = self._format(text[end:])
+
+    @classmethod
+    def template_key(cls, data, tracestate="", newrelic_header=True):
+        fields = dict(data)
+
+        for name in cls.VARIABLE_FIELDS:
+            fields.pop(name, None)
+
+        return fields, "id" in data, tracestate, newrelic_header
+
+    @classmethod
+    def _format(cls, text):
+        # Converts the text into a format string, with the placeholders
+        # replaced by the fields they are for.
+
+        text = text.replace("%", "%%")
+        text = text.replace(cls._SPAN_ID, "%(id)s")
+        text = text.replace(str(cls._TIMESTAMP), "%(ti)d")
+
+        return text
+
+    def render(self, data):
+        """Returns a tuple of the text for the traceparent, tracestate and
+        newrelic headers for the data, with None for the newrelic header
+        if it isn't to be included.
+
+        """
+
+        values = {"id": data.get("id", ""), "ti": data["ti"]}
+
+        if self.has_span_id:
+            traceparent = self.traceparent % values
+        else:
+            traceparent = self.traceparent % {"id": "{:016x}".format(random.getrandbits(64))}
+
+        tracestate = self.tracestate % values
+
+        newrelic = None
+
+        if self.newrelic is not None:
+            newrelic = self.newrelic_prefix + base64.b64encode((self.newrelic % values).encode("utf-8"))
+
+            if six.PY3:
+                newrelic = newrelic.decode("ascii")
+
+        return traceparent, tracestate, newrelic
+
+
 def capitalize(string):
     """Capitalize the first letter of a string."""
     if not string:
@@ -15,6 +15,7 @@
 import collections
 import logging
 import threading
+import time
 
 try:
     from newrelic.core.infinite_tracing_pb2 import AttributeValue, SpanBatch
@@ -26,7 +27,18 @@ _logger = logging.getLogger(__name__)
 
 
 class StreamBuffer(object):
-    def __init__(self, maxlen, batching=False):
+    """Queue of spans waiting to be sent over a gRPC stream.
+
+    When batching is enabled and max_batch_bytes is given, adaptive batching
+    is used. Batches are then sized by the encoded size of the spans rather
+    than a fixed count, and a batch is only sent once it reaches
+    max_batch_bytes or the oldest span in it reaches max_batch_age seconds.
+    The consumer is only woken when that is the case, rather than for every
+    span added.
+
+    """
+
+    def __init__(self, maxlen, batching=False, max_batch_bytes=None, max_batch_age=None):
         self._queue = collections.deque(maxlen=maxlen)
         self._notify = self.condition()
         self._shutdown = False
@@ -34,8 +46,18 @@ class StreamBuffer(object):
         self._dropped = 0
         self._settings = None
 
+        # Set by a consumer while it is waiting on the condition, so that
+        # producers only notify when there is someone to wake.
+        self._waiting = False
+
         self.batching = batching
 
+        self.max_batch_bytes = batching and max_batch_bytes or None
+        self.max_batch_age = max_batch_age or 0.0
+        self._sizes = collections.deque(maxlen=maxlen)
+        self._pending_bytes = 0
+        self._oldest = None
+
     @staticmethod
     def condition(*args, **kwargs):
         return threading.Condition(*args, **kwargs)
@@ -46,6 +68,10 @@ class StreamBuffer(object):
             self._notify.notify_all()
 
     def put(self, item):
+        if self.max_batch_bytes:
+            # Size the span before acquiring the lock
+            size = item.ByteSize()
+
         with self._notify:
             if self._shutdown:
                 return
@@ -60,8 +86,27 @@ class StreamBuffer(object):
             if len(self._queue) >= self._queue.maxlen:
                 self._dropped += 1
 
+            if self.max_batch_bytes:
+                if self._sizes and len(self._sizes) >= self._sizes.maxlen:
+                    self._pending_bytes -= self._sizes[0]
+                self._sizes.append(size)
+                self._pending_bytes += size
+
+                if self._oldest is None:
+                    self._oldest = time.time()
+
+                # Only wake the consumer when the first span arrives, so
+                # it can wait for the batch to age, or the batch is full.
+                wake = len(self._queue) == 0 or self._pending_bytes >= self.max_batch_bytes
+
+            else:
+                wake = True
+
             self._queue.append(item)
-            self._notify.notify_all()
+
+            if wake and self._waiting:
+                self._waiting = False
+                self._notify.notify_all()
 
     def stats(self):
         with self._notify:
@@ -70,6 +115,42 @@ class StreamBuffer(object):
 
         return seen, dropped
 
+    def _take_all(self):
+        # Swaps in a new queue rather than copying the items out of the
+        # existing one. Must be called with the condition lock held.
+
+        queue = self._queue
+        self._queue = collections.deque(maxlen=queue.maxlen)
+        self._sizes.clear()
+        self._pending_bytes = 0
+        self._oldest = None
+        return queue
+
+    def _take_batch(self):
+        # Removes the spans for the next adaptive batch, up to the maximum
+        # batch size in bytes. Must be called with the condition lock held.
+
+        if self._pending_bytes <= self.max_batch_bytes:
+            return self._take_all()
+
+        queue = self._queue
+        sizes = self._sizes
+        batch = []
+        batch_bytes = 0
+
+        while queue and (not batch or batch_bytes + sizes[0] <= self.max_batch_bytes):
+            batch.append(queue.popleft())
+            batch_bytes += sizes.popleft()
+
+        self._pending_bytes -= batch_bytes
+
+        # The age of the remaining spans isn't tracked individually, so
+        # the age of the batch just taken is kept as an upper bound.
+        if not queue:
+            self._oldest = None
+
+        return batch
+
     def __bool__(self):
         return bool(self._queue)
 
@@ -99,6 +180,8 @@ class StreamBufferIterator(object):
         return self._shutdown or self.stream_buffer._shutdown or (self._stream and self._stream.done())
 
     def __next__(self):
+        stream_buffer = self.stream_buffer
+
         with self._notify:
             while True:
                 # When a gRPC stream receives a server side disconnect (usually in the form of an OK code)
@@ -113,31 +196,51 @@ class StreamBufferIterator(object):
                         self.shutdown()
                     raise StopIteration
 
-                if self.batching:
-                    stream_buffer_len = len(self.stream_buffer)
+                timeout = None
+
+                if stream_buffer.max_batch_bytes:
+                    # Adaptive batching. Send a batch once it is large
+                    # enough or its oldest span is old enough, otherwise
+                    # wait until that will be the case.
+                    if stream_buffer:
+                        age = time.time() - stream_buffer._oldest
+                        if stream_buffer._pending_bytes >= stream_buffer.max_batch_bytes or (
+                            age >= stream_buffer.max_batch_age
+                        ):
+                            return SpanBatch(spans=stream_buffer._take_batch())
+
+                        timeout = stream_buffer.max_batch_age - age
+
+                elif self.batching:
+                    stream_buffer_len = len(stream_buffer)
                     if stream_buffer_len > self.MAX_BATCH_SIZE:
                         # Ensure batch size is never more than 100 to prevent issues with serializing large numbers
                         # of spans causing their age to exceed 10 seconds. That would cause them to be rejected
                         # by the trace observer.
-                        batch = [self.stream_buffer._queue.popleft() for _ in range(self.MAX_BATCH_SIZE)]
+                        batch = [stream_buffer._queue.popleft() for _ in range(self.MAX_BATCH_SIZE)]
                         return SpanBatch(spans=batch)
                     elif stream_buffer_len:
-                        # For small span batches empty stream buffer into list and clear queue.
-                        # This is only safe to do under lock which prevents items being added to the queue.
-                        batch = list(self.stream_buffer._queue)
-                        self.stream_buffer._queue.clear()
-                        return SpanBatch(spans=batch)
+                        # For small span batches take the whole queue, swapping in an empty one. This is only
+                        # safe to do under lock which prevents items being added to the queue.
+                        return SpanBatch(spans=stream_buffer._take_all())
 
                 else:
                     # Send items from stream buffer one at a time.
                     try:
-                        return self.stream_buffer._queue.popleft()
+                        return stream_buffer._queue.popleft()
                     except IndexError:
                         pass
 
                 # Wait until items are added to the stream buffer.
-                if not self.stream_closed() and not self.stream_buffer:
-                    self._notify.wait()
+                if not self.stream_closed() and (timeout is not None or not stream_buffer):
+                    stream_buffer._waiting = True
+                    try:
+                        if timeout is None:
+                            self._notify.wait()
+                        else:
+                            self._notify.wait(timeout)
+                    finally:
+                        stream_buffer._waiting = False
 
     next = __next__
 
@@ -77,8 +77,6 @@ from newrelic.core.agent import agent_instance
 from newrelic.core.config import flatten_settings, global_settings
 from newrelic.core.trace_cache import trace_cache
 
-_trace_cache = trace_cache()
-
 
 def shell_command(wrapped):
     args, varargs, keywords, defaults = _argspec(wrapped)
@@ -390,7 +388,7 @@ class ConsoleShell(cmd.Cmd):
     def do_transactions(self):
         """ """
 
-        for item in _trace_cache.active_threads():
+        for item in trace_cache().active_threads():
             transaction, thread_id, thread_type, frame = item
             print("THREAD", item, file=self.stdout)
             if transaction is not None:
@@ -570,6 +570,13 @@ class Agent(object):
 
         application.record_log_event(message, level, timestamp, attributes=attributes, priority=priority)
 
+    def defer_log_event(self, app_name, message, level=None, timestamp=None, attributes=None, priority=None):
+        application = self._applications.get(app_name, None)
+        if application is None or not application.active:
+            return
+
+        application.defer_log_event(message, level, timestamp, attributes=attributes, priority=priority)
+
     def record_transaction(self, app_name, data):
         """Processes the raw transaction data, generating and recording
         appropriate metrics against the named application. If there has
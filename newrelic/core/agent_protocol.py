@@ -14,6 +14,7 @@
 
 import logging
 import os
+import time
 
 from newrelic import version
 from newrelic.common import system_info
@@ -37,7 +38,7 @@ from newrelic.core.config import (
     finalize_application_settings,
     global_settings_dump,
 )
-from newrelic.core.internal_metrics import internal_count_metric
+from newrelic.core.internal_metrics import internal_count_metric, internal_metric
 from newrelic.core.otlp_utils import OTLP_CONTENT_TYPE, otlp_encode
 from newrelic.network.exceptions import (
     DiscardDataForRequest,
@@ -178,6 +179,7 @@ class AgentProtocol(object):
             compression_method=settings.compressed_content_encoding,
             max_payload_size_in_bytes=settings.max_payload_size_in_bytes,
             audit_log_fp=audit_log_fp,
+            max_connections=self._max_connections(settings),
         )
 
         self._params = {
@@ -218,12 +220,23 @@ class AgentProtocol(object):
     def close_connection(self):
         self.client.close_connection()
 
+    @staticmethod
+    def _max_connections(settings):
+        # With the harvest pipeline enabled, sends are made concurrently
+        # and the connection pool must be large enough to keep a
+        # connection for each worker.
+
+        if settings.harvest_pipeline.enabled:
+            return max(settings.harvest_pipeline.max_workers, 1)
+        return 1
+
     def send(
         self,
         method,
         payload=(),
         path="/agent_listener/invoke_raw_method",
     ):
+        start = time.time()
         params, headers, payload = self._to_http(method, payload)
 
         try:
@@ -231,6 +244,12 @@ class AgentProtocol(object):
         except NetworkInterfaceException:
             # All HTTP errors are currently retried
             raise RetryDataForRequest
+        finally:
+            # Latency of each endpoint, including encoding and
+            # compression of the payload.
+
+            duration = max(start, time.time()) - start
+            internal_metric("Supportability/Python/Collector/%s/Duration" % method, duration)
 
         status, data = response
 
@@ -551,6 +570,7 @@ class OtlpProtocol(AgentProtocol):
             max_payload_size_in_bytes=1000000,
             audit_log_fp=audit_log_fp,
             default_content_encoding_header=None,
+            max_connections=self._max_connections(settings),
         )
 
         self._params = {}
@@ -18,6 +18,7 @@
 
 from __future__ import print_function
 
+import collections
 import logging
 import os
 import sys
@@ -27,6 +28,12 @@ import traceback
 import warnings
 from functools import partial
 
+try:
+    import thread
+except ImportError:
+    import _thread as thread
+
+from newrelic.api.time_trace import get_service_linking_metadata
 from newrelic.common.object_names import callable_name
 from newrelic.core.adaptive_sampler import AdaptiveSampler
 from newrelic.core.config import global_settings
@@ -34,6 +41,7 @@ from newrelic.core.custom_event import create_custom_event
 from newrelic.core.data_collector import create_session
 from newrelic.core.database_utils import SQLConnections
 from newrelic.core.environment import environment_settings
+from newrelic.core.harvest_pipeline import HarvestPipeline
 from newrelic.core.internal_metrics import (
     InternalTrace,
     InternalTraceContext,
@@ -56,10 +64,34 @@ from newrelic.samplers.data_sampler import DataSampler
 _logger = logging.getLogger(__name__)
 
 
+class _StatsShard(object):
+
+    """Long lived stats engine owned by a single thread, into which the
+    work areas of transactions recorded by that thread are merged. The
+    shard lock is only ever contended by the harvest thread when the
+    shard is being drained into the main stats engine.
+
+    """
+
+    __slots__ = ("lock", "stats", "transaction_count", "last_transaction", "retired")
+
+    def __init__(self, stats):
+        self.lock = threading.Lock()
+        self.stats = stats
+        self.transaction_count = 0
+        self.last_transaction = 0.0
+        self.retired = False
+
+
 class Application(object):
 
     """Class which maintains recorded data for a single application."""
 
+    # Number of deferred log events recorded at a time while holding
+    # the lock on the stats engine.
+
+    LOG_EVENT_BATCH_SIZE = 1000
+
     def __init__(self, app_name, linked_applications=None):
         _logger.debug(
             "Initializing application with name %r and linked applications of %r.", app_name, linked_applications
@@ -106,10 +138,43 @@ class Application(object):
         self._stats_custom_lock = threading.RLock()
         self._stats_custom_engine = StatsEngine()
 
+        # Per thread stats engine shards used when sharded accumulation
+        # of transaction data is enabled. Keyed by thread ID, which for
+        # an asyncio event loop is that of the thread running the loop.
+
+        self._stats_shards = {}
+
+        # Transactions waiting to be recorded by a background thread when
+        # deferred recording of transactions is enabled, and a count of
+        # those dropped as the queue was full.
+
+        self._deferred_transactions = collections.deque()
+        self._deferred_condition = threading.Condition(threading.Lock())
+        self._deferred_thread = None
+        self._deferred_dropped = 0
+
+        # Log events waiting to be recorded by a background thread when
+        # deferred forwarding of log events is enabled. Appending to and
+        # popping from a deque are atomic, so queuing a log event takes
+        # no lock, and the count of those dropped as the queue was full
+        # is only approximate.
+
+        self._deferred_log_events = collections.deque()
+        self._deferred_log_events_ready = threading.Event()
+        self._deferred_log_events_lock = threading.Lock()
+        self._deferred_log_events_thread = None
+        self._deferred_log_events_dropped = 0
+
         self._agent_commands_lock = threading.Lock()
         self._data_samplers_lock = threading.Lock()
         self._data_samplers_started = False
 
+        # Background thread polling high frequency data sources between
+        # harvests, and the event used to tell it to stop.
+
+        self._data_samplers_thread = None
+        self._data_samplers_shutdown = None
+
         # We setup empty rules engines here even though they will be
         # replaced when application first registered. This is done to
         # avoid a race condition in setting it later. Otherwise we have
@@ -497,6 +562,7 @@ class Application(object):
         configuration = active_session.configuration
 
         with self._stats_lock:
+            self._retire_stats_shards()
             self._stats_engine.reset_stats(configuration, reset_stream=True)
 
             if configuration.serverless_mode.enabled:
@@ -511,6 +577,7 @@ class Application(object):
             self._stats_custom_engine.reset_stats(configuration)
 
         with self._stats_lock:
+            self._retire_stats_shards()
             self._stats_engine.reset_stats(configuration)
 
         # Record an initial start time for the reporting period and
@@ -733,6 +800,8 @@ class Application(object):
                         data_sampler.name,
                     )
 
+            self._start_high_frequency_sampling()
+
             self._data_samplers_started = True
 
     def stop_data_samplers(self):
@@ -745,6 +814,8 @@ class Application(object):
         with self._data_samplers_lock:
             _logger.debug("Stopping data samplers for application %r.", self._app_name)
 
+            self._stop_high_frequency_sampling()
+
             for data_sampler in self._data_samplers:
                 try:
                     _logger.debug("Stopping data sampler for %r in application %r.", data_sampler.name, self._app_name)
@@ -760,6 +831,81 @@ class Application(object):
                         data_sampler.name,
                     )
 
+    def _start_high_frequency_sampling(self):
+        """Starts the background thread polling any high frequency data
+        sources, if enabled. Must be called with the lock for the data
+        samplers held.
+
+        """
+
+        settings = self.configuration or global_settings()
+
+        if not settings.high_frequency_sampling.enabled:
+            return
+
+        if not any(data_sampler.high_frequency for data_sampler in self._data_samplers):
+            return
+
+        thread = self._data_samplers_thread
+
+        if thread is not None and thread.is_alive():
+            return
+
+        shutdown = threading.Event()
+        interval = max(settings.high_frequency_sampling.interval, 0.01)
+
+        thread = threading.Thread(
+            target=self._high_frequency_sampling_loop, args=(shutdown, interval), name="NR-Data-Sampler-Thread"
+        )
+        thread.daemon = True
+        thread.start()
+
+        self._data_samplers_thread = thread
+        self._data_samplers_shutdown = shutdown
+
+    def _stop_high_frequency_sampling(self):
+        """Stops the background thread polling any high frequency data
+        sources. Must be called with the lock for the data samplers held.
+
+        """
+
+        thread = self._data_samplers_thread
+
+        if thread is None:
+            return
+
+        self._data_samplers_shutdown.set()
+
+        if thread is not threading.current_thread():
+            thread.join(1.0)
+
+        self._data_samplers_thread = None
+        self._data_samplers_shutdown = None
+
+    def _high_frequency_sampling_loop(self, shutdown, interval):
+        while not shutdown.wait(interval):
+            for data_sampler in list(self._data_samplers):
+                if not data_sampler.high_frequency:
+                    continue
+
+                try:
+                    data_sampler.sample()
+                except Exception:
+                    # Stop polling the data source so a persistent problem
+                    # isn't logged several times a second. The values it
+                    # reports will still be collected at each harvest.
+
+                    data_sampler.high_frequency = False
+
+                    _logger.exception(
+                        "Unexpected exception when sampling data "
+                        "source %r between harvests. The data source "
+                        "will only be sampled at harvest from now on. If "
+                        "this problem persists, please report this "
+                        "problem to the provider of the data source.",
+                        data_sampler.name,
+                    )
+
     def remove_data_source(self, name):
         with self._data_samplers_lock:
             data_sampler = [x for x in self._data_samplers if x.name == name]
@@ -939,17 +1085,135 @@ class Application(object):
                 self._global_events_account += 1
                 self._stats_engine.record_ml_event(event)
 
-    def record_log_event(self, message, level=None, timestamp=None, attributes=None, priority=None):
+    def record_log_event(
+        self, message, level=None, timestamp=None, attributes=None, priority=None, linking_metadata=None
+    ):
         if not self._active_session:
             return
 
         with self._stats_custom_lock:
             event = self._stats_engine.record_log_event(
-                message, level, timestamp, attributes=attributes, priority=priority
+                message, level, timestamp, attributes=attributes, priority=priority, linking_metadata=linking_metadata
             )
             if event:
                 self._global_events_account += 1
 
+    def defer_log_event(self, message, level=None, timestamp=None, attributes=None, priority=None):
+        """Queues a log event logged outside of a transaction to be
+        recorded by a background thread, so the message and attributes
+        are processed in batches away from the thread which logged it.
+        If the queue is full the log event is dropped.
+
+        """
+
+        if not self._active_session:
+            return
+
+        settings = self._stats_engine.settings
+
+        if settings is None:
+            return
+
+        deferred = settings.application_logging.forwarding.deferred
+
+        if not deferred.enabled or settings.serverless_mode.enabled:
+            linking_metadata = get_service_linking_metadata(settings=settings)
+
+            self.record_log_event(
+                message, level, timestamp, attributes=attributes, priority=priority, linking_metadata=linking_metadata
+            )
+            return
+
+        queue = self._deferred_log_events
+
+        if len(queue) >= deferred.queue_size:
+            self._deferred_log_events_dropped += 1
+            return
+
+        queue.append((message, level, timestamp, attributes, priority))
+
+        # The background thread only needs waking when the queue was
+        # empty, as it otherwise keeps going until it has emptied it.
+
+        if len(queue) == 1:
+            self._deferred_log_events_ready.set()
+
+        # The thread is started when first needed, or again in a
+        # process forked after it was started.
+
+        thread = self._deferred_log_events_thread
+        if thread is None or not thread.is_alive():
+            with self._deferred_log_events_lock:
+                thread = self._deferred_log_events_thread
+                if thread is None or not thread.is_alive():
+                    thread = threading.Thread(
+                        target=self._deferred_log_events_loop, name="NR-Log-Event-Recorder-Thread"
+                    )
+                    thread.daemon = True
+                    thread.start()
+                    self._deferred_log_events_thread = thread
+
+    def _deferred_log_events_loop(self):
+        ready = self._deferred_log_events_ready
+
+        while True:
+            # A timeout is used as queuing a log event only wakes this
+            # thread when the queue was empty, which two threads logging
+            # at once can both miss.
+
+            ready.wait(1.0)
+            ready.clear()
+
+            try:
+                self._record_deferred_log_events()
+            except Exception:
+                _logger.exception(
+                    "The recording of deferred log events has "
+                    "failed. This would indicate some sort of internal "
+                    "implementation issue with the agent. Please report "
+                    "this problem to New Relic support for further "
+                    "investigation."
+                )
+
+    def _record_deferred_log_events(self):
+        """Records any log events queued to be recorded, in batches so
+        the lock on the stats engine is not taken for each one.
+
+        """
+
+        queue = self._deferred_log_events
+
+        while queue:
+            batch = []
+            try:
+                for _ in range(self.LOG_EVENT_BATCH_SIZE):
+                    batch.append(queue.popleft())
+            except IndexError:
+                pass
+
+            if not self._active_session:
+                continue
+
+            settings = self._stats_engine.settings
+
+            if settings is None:
+                continue
+
+            linking_metadata = get_service_linking_metadata(settings=settings)
+
+            with self._stats_custom_lock:
+                for message, level, timestamp, attributes, priority in batch:
+                    event = self._stats_engine.record_log_event(
+                        message,
+                        level,
+                        timestamp,
+                        attributes=attributes,
+                        priority=priority,
+                        linking_metadata=linking_metadata,
+                    )
+                    if event:
+                        self._global_events_account += 1
+
     def record_transaction(self, data):
         """Record a single transaction against this application."""
 
@@ -958,6 +1222,82 @@ class Application(object):
 
         settings = self._stats_engine.settings
 
+        if settings is None:
+            return
+
+        deferred_recording = settings.stats_engine.deferred_recording
+
+        if deferred_recording.enabled and not settings.serverless_mode.enabled:
+            self._defer_transaction(data, deferred_recording.queue_size)
+        else:
+            self._record_transaction(data)
+
+    def _defer_transaction(self, data, queue_size):
+        """Queues the transaction to be recorded by a background thread,
+        so the metrics and events for it are not generated on the thread
+        which ran the transaction. If the queue is full the transaction
+        is dropped.
+
+        """
+
+        with self._deferred_condition:
+            if len(self._deferred_transactions) >= queue_size:
+                self._deferred_dropped += 1
+                return
+
+            self._deferred_transactions.append(data)
+            self._deferred_condition.notify()
+
+            # The thread is started when first needed, or again in a
+            # process forked after it was started.
+
+            if self._deferred_thread is None or not self._deferred_thread.is_alive():
+                self._deferred_thread = threading.Thread(
+                    target=self._deferred_recording_loop, name="NR-Transaction-Recorder-Thread"
+                )
+                self._deferred_thread.daemon = True
+                self._deferred_thread.start()
+
+    def _deferred_recording_loop(self):
+        while True:
+            with self._deferred_condition:
+                while not self._deferred_transactions:
+                    self._deferred_condition.wait()
+
+                data = self._deferred_transactions.popleft()
+
+            try:
+                self._record_transaction(data)
+            except Exception:
+                _logger.exception(
+                    "The recording of deferred transaction data has "
+                    "failed. This would indicate some sort of internal "
+                    "implementation issue with the agent. Please report "
+                    "this problem to New Relic support for further "
+                    "investigation."
+                )
+
+    def _record_deferred_transactions(self):
+        """Records on the current thread any transactions still queued to
+        be recorded, so that they are included in a harvest.
+
+        """
+
+        with self._deferred_condition:
+            pending = len(self._deferred_transactions)
+
+        for _ in range(pending):
+            with self._deferred_condition:
+                if not self._deferred_transactions:
+                    return
+
+                data = self._deferred_transactions.popleft()
+
+            self._record_transaction(data)
+
+    def _record_transaction(self, data):
+        settings = self._stats_engine.settings
+
         if settings is None:
             return
 
@@ -984,35 +1324,59 @@ class Application(object):
 
         internal_metrics = CustomMetrics()
 
-        with InternalTraceContext(internal_metrics):
-            with InternalTrace("Supportability/Python/RecordTransaction/Calls/record"):
-                try:
-                    # We accumulate stats into a workarea and only then merge it
-                    # into the main one under a thread lock. Do this to ensure
-                    # that the process of generating the metrics into the stats
-                    # don't unnecessarily lock out another thread.
+        # When sharded accumulation is enabled the work area is merged
+        # into a stats engine owned by the current thread rather than the
+        # main one. The shards are only combined with the main stats
+        # engine when a harvest is done, so threads don't contend on the
+        # stats lock for each transaction. The lock for the shard is held
+        # while the transaction is recorded, so that the shard cannot be
+        # drained by a harvest while the work area for it is in use.
+
+        if settings.stats_engine.sharding.enabled:
+            shard = self._acquire_stats_shard()
+            parent = shard.stats
+        else:
+            shard = None
+            parent = self._stats_engine
 
-                    stats = self._stats_engine.create_workarea()
-                    stats.record_transaction(data)
+        try:
+            with InternalTraceContext(internal_metrics):
+                with InternalTrace("Supportability/Python/RecordTransaction/Calls/record"):
+                    try:
+                        # We accumulate stats into a workarea and only then
+                        # merge it into the main one under a thread lock. Do
+                        # this to ensure that the process of generating the
+                        # metrics into the stats don't unnecessarily lock out
+                        # another thread.
 
-                except Exception:
-                    _logger.exception(
-                        "The generation of transaction data has "
-                        "failed. This would indicate some sort of internal "
-                        "implementation issue with the agent. Please report "
-                        "this problem to New Relic support for further "
-                        "investigation."
-                    )
+                        stats = parent.create_workarea()
+                        stats.record_transaction(data)
 
-                    if settings.debug.record_transaction_failure:
-                        raise
+                    except Exception:
+                        _logger.exception(
+                            "The generation of transaction data has "
+                            "failed. This would indicate some sort of internal "
+                            "implementation issue with the agent. Please report "
+                            "this problem to New Relic support for further "
+                            "investigation."
+                        )
+
+                        if settings.debug.record_transaction_failure:
+                            raise
+
+                if shard is None:
+                    self._stats_lock.acquire()
 
-            with self._stats_lock:
                 try:
-                    self._transaction_count += 1
-                    self._last_transaction = data.end_time
+                    if shard is None:
+                        self._transaction_count += 1
+                        self._last_transaction = data.end_time
+
+                    else:
+                        shard.transaction_count += 1
+                        shard.last_transaction = data.end_time
 
-                    self._stats_engine.merge(stats)
+                    parent.merge(stats)
 
                     # We merge the internal statistics here as well even
                     # though have popped out of the context where we are
@@ -1020,7 +1384,7 @@ class Application(object):
                     # anything else after this point. If we do then that
                     # data will not be recorded.
 
-                    self._stats_engine.merge_custom_metrics(internal_metrics.metrics())
+                    parent.merge_custom_metrics(internal_metrics.metrics())
 
                 except Exception:
                     _logger.exception(
@@ -1034,6 +1398,87 @@ class Application(object):
                     if settings.debug.record_transaction_failure:
                         raise
 
+                finally:
+                    if shard is None:
+                        self._stats_lock.release()
+
+        finally:
+            if shard is not None:
+                shard.lock.release()
+
+    def _acquire_stats_shard(self):
+        """Returns the stats engine shard for the current thread, creating
+        it if necessary. The lock for the shard is held on return and must
+        be released by the caller.
+
+        """
+
+        thread_id = thread.get_ident()
+
+        while True:
+            shard = self._stats_shards.get(thread_id)
+
+            if shard is None:
+                with self._stats_lock:
+                    shard = self._stats_shards.get(thread_id)
+                    if shard is None:
+                        shard = _StatsShard(self._stats_engine.create_workarea())
+                        self._stats_shards[thread_id] = shard
+
+            shard.lock.acquire()
+
+            # A shard can be retired by the harvest thread between it
+            # being looked up and the lock being acquired, in which case
+            # it will no longer be drained and a new one is required.
+
+            if not shard.retired:
+                return shard
+
+            shard.lock.release()
+
+    def _merge_stats_shards(self):
+        """Drains the per thread stats engine shards into the main stats
+        engine. Shards which have not recorded any transactions since the
+        last harvest are retired so that those belonging to threads which
+        have exited are not retained. Must be called with the stats lock
+        held.
+
+        """
+
+        for thread_id, shard in list(self._stats_shards.items()):
+            with shard.lock:
+                stats = shard.stats
+                transaction_count = shard.transaction_count
+                last_transaction = shard.last_transaction
+
+                if transaction_count:
+                    shard.stats = self._stats_engine.create_workarea()
+                    shard.transaction_count = 0
+                    shard.last_transaction = 0.0
+                else:
+                    shard.retired = True
+                    del self._stats_shards[thread_id]
+
+            if transaction_count:
+                self._transaction_count += transaction_count
+                self._last_transaction = max(self._last_transaction, last_transaction)
+
+                self._stats_engine.merge(stats, aggregated=True)
+
+    def _retire_stats_shards(self):
+        """Discards all per thread stats engine shards. Used when the stats
+        engine is reset on registration of the application, as any data
+        in the shards relates to a prior agent run. Must be called with
+        the stats lock held.
+
+        """
+
+        for shard in list(self._stats_shards.values()):
+            with shard.lock:
+                shard.retired = True
+
+        self._stats_shards = {}
+
     def cmd_start_profiler(self, command_id=0, **kwargs):
         """Triggered by the start_profiler agent command to start a
         thread profiling session.
@@ -1176,9 +1621,32 @@ class Application(object):
                 _logger.debug("Snapshotting for harvest[%s] of %r.", call_metric, self._app_name)
 
                 configuration = self._active_session.configuration
-                transaction_count = self._transaction_count
+
+                self._record_deferred_transactions()
+                self._record_deferred_log_events()
+
+                if not flexible:
+                    with self._deferred_condition:
+                        deferred_dropped = self._deferred_dropped
+                        self._deferred_dropped = 0
+
+                    if deferred_dropped:
+                        internal_count_metric(
+                            "Supportability/Python/RecordTransaction/Deferred/Dropped", deferred_dropped
+                        )
+
+                    deferred_log_events_dropped = self._deferred_log_events_dropped
+                    self._deferred_log_events_dropped -= deferred_log_events_dropped
+
+                    if deferred_log_events_dropped:
+                        internal_count_metric(
+                            "Supportability/Python/Logging/Forwarding/Deferred/Dropped", deferred_log_events_dropped
+                        )
 
                 with self._stats_lock:
+                    self._merge_stats_shards()
+
+                    transaction_count = self._transaction_count
                     self._transaction_count = 0
 
                     self._last_transaction = 0.0
@@ -1280,6 +1748,24 @@ class Application(object):
                         _logger.debug("Stretching harvest duration for forced harvest on shutdown.")
                         period_end = self._period_start + 1.001
 
+                # Sends to the data collector are queued on the harvest
+                # pipeline, which when enabled uploads the payloads for
+                # independent endpoints concurrently. The data for each
+                # type is only reset once it has been sent, so that any
+                # data for failed sends is still present if the harvest
+                # is rolled back. Concurrent sends are not used in
+                # serverless mode or with the audit log enabled, as the
+                # order of the output would no longer be deterministic.
+
+                if (
+                    configuration.harvest_pipeline.enabled
+                    and not configuration.serverless_mode.enabled
+                    and not configuration.audit_log_file
+                ):
+                    pipeline = HarvestPipeline(internal_metrics, configuration.harvest_pipeline.max_workers)
+                else:
+                    pipeline = HarvestPipeline(internal_metrics)
+
                 try:
                     # Send the transaction and custom metric data.
 
@@ -1292,11 +1778,14 @@ class Application(object):
                         if synthetics_events.num_samples:
                             _logger.debug("Sending synthetics event data for harvest of %r.", self._app_name)
 
-                            self._active_session.send_transaction_events(
-                                synthetics_events.sampling_info, synthetics_events
+                            pipeline.send(
+                                self._active_session.send_transaction_events,
+                                (synthetics_events.sampling_info, synthetics_events),
+                                stats.reset_synthetics_events,
                             )
 
-                        stats.reset_synthetics_events()
+                        else:
+                            stats.reset_synthetics_events()
 
                     if configuration.collect_analytics_events and configuration.transaction_events.enabled:
                         transaction_events = stats.transaction_events
@@ -1313,11 +1802,14 @@ class Application(object):
                             if transaction_events.num_samples:
                                 _logger.debug("Sending analytics event data for harvest of %r.", self._app_name)
 
-                                self._active_session.send_transaction_events(
-                                    transaction_events.sampling_info, transaction_events
+                                pipeline.send(
+                                    self._active_session.send_transaction_events,
+                                    (transaction_events.sampling_info, transaction_events),
+                                    stats.reset_transaction_events,
                                 )
 
-                            stats.reset_transaction_events()
+                            else:
+                                stats.reset_transaction_events()
 
                     # Send span events
 
@@ -1338,21 +1830,27 @@ class Application(object):
                         else:
                             spans = stats.span_events
                             if spans:
-                                if spans.num_samples > 0:
-                                    span_samples = list(spans)
 
-                                    _logger.debug("Sending span event data for harvest of %r.", self._app_name)
+                                def _span_events_sent(spans=spans):
+                                    # As per spec
+                                    spans_seen = spans.num_seen
+                                    spans_sampled = spans.num_samples
+                                    internal_count_metric("Supportability/SpanEvent/TotalEventsSeen", spans_seen)
+                                    internal_count_metric("Supportability/SpanEvent/TotalEventsSent", spans_sampled)
 
-                                    self._active_session.send_span_events(spans.sampling_info, span_samples)
-                                    span_samples = None
+                                    stats.reset_span_events()
 
-                                # As per spec
-                                spans_seen = spans.num_seen
-                                spans_sampled = spans.num_samples
-                                internal_count_metric("Supportability/SpanEvent/TotalEventsSeen", spans_seen)
-                                internal_count_metric("Supportability/SpanEvent/TotalEventsSent", spans_sampled)
+                                if spans.num_samples > 0:
+                                    _logger.debug("Sending span event data for harvest of %r.", self._app_name)
 
-                                stats.reset_span_events()
+                                    pipeline.send(
+                                        self._active_session.send_span_events,
+                                        (spans.sampling_info, list(spans)),
+                                        _span_events_sent,
+                                    )
+
+                                else:
+                                    _span_events_sent()
 
                     # Send error events
 
@@ -1363,21 +1861,29 @@ class Application(object):
                     ):
                         error_events = stats.error_events
                         if error_events:
-                            num_error_samples = error_events.num_samples
-                            if num_error_samples > 0:
-                                error_event_samples = list(error_events)
 
-                                _logger.debug("Sending error event data for harvest of %r.", self._app_name)
+                            def _error_events_sent(error_events=error_events):
+                                # As per spec
+                                internal_count_metric(
+                                    "Supportability/Events/TransactionError/Seen", error_events.num_seen
+                                )
+                                internal_count_metric(
+                                    "Supportability/Events/TransactionError/Sent", error_events.num_samples
+                                )
 
-                                samp_info = error_events.sampling_info
-                                self._active_session.send_error_events(samp_info, error_event_samples)
-                                error_event_samples = None
+                                stats.reset_error_events()
 
-                            # As per spec
-                            internal_count_metric("Supportability/Events/TransactionError/Seen", error_events.num_seen)
-                            internal_count_metric("Supportability/Events/TransactionError/Sent", num_error_samples)
+                            if error_events.num_samples > 0:
+                                _logger.debug("Sending error event data for harvest of %r.", self._app_name)
 
-                            stats.reset_error_events()
+                                pipeline.send(
+                                    self._active_session.send_error_events,
+                                    (error_events.sampling_info, list(error_events)),
+                                    _error_events_sent,
+                                )
+
+                            else:
+                                _error_events_sent()
 
                     # Send custom events
 
@@ -1385,19 +1891,25 @@ class Application(object):
                         customs = stats.custom_events
 
                         if customs:
-                            if customs.num_samples > 0:
-                                custom_samples = list(customs)
 
-                                _logger.debug("Sending custom event data for harvest of %r.", self._app_name)
+                            def _custom_events_sent(customs=customs):
+                                # As per spec
+                                internal_count_metric("Supportability/Events/Customer/Seen", customs.num_seen)
+                                internal_count_metric("Supportability/Events/Customer/Sent", customs.num_samples)
 
-                                self._active_session.send_custom_events(customs.sampling_info, custom_samples)
-                                custom_samples = None
+                                stats.reset_custom_events()
 
-                            # As per spec
-                            internal_count_metric("Supportability/Events/Customer/Seen", customs.num_seen)
-                            internal_count_metric("Supportability/Events/Customer/Sent", customs.num_samples)
+                            if customs.num_samples > 0:
+                                _logger.debug("Sending custom event data for harvest of %r.", self._app_name)
+
+                                pipeline.send(
+                                    self._active_session.send_custom_events,
+                                    (customs.sampling_info, list(customs)),
+                                    _custom_events_sent,
+                                )
 
-                            stats.reset_custom_events()
+                            else:
+                                _custom_events_sent()
 
                     # Send machine learning events
 
@@ -1405,19 +1917,25 @@ class Application(object):
                         ml_events = stats.ml_events
 
                         if ml_events:
-                            if ml_events.num_samples > 0:
-                                ml_event_samples = list(ml_events)
 
-                                _logger.debug("Sending machine learning event data for harvest of %r.", self._app_name)
+                            def _ml_events_sent(ml_events=ml_events):
+                                # As per spec
+                                internal_count_metric("Supportability/Events/Customer/Seen", ml_events.num_seen)
+                                internal_count_metric("Supportability/Events/Customer/Sent", ml_events.num_samples)
 
-                                self._active_session.send_ml_events(ml_events.sampling_info, ml_event_samples)
-                                ml_event_samples = None
+                                stats.reset_ml_events()
 
-                            # As per spec
-                            internal_count_metric("Supportability/Events/Customer/Seen", ml_events.num_seen)
-                            internal_count_metric("Supportability/Events/Customer/Sent", ml_events.num_samples)
+                            if ml_events.num_samples > 0:
+                                _logger.debug("Sending machine learning event data for harvest of %r.", self._app_name)
+
+                                pipeline.send(
+                                    self._active_session.send_ml_events,
+                                    (ml_events.sampling_info, list(ml_events)),
+                                    _ml_events_sent,
+                                )
 
-                            stats.reset_ml_events()
+                            else:
+                                _ml_events_sent()
 
                     # Send log events
 
@@ -1431,20 +1949,26 @@ class Application(object):
                         logs = stats.log_events
 
                         if logs:
-                            if logs.num_samples > 0:
-                                log_samples = list(logs)
 
-                                _logger.debug("Sending log event data for harvest of %r.", self._app_name)
+                            def _log_events_sent(logs=logs):
+                                # As per spec
+                                internal_count_metric("Supportability/Logging/Forwarding/Seen", logs.num_seen)
+                                internal_count_metric("Supportability/Logging/Forwarding/Sent", logs.num_samples)
+                                internal_count_metric("Logging/Forwarding/Dropped", logs.num_seen - logs.num_samples)
 
-                                self._active_session.send_log_events(logs.sampling_info, log_samples)
-                                log_samples = None
+                                stats.reset_log_events()
 
-                            # As per spec
-                            internal_count_metric("Supportability/Logging/Forwarding/Seen", logs.num_seen)
-                            internal_count_metric("Supportability/Logging/Forwarding/Sent", logs.num_samples)
-                            internal_count_metric("Logging/Forwarding/Dropped", logs.num_seen - logs.num_samples)
+                            if logs.num_samples > 0:
+                                _logger.debug("Sending log event data for harvest of %r.", self._app_name)
+
+                                pipeline.send(
+                                    self._active_session.send_log_events,
+                                    (logs.sampling_info, list(logs)),
+                                    _log_events_sent,
+                                )
 
-                            stats.reset_log_events()
+                            else:
+                                _log_events_sent()
 
                     # Send the accumulated error data.
 
@@ -1454,30 +1978,36 @@ class Application(object):
                         if error_data:
                             _logger.debug("Sending error data for harvest of %r.", self._app_name)
 
-                            self._active_session.send_errors(error_data)
+                            pipeline.send(self._active_session.send_errors, (error_data,))
 
-                    if not flexible:
-                        if configuration.collect_traces:
-                            connections = SQLConnections(configuration.agent_limits.max_sql_connections)
+                    if not flexible and configuration.collect_traces:
+                        connections = SQLConnections(configuration.agent_limits.max_sql_connections)
+
+                        with connections:
+                            if configuration.slow_sql.enabled:
+                                _logger.debug("Processing slow SQL data for harvest of %r.", self._app_name)
+
+                                slow_sql_data = stats.slow_sql_data(connections)
 
-                            with connections:
-                                if configuration.slow_sql.enabled:
-                                    _logger.debug("Processing slow SQL data for harvest of %r.", self._app_name)
+                                if slow_sql_data:
+                                    _logger.debug("Sending slow SQL data for harvest of %r.", self._app_name)
 
-                                    slow_sql_data = stats.slow_sql_data(connections)
+                                    pipeline.send(self._active_session.send_sql_traces, (slow_sql_data,))
 
-                                    if slow_sql_data:
-                                        _logger.debug("Sending slow SQL data for harvest of %r.", self._app_name)
+                            slow_transaction_data = stats.transaction_trace_data(connections)
 
-                                        self._active_session.send_sql_traces(slow_sql_data)
+                            if slow_transaction_data:
+                                _logger.debug("Sending slow transaction data for harvest of %r.", self._app_name)
 
-                                slow_transaction_data = stats.transaction_trace_data(connections)
+                                pipeline.send(self._active_session.send_transaction_traces, (slow_transaction_data,))
 
-                                if slow_transaction_data:
-                                    _logger.debug("Sending slow transaction data for harvest of %r.", self._app_name)
+                    # Wait for all the event and trace data to be sent. If
+                    # any of it fails, the metric data is not sent and is
+                    # instead rolled back along with any unsent events.
 
-                                    self._active_session.send_transaction_traces(slow_transaction_data)
+                    pipeline.flush()
 
+                    if not flexible:
                         # Create a metric_normalizer based on normalize_name
                         # If metric rename rules are empty, set normalizer
                         # to None and the stats engine will skip steps as
@@ -1505,12 +2035,17 @@ class Application(object):
                         _logger.debug("Sending metric data for harvest of %r.", self._app_name)
 
                         # Send metrics
-                        self._active_session.send_metric_data(self._period_start, period_end, metric_data)
+                        pipeline.send(
+                            self._active_session.send_metric_data, (self._period_start, period_end, metric_data)
+                        )
                         if dimensional_metric_data:
-                            self._active_session.send_dimensional_metric_data(
-                                self._period_start, period_end, dimensional_metric_data
+                            pipeline.send(
+                                self._active_session.send_dimensional_metric_data,
+                                (self._period_start, period_end, dimensional_metric_data),
                             )
 
+                        pipeline.flush()
+
                         _logger.debug("Done sending data for harvest of %r.", self._app_name)
 
                         stats.reset_metric_stats()
@@ -61,6 +61,8 @@ _TRANSACTION_EVENT_DEFAULT_ATTRIBUTES = set(
         "error.expected",
         "error.message",
         "error.group.name",
+        "graphql.field.callCount",
+        "graphql.field.maxDuration",
         "graphql.field.name",
         "graphql.field.parentType",
         "graphql.field.path",
@@ -25,6 +25,16 @@ DST_TRANSACTION_SEGMENTS = 1 << 5
 DST_LOG_EVENT_CONTEXT_DATA = 1 << 6
 
 
+def _combine_masks(first, second):
+    # Returns the pair of bitfields for the bits set and cleared by
+    # applying the first and then the second pair.
+
+    first_set, first_clear = first
+    second_set, second_clear = second
+
+    return ((first_set & ~second_clear) | second_set, first_clear | second_clear)
+
+
 class AttributeFilter(object):
     # Apply filtering rules to attributes.
     #
@@ -58,10 +68,26 @@ class AttributeFilter(object):
     #      the bitfield.
     #
     #   4. Return the resulting bitfield after all rules have been applied.
+    #
+    # As each rule either sets or clears the bits for its destinations, the
+    # effect of all the rules matching a name can be reduced to a pair of
+    # bitfields, those bits which are set and those which are cleared, no
+    # matter what the default destinations are. The rules are compiled into
+    # tables of these pairs keyed on the name or wildcard prefix of the
+    # rules, so only the prefixes of a name which wildcard rules exist for
+    # need to be looked up, rather than trying every rule in turn.
+    #
+    # The pairs of bitfields for names are cached, up to CACHE_MAXIMUM
+    # names, after which the cache is cleared. This stops the cache growing
+    # without limit where attribute names come from request parameters or
+    # headers.
+
+    CACHE_MAXIMUM = 10000
 
     def __init__(self, flattened_settings):
         self.enabled_destinations = self._set_enabled_destinations(flattened_settings)
         self.rules = self._build_rules(flattened_settings)
+        self._compile_rules()
         self.cache = {}
 
     def __repr__(self):
@@ -136,27 +162,62 @@ class AttributeFilter(object):
 
         return tuple(rules)
 
+    def _compile_rules(self):
+        # Rules are sorted such that all rules for the same name and kind
+        # are adjacent, so can be combined as they are added.
+
+        self._exact_masks = {}
+        self._wildcard_masks = {}
+
+        for rule in self.rules:
+            if rule.is_include:
+                rule_masks = (rule.destinations & self.enabled_destinations, DST_NONE)
+            else:
+                rule_masks = (DST_NONE, rule.destinations)
+
+            table = self._wildcard_masks if rule.is_wildcard else self._exact_masks
+            table[rule.name] = _combine_masks(table.get(rule.name, (DST_NONE, DST_NONE)), rule_masks)
+
+        self._wildcard_lengths = tuple(sorted(set(len(prefix) for prefix in self._wildcard_masks)))
+
+    def _name_masks(self, name):
+        # Matching rules are applied in sorted order. Wildcard prefixes of
+        # a name sort before longer prefixes, and all before rules for the
+        # exact name.
+
+        masks = (DST_NONE, DST_NONE)
+
+        for length in self._wildcard_lengths:
+            if length > len(name):
+                break
+
+            prefix_masks = self._wildcard_masks.get(name[:length])
+            if prefix_masks is not None:
+                masks = _combine_masks(masks, prefix_masks)
+
+        exact_masks = self._exact_masks.get(name)
+        if exact_masks is not None:
+            masks = _combine_masks(masks, exact_masks)
+
+        return masks
+
     def apply(self, name, default_destinations):
         if self.enabled_destinations == DST_NONE:
             return DST_NONE
 
-        cache_index = (name, default_destinations)
+        masks = self.cache.get(name)
 
-        if cache_index in self.cache:
-            return self.cache[cache_index]
+        if masks is None:
+            masks = self._name_masks(name)
 
-        destinations = self.enabled_destinations & default_destinations
+            if len(self.cache) >= self.CACHE_MAXIMUM:
+                self.cache.clear()
 
-        for rule in self.rules:
-            if rule.name_match(name):
-                if rule.is_include:
-                    inc_dest = rule.destinations & self.enabled_destinations
-                    destinations |= inc_dest
-                else:
-                    destinations &= ~rule.destinations
-
-        self.cache[cache_index] = destinations
-        return destinations
+            self.cache[name] = masks
+
+        set_mask, clear_mask = masks
+
+        return (self.enabled_destinations & default_destinations & ~clear_mask) | set_mask
 
 
 class AttributeFilterRule(object):
@@ -135,6 +135,10 @@ class GCRuntimeMetricsSettings(Settings):
     enabled = False
 
 
+class HighFrequencySamplingSettings(Settings):
+    pass
+
+
 class MachineLearningSettings(Settings):
     pass
 
@@ -155,6 +159,10 @@ class ThreadProfilerSettings(Settings):
     pass
 
 
+class TraceCacheSettings(Settings):
+    pass
+
+
 class TransactionTracerSettings(Settings):
     pass
 
@@ -197,6 +205,22 @@ class SlowSqlSettings(Settings):
     pass
 
 
+class StatsEngineSettings(Settings):
+    pass
+
+
+class StatsEngineShardingSettings(Settings):
+    pass
+
+
+class StatsEngineDeferredRecordingSettings(Settings):
+    pass
+
+
+class HarvestPipelineSettings(Settings):
+    pass
+
+
 class AgentLimitsSettings(Settings):
     pass
 
@@ -305,6 +329,10 @@ class ApplicationLoggingForwardingContextDataSettings(Settings):
     pass
 
 
+class ApplicationLoggingForwardingDeferredSettings(Settings):
+    pass
+
+
 class ApplicationLoggingMetricsSettings(Settings):
     pass
 
@@ -378,6 +406,10 @@ class InstrumentationGraphQLSettings(Settings):
     pass
 
 
+class InstrumentationGraphQLResolverRollupSettings(Settings):
+    pass
+
+
 class EventHarvestConfigSettings(Settings):
     nested = True
     _lock = threading.Lock()
@@ -403,6 +435,7 @@ _settings.agent_limits = AgentLimitsSettings()
 _settings.application_logging = ApplicationLoggingSettings()
 _settings.application_logging.forwarding = ApplicationLoggingForwardingSettings()
 _settings.application_logging.forwarding.context_data = ApplicationLoggingForwardingContextDataSettings()
+_settings.application_logging.forwarding.deferred = ApplicationLoggingForwardingDeferredSettings()
 _settings.application_logging.metrics = ApplicationLoggingMetricsSettings()
 _settings.application_logging.local_decorating = ApplicationLoggingLocalDecoratingSettings()
 _settings.application_logging.metrics = ApplicationLoggingMetricsSettings()
@@ -429,9 +462,11 @@ _settings.event_harvest_config.harvest_limits = EventHarvestConfigHarvestLimitSe
 _settings.event_loop_visibility = EventLoopVisibilitySettings()
 _settings.gc_runtime_metrics = GCRuntimeMetricsSettings()
 _settings.heroku = HerokuSettings()
+_settings.high_frequency_sampling = HighFrequencySamplingSettings()
 _settings.infinite_tracing = InfiniteTracingSettings()
 _settings.instrumentation = InstrumentationSettings()
 _settings.instrumentation.graphql = InstrumentationGraphQLSettings()
+_settings.instrumentation.graphql.resolver_rollup = InstrumentationGraphQLResolverRollupSettings()
 _settings.message_tracer = MessageTracerSettings()
 _settings.process_host = ProcessHostSettings()
 _settings.rum = RumSettings()
@@ -439,9 +474,14 @@ _settings.serverless_mode = ServerlessModeSettings()
 _settings.slow_sql = SlowSqlSettings()
 _settings.span_events = SpanEventSettings()
 _settings.span_events.attributes = SpanEventAttributesSettings()
+_settings.stats_engine = StatsEngineSettings()
+_settings.stats_engine.sharding = StatsEngineShardingSettings()
+_settings.stats_engine.deferred_recording = StatsEngineDeferredRecordingSettings()
+_settings.harvest_pipeline = HarvestPipelineSettings()
 _settings.strip_exception_messages = StripExceptionMessageSettings()
 _settings.synthetics = SyntheticsSettings()
 _settings.thread_profiler = ThreadProfilerSettings()
+_settings.trace_cache = TraceCacheSettings()
 _settings.transaction_events = TransactionEventsSettings()
 _settings.transaction_events.attributes = TransactionEventsAttributesSettings()
 _settings.transaction_metrics = TransactionMetricsSettings()
@@ -721,6 +761,12 @@ _settings.cross_application_tracer.enabled = False
 
 _settings.gc_runtime_metrics.enabled = False
 _settings.gc_runtime_metrics.top_object_count_limit = 5
+_settings.gc_runtime_metrics.top_object_sample_size = 100000
+
+_settings.high_frequency_sampling.enabled = _environ_as_bool("NEW_RELIC_HIGH_FREQUENCY_SAMPLING_ENABLED", default=False)
+_settings.high_frequency_sampling.interval = _environ_as_float("NEW_RELIC_HIGH_FREQUENCY_SAMPLING_INTERVAL", 0.25)
+_settings.high_frequency_sampling.buffer_size = _environ_as_int("NEW_RELIC_HIGH_FREQUENCY_SAMPLING_BUFFER_SIZE", 512)
+_settings.trace_cache.backend = os.environ.get("NEW_RELIC_TRACE_CACHE_BACKEND", "weakref")
 
 _settings.transaction_events.enabled = True
 _settings.transaction_events.attributes.enabled = True
@@ -784,9 +830,21 @@ _settings.slow_sql.enabled = True
 
 _settings.synthetics.enabled = True
 
+_settings.stats_engine.sharding.enabled = _environ_as_bool("NEW_RELIC_STATS_ENGINE_SHARDING_ENABLED", default=False)
+_settings.stats_engine.deferred_recording.enabled = _environ_as_bool(
+    "NEW_RELIC_STATS_ENGINE_DEFERRED_RECORDING_ENABLED", default=False
+)
+_settings.stats_engine.deferred_recording.queue_size = _environ_as_int(
+    "NEW_RELIC_STATS_ENGINE_DEFERRED_RECORDING_QUEUE_SIZE", 1000
+)
+
+_settings.harvest_pipeline.enabled = _environ_as_bool("NEW_RELIC_HARVEST_PIPELINE_ENABLED", default=False)
+_settings.harvest_pipeline.max_workers = _environ_as_int("NEW_RELIC_HARVEST_PIPELINE_MAX_WORKERS", 4)
+
 _settings.agent_limits.data_collector_timeout = 30.0
 _settings.agent_limits.transaction_traces_nodes = 2000
 _settings.agent_limits.sql_query_length_maximum = 16384
+_settings.agent_limits.sql_statement_cache_size = 1000
 _settings.agent_limits.slow_sql_stack_trace = 30
 _settings.agent_limits.max_sql_connections = 4
 _settings.agent_limits.sql_explain_plans = 30
@@ -808,10 +866,21 @@ _settings.infinite_tracing.compression = _environ_as_bool("NEW_RELIC_INFINITE_TR
 _settings.infinite_tracing.batching = _environ_as_bool("NEW_RELIC_INFINITE_TRACING_BATCHING", default=True)
 _settings.infinite_tracing.ssl = True
 _settings.infinite_tracing.span_queue_size = _environ_as_int("NEW_RELIC_INFINITE_TRACING_SPAN_QUEUE_SIZE", 10000)
+_settings.infinite_tracing.adaptive_batching = _environ_as_bool(
+    "NEW_RELIC_INFINITE_TRACING_ADAPTIVE_BATCHING", default=False
+)
+_settings.infinite_tracing.max_batch_bytes = _environ_as_int("NEW_RELIC_INFINITE_TRACING_MAX_BATCH_BYTES", 512 * 1024)
+_settings.infinite_tracing.max_batch_age = _environ_as_float("NEW_RELIC_INFINITE_TRACING_MAX_BATCH_AGE", 0.5)
 
 _settings.instrumentation.graphql.capture_introspection_queries = os.environ.get(
     "NEW_RELIC_INSTRUMENTATION_GRAPHQL_CAPTURE_INTROSPECTION_QUERIES", False
 )
+_settings.instrumentation.graphql.resolver_rollup.enabled = _environ_as_bool(
+    "NEW_RELIC_INSTRUMENTATION_GRAPHQL_RESOLVER_ROLLUP_ENABLED", default=False
+)
+_settings.instrumentation.graphql.resolver_rollup.threshold = _environ_as_float(
+    "NEW_RELIC_INSTRUMENTATION_GRAPHQL_RESOLVER_ROLLUP_THRESHOLD", 0.005
+)
 
 _settings.event_harvest_config.harvest_limits.analytic_event_data = _environ_as_int(
     "NEW_RELIC_ANALYTICS_EVENTS_MAX_SAMPLES_STORED", DEFAULT_RESERVOIR_SIZE
@@ -908,6 +977,12 @@ _settings.application_logging.forwarding.context_data.include = _environ_as_set(
 _settings.application_logging.forwarding.context_data.exclude = _environ_as_set(
     "NEW_RELIC_APPLICATION_LOGGING_FORWARDING_CONTEXT_DATA_EXCLUDE", default=""
 )
+_settings.application_logging.forwarding.deferred.enabled = _environ_as_bool(
+    "NEW_RELIC_APPLICATION_LOGGING_FORWARDING_DEFERRED_ENABLED", default=False
+)
+_settings.application_logging.forwarding.deferred.queue_size = _environ_as_int(
+    "NEW_RELIC_APPLICATION_LOGGING_FORWARDING_DEFERRED_QUEUE_SIZE", 10000
+)
 _settings.application_logging.metrics.enabled = _environ_as_bool(
     "NEW_RELIC_APPLICATION_LOGGING_METRICS_ENABLED", default=True
 )
@@ -60,22 +60,18 @@ class ContextOf(object):
             self.thread_id = self.trace_cache.current_thread_id()
 
             # Save previous cache contents
-            self.restore = self.trace_cache.get(self.thread_id, None)
+            self.restore = self.trace_cache.current_trace()
             self.should_restore = True
 
             # Set context in trace cache
-            self.trace_cache[self.thread_id] = self.trace
+            self.trace_cache.set_current_trace(self.thread_id, self.trace)
 
         return self
 
     def __exit__(self, exc, value, tb):
         if self.should_restore:
-            if self.restore is not None:
-                # Restore previous contents
-                self.trace_cache[self.thread_id] = self.restore
-            else:
-                # Remove entry from cache
-                self.trace_cache.pop(self.thread_id)
+            # Restore previous contents, or remove entry from cache
+            self.trace_cache.set_current_trace(self.thread_id, self.restore)
 
 
 def context_wrapper(func, trace=None, request=None, trace_cache_id=None, strict=True):
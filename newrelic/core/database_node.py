@@ -126,9 +126,9 @@ class DatabaseNode(_DatabaseNode, DatastoreNodeMixin):
             self.sql_format,
         )
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        database node as well as all the child nodes.
+        database node.
 
         """
 
@@ -231,7 +231,7 @@ class DatabaseNode(_DatabaseNode, DatastoreNodeMixin):
             params=params,
         )
 
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
         name = root.string_table.cache(self.name)
 
         start_time = newrelic.core.trace_node.node_start_time(root, self)
@@ -19,7 +19,9 @@ explain plans for SQL etc.
 
 import logging
 import re
-import weakref
+import threading
+
+from collections import OrderedDict
 
 import newrelic.packages.six as six
 
@@ -89,26 +91,50 @@ _bool_p = r'\b(?:true|false|null)\b'
 _all_literals_p = '(' + ')|('.join([_uuid_p, _hex_p, _int_p, _bool_p]) + ')'
 _all_literals_re = re.compile(_all_literals_p, re.IGNORECASE)
 
+# So that quoted strings and literals can be substituted in a single pass
+# they are combined into the one regular expression for each quoting
+# style. Quoted strings come first so they take precedence. As the
+# quoting patterns are case sensitive, the literal patterns are spelt
+# out in a case insensitive form rather than using the IGNORECASE flag.
+#
+# None of the characters which can start a quoted string can occur in a
+# literal, so this gives the same result as substituting quoted strings
+# and then literals in turn. The one exception is an Oracle quoted string
+# directly following a boolean literal, as the 'q' is a word character
+# but the '?' replacing the quoted string is not. The word boundary at
+# the end of the boolean literal is therefore extended to also match
+# where an Oracle quoted string follows.
+
+_uuid_cs_p = r'\{?(?:[0-9a-fA-F]\-?){32}\}?'
+_int_cs_p = r'(?<!:)-?\b(?:[0-9]+\.)?[0-9]+([eE][+-]?[0-9]+)?'
+_hex_cs_p = r'0[xX][0-9a-fA-F]+'
+_bool_cs_p = r'\b(?:[tT][rR][uU][eE]|[fF][aA][lL][sS][eE]|[nN][uU][lL][lL])\b'
+_bool_oracle_cs_p = r'\b(?:[tT][rR][uU][eE]|[fF][aA][lL][sS][eE]|[nN][uU][lL][lL])(?:\b|(?=' + _oracle_quotes_p + '))'
+
+_all_literals_cs_p = '(' + ')|('.join([_uuid_cs_p, _hex_cs_p, _int_cs_p, _bool_cs_p]) + ')'
+_oracle_literals_cs_p = '(' + ')|('.join([_uuid_cs_p, _hex_cs_p, _int_cs_p, _bool_oracle_cs_p]) + ')'
+
+_single_quotes_literals_re = re.compile(_single_quotes_p + '|' + _all_literals_cs_p)
+_any_quotes_literals_re = re.compile(_any_quotes_p + '|' + _all_literals_cs_p)
+_single_dollar_literals_re = re.compile(_single_dollar_p + '|' + _all_literals_cs_p)
+_single_oracle_literals_re = re.compile(_single_oracle_p + '|' + _oracle_literals_cs_p)
+
 _quotes_table = {
-    'single': (_single_quotes_re, _single_quotes_cleanup_re),
-    'single+double': (_any_quotes_re, _any_quotes_cleanup_re),
-    'single+dollar': (_single_dollar_re, _single_dollar_cleanup_re),
-    'single+oracle': (_single_oracle_re, _single_quotes_cleanup_re),
+    'single': (_single_quotes_literals_re, _single_quotes_cleanup_re),
+    'single+double': (_any_quotes_literals_re, _any_quotes_cleanup_re),
+    'single+dollar': (_single_dollar_literals_re, _single_dollar_cleanup_re),
+    'single+oracle': (_single_oracle_literals_re, _single_quotes_cleanup_re),
 }
 
 
 def _obfuscate_sql(sql, database):
     quotes_re, quotes_cleanup_re = _quotes_table.get(database.quoting_style,
-            (_single_quotes_re, _single_quotes_cleanup_re))
+            (_single_quotes_literals_re, _single_quotes_cleanup_re))
 
-    # Substitute quoted strings first.
+    # Substitute quoted strings and all other sensitive fields.
 
     sql = quotes_re.sub('?', sql)
 
-    # Replace all other sensitive fields
-
-    sql = _all_literals_re.sub('?', sql)
-
     # Determine if the obfuscated query was malformed by searching for
     # remaining quote characters
 
@@ -148,10 +174,8 @@ _normalize_values_re = re.compile(_normalize_values_p)
 
 _normalize_whitespace_1_p = r'\s+'
 _normalize_whitespace_1_re = re.compile(_normalize_whitespace_1_p)
-_normalize_whitespace_2_p = r'\s+(?!\w)'
+_normalize_whitespace_2_p = r'\s+(?!\w)|(?<!\w)\s+'
 _normalize_whitespace_2_re = re.compile(_normalize_whitespace_2_p)
-_normalize_whitespace_3_p = r'(?<!\w)\s+'
-_normalize_whitespace_3_re = re.compile(_normalize_whitespace_3_p)
 
 
 def _normalize_sql(sql):
@@ -182,10 +206,11 @@ def _normalize_sql(sql):
     sql = _normalize_whitespace_1_re.sub(' ', sql)
 
     # Drop spaces adjacent to identifier except for case where
-    # identifiers follow each other.
+    # identifiers follow each other. As white space has already been
+    # collapsed, dropping those spaces not followed by an identifier
+    # and those not preceded by one can be done in a single pass.
 
     sql = _normalize_whitespace_2_re.sub('', sql)
-    sql = _normalize_whitespace_3_re.sub('', sql)
 
     return sql
 
@@ -888,13 +913,52 @@ class SQLStatement(object):
             return self.obfuscated
 
 
-_sql_statements = weakref.WeakValueDictionary()
+class SQLStatementCache(object):
+    """A bounded cache of SQL statements, keyed on the SQL and the
+    database module it was executed against. Applications typically
+    execute the same statements over and over, so holding on to the
+    statements means the obfuscated and normalized forms, operation and
+    target need only be derived once. When the cache is full, the least
+    recently used statement is discarded.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._statements = OrderedDict()
+
+    def __len__(self):
+        return len(self._statements)
+
+    def get(self, key):
+        with self._lock:
+            result = self._statements.pop(key, None)
+            if result is not None:
+                self._statements[key] = result
+            return result
+
+    def put(self, key, statement, maximum):
+        if maximum <= 0:
+            return
+
+        with self._lock:
+            self._statements.pop(key, None)
+            self._statements[key] = statement
+            while len(self._statements) > maximum:
+                self._statements.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+
+
+_sql_statements = SQLStatementCache()
 
 
 def sql_statement(sql, dbapi2_module):
     key = (sql, dbapi2_module)
 
-    result = _sql_statements.get(key, None)
+    result = _sql_statements.get(key)
 
     if result is not None:
         return result
@@ -902,6 +966,12 @@ def sql_statement(sql, dbapi2_module):
     database = SQLDatabase(dbapi2_module)
     result = SQLStatement(sql, database)
 
-    _sql_statements[key] = result
+    # Very long statements are unlikely to be repeated and would hold on
+    # to a lot of memory, so are not cached.
+
+    limits = global_settings().agent_limits
+
+    if len(sql) <= limits.sql_query_length_maximum:
+        _sql_statements.put(key, result, limits.sql_statement_cache_size)
 
     return result
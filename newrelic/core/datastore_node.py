@@ -36,9 +36,9 @@ class DatastoreNode(_DatastoreNode, DatastoreNodeMixin):
             hostname = self.host
         return hostname
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        database node as well as all the child nodes.
+        database node.
 
         """
 
@@ -108,7 +108,7 @@ class DatastoreNode(_DatastoreNode, DatastoreNodeMixin):
             yield TimeMetric(name=instance_metric_name, scope='',
                     duration=self.duration, exclusive=self.exclusive)
 
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
         name = root.string_table.cache(self.name)
 
         start_time = newrelic.core.trace_node.node_start_time(root, self)
@@ -87,9 +87,9 @@ class ExternalNode(_ExternalNode, GenericNodeMixin):
         netloc = port and ('%s:%s' % (hostname, port)) or hostname
         return netloc
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        external node as well as all the child nodes.
+        external node.
 
         """
 
@@ -147,7 +147,7 @@ class ExternalNode(_ExternalNode, GenericNodeMixin):
             yield TimeMetric(name=name, scope='', duration=self.duration,
                     exclusive=self.exclusive)
 
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
 
         netloc = self.netloc
 
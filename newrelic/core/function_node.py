@@ -29,9 +29,12 @@ _FunctionNode = namedtuple('_FunctionNode',
 
 class FunctionNode(_FunctionNode, GenericNodeMixin):
 
-    def time_metrics(self, stats, root, parent):
+    time_metrics_children = True
+    trace_node_children = True
+
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        function node as well as all the child nodes.
+        function node.
 
         """
 
@@ -81,13 +84,7 @@ class FunctionNode(_FunctionNode, GenericNodeMixin):
                     yield TimeMetric(name=rollup, scope=root.type,
                             duration=self.duration, exclusive=None)
 
-        # Now for the children.
-
-        for child in self.children:
-            for metric in child.time_metrics(stats, root, self):
-                yield metric
-
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
 
         name = '%s/%s' % (self.group, self.name)
 
@@ -100,11 +97,6 @@ class FunctionNode(_FunctionNode, GenericNodeMixin):
 
         children = []
 
-        for child in self.children:
-            if root.trace_node_count > root.trace_node_limit:
-                break
-            children.append(child.trace_node(stats, root, connections))
-
         params = self.get_trace_segment_params(
                 root.settings, params=self.params)
 
@@ -29,8 +29,16 @@ _GraphQLResolverNode = namedtuple('_GraphQLNode',
     ['field_name', 'children', 'start_time', 'end_time', 'duration', 
     'exclusive', 'guid', 'agent_attributes', 'user_attributes', 'product'])
 
+_GraphQLResolverRollupNode = namedtuple('_GraphQLNode',
+    ['field_name', 'children', 'start_time', 'end_time', 'duration',
+    'exclusive', 'guid', 'agent_attributes', 'user_attributes', 'product',
+    'durations'])
+
 class GraphQLNodeMixin(GenericNodeMixin):
-    def trace_node(self, stats, root, connections):
+    time_metrics_children = True
+    trace_node_children = True
+
+    def own_trace_node(self, stats, root, connections):
         name = root.string_table.cache(self.name)
 
         start_time = newrelic.core.trace_node.node_start_time(root, self)
@@ -40,13 +48,6 @@ class GraphQLNodeMixin(GenericNodeMixin):
 
         children = []
 
-        # Now for the children
-
-        for child in self.children:
-            if root.trace_node_count > root.trace_node_limit:
-                break
-            children.append(child.trace_node(stats, root, connections))
-
         # Agent attributes
         params = self.get_trace_segment_params(root.settings)
 
@@ -64,9 +65,9 @@ class GraphQLResolverNode(_GraphQLResolverNode, GraphQLNodeMixin):
 
         return name
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        database node as well as all the child nodes.
+        database node.
         """
 
         field_name = self.field_name or "<unknown>"
@@ -82,11 +83,37 @@ class GraphQLResolverNode(_GraphQLResolverNode, GraphQLNodeMixin):
         yield TimeMetric(name=field_resolver_metric_name, scope='', duration=self.duration,
                          exclusive=self.exclusive)
 
-        # Now for the children
 
-        for child in self.children:
-            for metric in child.time_metrics(stats, root, self):
-                yield metric
+class GraphQLResolverRollupNode(_GraphQLResolverRollupNode, GraphQLNodeMixin):
+    """A node standing in for every resolution of a field which was
+    rolled up into the operation rather than traced on its own.
+
+    """
+
+    @property
+    def name(self):
+        field_name = self.field_name or "<unknown>"
+        product = self.product
+
+        name = 'GraphQL/resolve/%s/%s' % (product, field_name)
+
+        return name
+
+    def own_time_metrics(self, stats, root, parent):
+        """Return a generator yielding the timed metrics for each of
+        the resolutions rolled up into this node.
+
+        """
+
+        field_resolver_metric_name = self.name
+        scope = root.path
+
+        for duration in self.durations:
+            yield TimeMetric(name=field_resolver_metric_name, scope=scope, duration=duration,
+                             exclusive=duration)
+
+            yield TimeMetric(name=field_resolver_metric_name, scope='', duration=duration,
+                             exclusive=duration)
 
 
 class GraphQLOperationNode(_GraphQLOperationNode, GraphQLNodeMixin):
@@ -102,9 +129,9 @@ class GraphQLOperationNode(_GraphQLOperationNode, GraphQLNodeMixin):
 
         return name
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        database node as well as all the child nodes.
+        database node.
 
         """
 
@@ -148,9 +175,3 @@ class GraphQLOperationNode(_GraphQLOperationNode, GraphQLNodeMixin):
 
         yield TimeMetric(name=operation_metric_name, scope='',
                 duration=self.duration, exclusive=self.exclusive)
-
-        # Now for the children
-
-        for child in self.children:
-            for metric in child.time_metrics(stats, root, self):
-                yield metric
\ No newline at end of file
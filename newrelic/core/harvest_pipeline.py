@@ -0,0 +1,142 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""This module implements the sending of the data for a harvest to the
+data collector. Sends for independent endpoints can optionally be made
+concurrently on a bounded set of worker threads, so that a slow round
+trip for one endpoint does not delay the others.
+
+"""
+
+import logging
+import sys
+import threading
+
+from newrelic.core.internal_metrics import InternalTraceContext
+from newrelic.core.stats_engine import CustomMetrics
+from newrelic.network.exceptions import ForceAgentDisconnect, ForceAgentRestart
+from newrelic.packages import six
+
+_logger = logging.getLogger(__name__)
+
+
+class HarvestPipeline(object):
+    """Queues the sends for a harvest and performs them when flushed.
+
+    With a single worker, sends are made in turn on the calling thread
+    and the first failure aborts those remaining, as when calling the
+    session directly. With more than one worker, all queued sends are
+    attempted concurrently and any failure is raised once they have all
+    completed.
+
+    The on_success callback for a send is always called on the thread
+    doing the flush, and only if the send succeeded. It is where the data
+    which was sent should be reset, so that data for any failed sends is
+    still present should the harvest be rolled back.
+
+    """
+
+    def __init__(self, internal_metrics, max_workers=1):
+        self._internal_metrics = internal_metrics
+        self._max_workers = max_workers
+        self._uploads = []
+
+    def send(self, func, args=(), on_success=None):
+        """Queues a call of func with args to send data to the data
+        collector.
+
+        """
+
+        self._uploads.append((func, args, on_success))
+
+    def flush(self):
+        """Performs all queued sends, returning once they have all
+        completed.
+
+        """
+
+        uploads, self._uploads = self._uploads, []
+
+        if self._max_workers <= 1 or len(uploads) <= 1:
+            for func, args, on_success in uploads:
+                func(*args)
+                if on_success is not None:
+                    on_success()
+            return
+
+        results = [None] * len(uploads)
+        pending = list(enumerate(uploads))
+        pending.reverse()
+        worker_metrics = []
+        lock = threading.Lock()
+
+        def _worker():
+            # Internal metrics are recorded against a thread local
+            # context, so each worker records into its own metrics table
+            # which is merged in once all workers have completed.
+
+            metrics = CustomMetrics()
+            worker_metrics.append(metrics)
+
+            with InternalTraceContext(metrics):
+                while True:
+                    with lock:
+                        if not pending:
+                            return
+                        index, (func, args, _) = pending.pop()
+
+                    try:
+                        func(*args)
+                    except Exception:
+                        results[index] = sys.exc_info()
+
+        threads = []
+        for _ in range(min(self._max_workers, len(uploads))):
+            thread = threading.Thread(target=_worker, name="NR-Harvest-Upload-Thread")
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        for metrics in worker_metrics:
+            self._internal_metrics.merge_custom_metrics(metrics.metrics())
+
+        failures = []
+        for (_, _, on_success), exc_info in zip(uploads, results):
+            if exc_info is None:
+                if on_success is not None:
+                    on_success()
+            else:
+                failures.append(exc_info)
+
+        if not failures:
+            return
+
+        # Where the data collector has told us to restart or disconnect,
+        # that takes precedence over failures of other sends. Otherwise
+        # raise the failure for the first send queued.
+
+        exc_info = failures[0]
+        for failure in failures:
+            if issubclass(failure[0], (ForceAgentRestart, ForceAgentDisconnect)):
+                exc_info = failure
+                break
+
+        for failure in failures:
+            if failure is not exc_info:
+                _logger.debug("Concurrent send to the data collector failed with %r.", failure[1])
+
+        six.reraise(*exc_info)
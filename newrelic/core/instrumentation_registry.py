@@ -0,0 +1,674 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""This module holds the table of modules instrumented by the agent out
+of the box, giving for each the hook module and the function within it
+which instruments the target module.
+
+The import hooks for these are not all registered when the agent is
+initialized. Instead the table is consulted by the import hook finder as
+modules are imported, so only the instrumentation for modules which are
+actually used is set up.
+
+"""
+
+from newrelic.packages import six
+
+BUILTIN_IMPORT_HOOKS = {
+    "asyncio.base_events": ("newrelic.hooks.coroutines_asyncio", "instrument_asyncio_base_events"),
+    "asyncio.events": ("newrelic.hooks.coroutines_asyncio", "instrument_asyncio_events"),
+    "asgiref.sync": ("newrelic.hooks.adapter_asgiref", "instrument_asgiref_sync"),
+    "django.core.handlers.base": ("newrelic.hooks.framework_django", "instrument_django_core_handlers_base"),
+    "django.core.handlers.asgi": ("newrelic.hooks.framework_django", "instrument_django_core_handlers_asgi"),
+    "django.core.handlers.wsgi": ("newrelic.hooks.framework_django", "instrument_django_core_handlers_wsgi"),
+    "django.core.urlresolvers": ("newrelic.hooks.framework_django", "instrument_django_core_urlresolvers"),
+    "django.template": ("newrelic.hooks.framework_django", "instrument_django_template"),
+    "django.template.loader_tags": ("newrelic.hooks.framework_django", "instrument_django_template_loader_tags"),
+    "django.core.servers.basehttp": ("newrelic.hooks.framework_django", "instrument_django_core_servers_basehttp"),
+    "django.contrib.staticfiles.views": (
+        "newrelic.hooks.framework_django",
+        "instrument_django_contrib_staticfiles_views",
+    ),
+    "django.contrib.staticfiles.handlers": (
+        "newrelic.hooks.framework_django",
+        "instrument_django_contrib_staticfiles_handlers",
+    ),
+    "django.views.debug": ("newrelic.hooks.framework_django", "instrument_django_views_debug"),
+    "django.http.multipartparser": ("newrelic.hooks.framework_django", "instrument_django_http_multipartparser"),
+    "django.core.mail": ("newrelic.hooks.framework_django", "instrument_django_core_mail"),
+    "django.core.mail.message": ("newrelic.hooks.framework_django", "instrument_django_core_mail_message"),
+    "django.views.generic.base": ("newrelic.hooks.framework_django", "instrument_django_views_generic_base"),
+    "django.core.management.base": ("newrelic.hooks.framework_django", "instrument_django_core_management_base"),
+    "django.template.base": ("newrelic.hooks.framework_django", "instrument_django_template_base"),
+    "django.middleware.gzip": ("newrelic.hooks.framework_django", "instrument_django_gzip_middleware"),
+    # New modules in Django 1.10
+    "django.urls.resolvers": ("newrelic.hooks.framework_django", "instrument_django_core_urlresolvers"),
+    "django.urls.base": ("newrelic.hooks.framework_django", "instrument_django_urls_base"),
+    "django.core.handlers.exception": ("newrelic.hooks.framework_django", "instrument_django_core_handlers_exception"),
+    "falcon.api": ("newrelic.hooks.framework_falcon", "instrument_falcon_api"),
+    "falcon.app": ("newrelic.hooks.framework_falcon", "instrument_falcon_app"),
+    "falcon.routing.util": ("newrelic.hooks.framework_falcon", "instrument_falcon_routing_util"),
+    "fastapi.routing": ("newrelic.hooks.framework_fastapi", "instrument_fastapi_routing"),
+    "flask.app": ("newrelic.hooks.framework_flask", "instrument_flask_app"),
+    "flask.templating": ("newrelic.hooks.framework_flask", "instrument_flask_templating"),
+    "flask.blueprints": ("newrelic.hooks.framework_flask", "instrument_flask_blueprints"),
+    "flask.views": ("newrelic.hooks.framework_flask", "instrument_flask_views"),
+    "flask_compress": ("newrelic.hooks.middleware_flask_compress", "instrument_flask_compress"),
+    "flask_restful": ("newrelic.hooks.component_flask_rest", "instrument_flask_rest"),
+    "flask_restplus.api": ("newrelic.hooks.component_flask_rest", "instrument_flask_rest"),
+    "flask_restx.api": ("newrelic.hooks.component_flask_rest", "instrument_flask_rest"),
+    "graphql_server": ("newrelic.hooks.component_graphqlserver", "instrument_graphqlserver"),
+    "sentry_sdk.integrations.asgi": ("newrelic.hooks.component_sentry", "instrument_sentry_sdk_integrations_asgi"),
+    "gluon.compileapp": ("newrelic.hooks.framework_web2py", "instrument_gluon_compileapp"),
+    "gluon.restricted": ("newrelic.hooks.framework_web2py", "instrument_gluon_restricted"),
+    "gluon.main": ("newrelic.hooks.framework_web2py", "instrument_gluon_main"),
+    "gluon.template": ("newrelic.hooks.framework_web2py", "instrument_gluon_template"),
+    "gluon.tools": ("newrelic.hooks.framework_web2py", "instrument_gluon_tools"),
+    "gluon.http": ("newrelic.hooks.framework_web2py", "instrument_gluon_http"),
+    "httpx._client": ("newrelic.hooks.external_httpx", "instrument_httpx_client"),
+    "gluon.contrib.feedparser": ("newrelic.hooks.external_feedparser", "instrument"),
+    "gluon.contrib.memcache.memcache": ("newrelic.hooks.memcache_memcache", "instrument"),
+    "graphene.types.schema": ("newrelic.hooks.framework_graphene", "instrument_graphene_types_schema"),
+    "graphql.graphql": ("newrelic.hooks.framework_graphql", "instrument_graphql"),
+    "graphql.execution.execute": ("newrelic.hooks.framework_graphql", "instrument_graphql_execute"),
+    "graphql.execution.executor": ("newrelic.hooks.framework_graphql", "instrument_graphql_execute"),
+    "graphql.execution.middleware": ("newrelic.hooks.framework_graphql", "instrument_graphql_execution_middleware"),
+    "graphql.execution.utils": ("newrelic.hooks.framework_graphql", "instrument_graphql_execution_utils"),
+    "graphql.error.located_error": ("newrelic.hooks.framework_graphql", "instrument_graphql_error_located_error"),
+    "graphql.language.parser": ("newrelic.hooks.framework_graphql", "instrument_graphql_parser"),
+    "graphql.validation.validate": ("newrelic.hooks.framework_graphql", "instrument_graphql_validate"),
+    "graphql.validation.validation": ("newrelic.hooks.framework_graphql", "instrument_graphql_validate"),
+    "google.cloud.firestore_v1.base_client": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_base_client",
+    ),
+    "google.cloud.firestore_v1.client": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_client",
+    ),
+    "google.cloud.firestore_v1.async_client": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_async_client",
+    ),
+    "google.cloud.firestore_v1.document": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_document",
+    ),
+    "google.cloud.firestore_v1.async_document": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_async_document",
+    ),
+    "google.cloud.firestore_v1.collection": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_collection",
+    ),
+    "google.cloud.firestore_v1.async_collection": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_async_collection",
+    ),
+    "google.cloud.firestore_v1.query": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_query",
+    ),
+    "google.cloud.firestore_v1.async_query": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_async_query",
+    ),
+    "google.cloud.firestore_v1.aggregation": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_aggregation",
+    ),
+    "google.cloud.firestore_v1.async_aggregation": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_async_aggregation",
+    ),
+    "google.cloud.firestore_v1.batch": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_batch",
+    ),
+    "google.cloud.firestore_v1.async_batch": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_async_batch",
+    ),
+    "google.cloud.firestore_v1.bulk_batch": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_bulk_batch",
+    ),
+    "google.cloud.firestore_v1.transaction": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_transaction",
+    ),
+    "google.cloud.firestore_v1.async_transaction": (
+        "newrelic.hooks.datastore_firestore",
+        "instrument_google_cloud_firestore_v1_async_transaction",
+    ),
+    "ariadne.asgi": ("newrelic.hooks.framework_ariadne", "instrument_ariadne_asgi"),
+    "ariadne.graphql": ("newrelic.hooks.framework_ariadne", "instrument_ariadne_execute"),
+    "ariadne.wsgi": ("newrelic.hooks.framework_ariadne", "instrument_ariadne_wsgi"),
+    "grpc._channel": ("newrelic.hooks.framework_grpc", "instrument_grpc__channel"),
+    "grpc._server": ("newrelic.hooks.framework_grpc", "instrument_grpc_server"),
+    "pylons.wsgiapp": ("newrelic.hooks.framework_pylons", "instrument"),
+    "pylons.controllers.core": ("newrelic.hooks.framework_pylons", "instrument"),
+    "pylons.templating": ("newrelic.hooks.framework_pylons", "instrument"),
+    "bottle": ("newrelic.hooks.framework_bottle", "instrument_bottle"),
+    "cherrypy._cpreqbody": ("newrelic.hooks.framework_cherrypy", "instrument_cherrypy__cpreqbody"),
+    "cherrypy._cprequest": ("newrelic.hooks.framework_cherrypy", "instrument_cherrypy__cprequest"),
+    "cherrypy._cpdispatch": ("newrelic.hooks.framework_cherrypy", "instrument_cherrypy__cpdispatch"),
+    "cherrypy._cpwsgi": ("newrelic.hooks.framework_cherrypy", "instrument_cherrypy__cpwsgi"),
+    "cherrypy._cptree": ("newrelic.hooks.framework_cherrypy", "instrument_cherrypy__cptree"),
+    "confluent_kafka.cimpl": ("newrelic.hooks.messagebroker_confluentkafka", "instrument_confluentkafka_cimpl"),
+    "confluent_kafka.serializing_producer": (
+        "newrelic.hooks.messagebroker_confluentkafka",
+        "instrument_confluentkafka_serializing_producer",
+    ),
+    "confluent_kafka.deserializing_consumer": (
+        "newrelic.hooks.messagebroker_confluentkafka",
+        "instrument_confluentkafka_deserializing_consumer",
+    ),
+    "kafka.consumer.group": ("newrelic.hooks.messagebroker_kafkapython", "instrument_kafka_consumer_group"),
+    "kafka.producer.kafka": ("newrelic.hooks.messagebroker_kafkapython", "instrument_kafka_producer"),
+    "kafka.coordinator.heartbeat": ("newrelic.hooks.messagebroker_kafkapython", "instrument_kafka_heartbeat"),
+    "logging": ("newrelic.hooks.logger_logging", "instrument_logging"),
+    "loguru": ("newrelic.hooks.logger_loguru", "instrument_loguru"),
+    "loguru._logger": ("newrelic.hooks.logger_loguru", "instrument_loguru_logger"),
+    "structlog._base": ("newrelic.hooks.logger_structlog", "instrument_structlog__base"),
+    "structlog._frames": ("newrelic.hooks.logger_structlog", "instrument_structlog__frames"),
+    "paste.httpserver": ("newrelic.hooks.adapter_paste", "instrument_paste_httpserver"),
+    "gunicorn.app.base": ("newrelic.hooks.adapter_gunicorn", "instrument_gunicorn_app_base"),
+    "cx_Oracle": ("newrelic.hooks.database_cx_oracle", "instrument_cx_oracle"),
+    "ibm_db_dbi": ("newrelic.hooks.database_ibm_db_dbi", "instrument_ibm_db_dbi"),
+    "mysql.connector": ("newrelic.hooks.database_mysql", "instrument_mysql_connector"),
+    "MySQLdb": ("newrelic.hooks.database_mysqldb", "instrument_mysqldb"),
+    "oursql": ("newrelic.hooks.database_oursql", "instrument_oursql"),
+    "pymysql": ("newrelic.hooks.database_pymysql", "instrument_pymysql"),
+    "pyodbc": ("newrelic.hooks.database_pyodbc", "instrument_pyodbc"),
+    "pymssql": ("newrelic.hooks.database_pymssql", "instrument_pymssql"),
+    "psycopg2": ("newrelic.hooks.database_psycopg2", "instrument_psycopg2"),
+    "psycopg2._psycopg2": ("newrelic.hooks.database_psycopg2", "instrument_psycopg2__psycopg2"),
+    "psycopg2.extensions": ("newrelic.hooks.database_psycopg2", "instrument_psycopg2_extensions"),
+    "psycopg2._json": ("newrelic.hooks.database_psycopg2", "instrument_psycopg2__json"),
+    "psycopg2._range": ("newrelic.hooks.database_psycopg2", "instrument_psycopg2__range"),
+    "psycopg2.sql": ("newrelic.hooks.database_psycopg2", "instrument_psycopg2_sql"),
+    "psycopg2ct": ("newrelic.hooks.database_psycopg2ct", "instrument_psycopg2ct"),
+    "psycopg2ct.extensions": ("newrelic.hooks.database_psycopg2ct", "instrument_psycopg2ct_extensions"),
+    "psycopg2cffi": ("newrelic.hooks.database_psycopg2cffi", "instrument_psycopg2cffi"),
+    "psycopg2cffi.extensions": ("newrelic.hooks.database_psycopg2cffi", "instrument_psycopg2cffi_extensions"),
+    "asyncpg.connect_utils": ("newrelic.hooks.database_asyncpg", "instrument_asyncpg_connect_utils"),
+    "asyncpg.protocol": ("newrelic.hooks.database_asyncpg", "instrument_asyncpg_protocol"),
+    "postgresql.driver.dbapi20": ("newrelic.hooks.database_postgresql", "instrument_postgresql_driver_dbapi20"),
+    "postgresql.interface.proboscis.dbapi2": (
+        "newrelic.hooks.database_postgresql",
+        "instrument_postgresql_interface_proboscis_dbapi2",
+    ),
+    "sqlite3": ("newrelic.hooks.database_sqlite", "instrument_sqlite3"),
+    "sqlite3.dbapi2": ("newrelic.hooks.database_sqlite", "instrument_sqlite3_dbapi2"),
+    "pysqlite2": ("newrelic.hooks.database_sqlite", "instrument_sqlite3"),
+    "pysqlite2.dbapi2": ("newrelic.hooks.database_sqlite", "instrument_sqlite3_dbapi2"),
+    "memcache": ("newrelic.hooks.datastore_memcache", "instrument_memcache"),
+    "umemcache": ("newrelic.hooks.datastore_umemcache", "instrument_umemcache"),
+    "pylibmc.client": ("newrelic.hooks.datastore_pylibmc", "instrument_pylibmc_client"),
+    "bmemcached.client": ("newrelic.hooks.datastore_bmemcached", "instrument_bmemcached_client"),
+    "pymemcache.client": ("newrelic.hooks.datastore_pymemcache", "instrument_pymemcache_client"),
+    "jinja2.environment": ("newrelic.hooks.template_jinja2", "instrument"),
+    "mako.runtime": ("newrelic.hooks.template_mako", "instrument_mako_runtime"),
+    "mako.template": ("newrelic.hooks.template_mako", "instrument_mako_template"),
+    "genshi.template.base": ("newrelic.hooks.template_genshi", "instrument"),
+    "httplib2": ("newrelic.hooks.external_httplib2", "instrument"),
+    "urllib3.connectionpool": ("newrelic.hooks.external_urllib3", "instrument_urllib3_connectionpool"),
+    "urllib3.connection": ("newrelic.hooks.external_urllib3", "instrument_urllib3_connection"),
+    "requests.packages.urllib3.connection": ("newrelic.hooks.external_urllib3", "instrument_urllib3_connection"),
+    "starlette.requests": ("newrelic.hooks.framework_starlette", "instrument_starlette_requests"),
+    "starlette.routing": ("newrelic.hooks.framework_starlette", "instrument_starlette_routing"),
+    "starlette.applications": ("newrelic.hooks.framework_starlette", "instrument_starlette_applications"),
+    "starlette.middleware.errors": ("newrelic.hooks.framework_starlette", "instrument_starlette_middleware_errors"),
+    "starlette.middleware.exceptions": (
+        "newrelic.hooks.framework_starlette",
+        "instrument_starlette_middleware_exceptions",
+    ),
+    "starlette.exceptions": ("newrelic.hooks.framework_starlette", "instrument_starlette_exceptions"),
+    "starlette.background": ("newrelic.hooks.framework_starlette", "instrument_starlette_background_task"),
+    "starlette.concurrency": ("newrelic.hooks.framework_starlette", "instrument_starlette_concurrency"),
+    "strawberry.asgi": ("newrelic.hooks.framework_strawberry", "instrument_strawberry_asgi"),
+    "strawberry.schema.schema": ("newrelic.hooks.framework_strawberry", "instrument_strawberry_schema"),
+    "strawberry.schema.schema_converter": (
+        "newrelic.hooks.framework_strawberry",
+        "instrument_strawberry_schema_converter",
+    ),
+    "uvicorn.config": ("newrelic.hooks.adapter_uvicorn", "instrument_uvicorn_config"),
+    "hypercorn.asyncio.run": ("newrelic.hooks.adapter_hypercorn", "instrument_hypercorn_asyncio_run"),
+    "hypercorn.trio.run": ("newrelic.hooks.adapter_hypercorn", "instrument_hypercorn_trio_run"),
+    "hypercorn.utils": ("newrelic.hooks.adapter_hypercorn", "instrument_hypercorn_utils"),
+    "daphne.server": ("newrelic.hooks.adapter_daphne", "instrument_daphne_server"),
+    "sanic.app": ("newrelic.hooks.framework_sanic", "instrument_sanic_app"),
+    "sanic.response": ("newrelic.hooks.framework_sanic", "instrument_sanic_response"),
+    "sanic.touchup.service": ("newrelic.hooks.framework_sanic", "instrument_sanic_touchup_service"),
+    "aiohttp.wsgi": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_wsgi"),
+    "aiohttp.web": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_web"),
+    "aiohttp.web_reqrep": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_web_response"),
+    "aiohttp.web_response": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_web_response"),
+    "aiohttp.web_urldispatcher": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_web_urldispatcher"),
+    "aiohttp.client": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_client"),
+    "aiohttp.client_reqrep": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_client_reqrep"),
+    "aiohttp.protocol": ("newrelic.hooks.framework_aiohttp", "instrument_aiohttp_protocol"),
+    "requests.api": ("newrelic.hooks.external_requests", "instrument_requests_api"),
+    "requests.sessions": ("newrelic.hooks.external_requests", "instrument_requests_sessions"),
+    "feedparser": ("newrelic.hooks.external_feedparser", "instrument"),
+    "xmlrpclib": ("newrelic.hooks.external_xmlrpclib", "instrument"),
+    "dropbox": ("newrelic.hooks.external_dropbox", "instrument"),
+    "facepy.graph_api": ("newrelic.hooks.external_facepy", "instrument"),
+    "pysolr": ("newrelic.hooks.datastore_pysolr", "instrument_pysolr"),
+    "solr": ("newrelic.hooks.datastore_solrpy", "instrument_solrpy"),
+    "aredis.client": ("newrelic.hooks.datastore_aredis", "instrument_aredis_client"),
+    "aredis.connection": ("newrelic.hooks.datastore_aredis", "instrument_aredis_connection"),
+    "aioredis.client": ("newrelic.hooks.datastore_aioredis", "instrument_aioredis_client"),
+    "aioredis.commands": ("newrelic.hooks.datastore_aioredis", "instrument_aioredis_client"),
+    "aioredis.connection": ("newrelic.hooks.datastore_aioredis", "instrument_aioredis_connection"),
+    # v7 and below
+    "elasticsearch.client": ("newrelic.hooks.datastore_elasticsearch", "instrument_elasticsearch_client"),
+    # v8 and above
+    "elasticsearch._sync.client": ("newrelic.hooks.datastore_elasticsearch", "instrument_elasticsearch_client_v8"),
+    # v7 and below
+    "elasticsearch.client.cat": ("newrelic.hooks.datastore_elasticsearch", "instrument_elasticsearch_client_cat"),
+    # v8 and above
+    "elasticsearch._sync.client.cat": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_cat_v8",
+    ),
+    # v7 and below
+    "elasticsearch.client.cluster": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_cluster",
+    ),
+    # v8 and above
+    "elasticsearch._sync.client.cluster": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_cluster_v8",
+    ),
+    # v7 and below
+    "elasticsearch.client.indices": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_indices",
+    ),
+    # v8 and above
+    "elasticsearch._sync.client.indices": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_indices_v8",
+    ),
+    # v7 and below
+    "elasticsearch.client.nodes": ("newrelic.hooks.datastore_elasticsearch", "instrument_elasticsearch_client_nodes"),
+    # v8 and above
+    "elasticsearch._sync.client.nodes": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_nodes_v8",
+    ),
+    # v7 and below
+    "elasticsearch.client.snapshot": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_snapshot",
+    ),
+    # v8 and above
+    "elasticsearch._sync.client.snapshot": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_snapshot_v8",
+    ),
+    # v7 and below
+    "elasticsearch.client.tasks": ("newrelic.hooks.datastore_elasticsearch", "instrument_elasticsearch_client_tasks"),
+    # v8 and above
+    "elasticsearch._sync.client.tasks": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_tasks_v8",
+    ),
+    # v7 and below
+    "elasticsearch.client.ingest": ("newrelic.hooks.datastore_elasticsearch", "instrument_elasticsearch_client_ingest"),
+    # v8 and above
+    "elasticsearch._sync.client.ingest": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_client_ingest_v8",
+    ),
+    # v7 and below
+    "elasticsearch.connection.base": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elasticsearch_connection_base",
+    ),
+    # v8 and above
+    "elastic_transport._node._base": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elastic_transport__node__base",
+    ),
+    # v7 and below
+    "elasticsearch.transport": ("newrelic.hooks.datastore_elasticsearch", "instrument_elasticsearch_transport"),
+    # v8 and above
+    "elastic_transport._transport": (
+        "newrelic.hooks.datastore_elasticsearch",
+        "instrument_elastic_transport__transport",
+    ),
+    "pika.adapters": ("newrelic.hooks.messagebroker_pika", "instrument_pika_adapters"),
+    "pika.channel": ("newrelic.hooks.messagebroker_pika", "instrument_pika_channel"),
+    "pika.spec": ("newrelic.hooks.messagebroker_pika", "instrument_pika_spec"),
+    "pyelasticsearch.client": ("newrelic.hooks.datastore_pyelasticsearch", "instrument_pyelasticsearch_client"),
+    "pymongo.connection": ("newrelic.hooks.datastore_pymongo", "instrument_pymongo_connection"),
+    "pymongo.mongo_client": ("newrelic.hooks.datastore_pymongo", "instrument_pymongo_mongo_client"),
+    "pymongo.collection": ("newrelic.hooks.datastore_pymongo", "instrument_pymongo_collection"),
+    # Redis v4.2+
+    "redis.asyncio.client": ("newrelic.hooks.datastore_redis", "instrument_asyncio_redis_client"),
+    # Redis v4.2+
+    "redis.asyncio.commands": ("newrelic.hooks.datastore_redis", "instrument_asyncio_redis_client"),
+    # Redis v4.2+
+    "redis.asyncio.connection": ("newrelic.hooks.datastore_redis", "instrument_asyncio_redis_connection"),
+    "redis.connection": ("newrelic.hooks.datastore_redis", "instrument_redis_connection"),
+    "redis.client": ("newrelic.hooks.datastore_redis", "instrument_redis_client"),
+    "redis.commands.cluster": ("newrelic.hooks.datastore_redis", "instrument_redis_commands_cluster"),
+    "redis.commands.core": ("newrelic.hooks.datastore_redis", "instrument_redis_commands_core"),
+    "redis.commands.sentinel": ("newrelic.hooks.datastore_redis", "instrument_redis_commands_sentinel"),
+    "redis.commands.json.commands": ("newrelic.hooks.datastore_redis", "instrument_redis_commands_json_commands"),
+    "redis.commands.search.commands": ("newrelic.hooks.datastore_redis", "instrument_redis_commands_search_commands"),
+    "redis.commands.timeseries.commands": (
+        "newrelic.hooks.datastore_redis",
+        "instrument_redis_commands_timeseries_commands",
+    ),
+    "redis.commands.bf.commands": ("newrelic.hooks.datastore_redis", "instrument_redis_commands_bf_commands"),
+    "redis.commands.graph.commands": ("newrelic.hooks.datastore_redis", "instrument_redis_commands_graph_commands"),
+    "motor": ("newrelic.hooks.datastore_motor", "patch_motor"),
+    "piston.resource": ("newrelic.hooks.component_piston", "instrument_piston_resource"),
+    "piston.doc": ("newrelic.hooks.component_piston", "instrument_piston_doc"),
+    "tastypie.resources": ("newrelic.hooks.component_tastypie", "instrument_tastypie_resources"),
+    "tastypie.api": ("newrelic.hooks.component_tastypie", "instrument_tastypie_api"),
+    "sklearn.metrics": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_metrics"),
+    "sklearn.tree._classes": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_tree_models"),
+    # In scikit-learn < 0.21 the model classes are in tree.py instead of _classes.py.
+    "sklearn.tree.tree": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_tree_models"),
+    "sklearn.compose._column_transformer": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_compose_models"),
+    "sklearn.compose._target": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_compose_models"),
+    "sklearn.covariance._empirical_covariance": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_covariance_models",
+    ),
+    "sklearn.covariance.empirical_covariance_": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_covariance_models",
+    ),
+    "sklearn.covariance.shrunk_covariance_": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_covariance_shrunk_models",
+    ),
+    "sklearn.covariance._shrunk_covariance": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_covariance_shrunk_models",
+    ),
+    "sklearn.covariance.robust_covariance_": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_covariance_models"),
+    "sklearn.covariance._robust_covariance": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_covariance_models"),
+    "sklearn.covariance.graph_lasso_": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_covariance_graph_models"),
+    "sklearn.covariance._graph_lasso": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_covariance_graph_models"),
+    "sklearn.covariance.elliptic_envelope": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_covariance_models"),
+    "sklearn.covariance._elliptic_envelope": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_covariance_models"),
+    "sklearn.ensemble._bagging": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_bagging_models"),
+    "sklearn.ensemble.bagging": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_bagging_models"),
+    "sklearn.ensemble._forest": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_forest_models"),
+    "sklearn.ensemble.forest": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_forest_models"),
+    "sklearn.ensemble._iforest": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_iforest_models"),
+    "sklearn.ensemble.iforest": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_iforest_models"),
+    "sklearn.ensemble._weight_boosting": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_ensemble_weight_boosting_models",
+    ),
+    "sklearn.ensemble.weight_boosting": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_ensemble_weight_boosting_models",
+    ),
+    "sklearn.ensemble._gb": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_gradient_boosting_models"),
+    "sklearn.ensemble.gradient_boosting": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_ensemble_gradient_boosting_models",
+    ),
+    "sklearn.ensemble._voting": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_voting_models"),
+    "sklearn.ensemble.voting_classifier": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_ensemble_voting_models",
+    ),
+    "sklearn.ensemble._stacking": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_ensemble_stacking_models"),
+    "sklearn.ensemble._hist_gradient_boosting.gradient_boosting": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_ensemble_hist_models",
+    ),
+    "sklearn.linear_model._base": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model.base": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model._bayes": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_bayes_models"),
+    "sklearn.linear_model.bayes": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_bayes_models"),
+    "sklearn.linear_model._least_angle": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_least_angle_models",
+    ),
+    "sklearn.linear_model.least_angle": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_least_angle_models",
+    ),
+    "sklearn.linear_model.coordinate_descent": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_coordinate_descent_models",
+    ),
+    "sklearn.linear_model._coordinate_descent": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_coordinate_descent_models",
+    ),
+    "sklearn.linear_model._glm": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_GLM_models"),
+    "sklearn.linear_model._huber": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model.huber": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model._stochastic_gradient": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_stochastic_gradient_models",
+    ),
+    "sklearn.linear_model.stochastic_gradient": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_stochastic_gradient_models",
+    ),
+    "sklearn.linear_model._ridge": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_ridge_models"),
+    "sklearn.linear_model.ridge": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_ridge_models"),
+    "sklearn.linear_model._logistic": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_logistic_models"),
+    "sklearn.linear_model.logistic": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_logistic_models"),
+    "sklearn.linear_model._omp": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_OMP_models"),
+    "sklearn.linear_model.omp": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_OMP_models"),
+    "sklearn.linear_model._passive_aggressive": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_passive_aggressive_models",
+    ),
+    "sklearn.linear_model.passive_aggressive": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_linear_passive_aggressive_models",
+    ),
+    "sklearn.linear_model._perceptron": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model.perceptron": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model._quantile": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model._ransac": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model.ransac": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model._theil_sen": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.linear_model.theil_sen": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_linear_models"),
+    "sklearn.cross_decomposition._pls": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_cross_decomposition_models",
+    ),
+    "sklearn.cross_decomposition.pls_": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_cross_decomposition_models",
+    ),
+    "sklearn.discriminant_analysis": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_discriminant_analysis_models",
+    ),
+    "sklearn.gaussian_process._gpc": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_gaussian_process_models"),
+    "sklearn.gaussian_process.gpc": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_gaussian_process_models"),
+    "sklearn.gaussian_process._gpr": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_gaussian_process_models"),
+    "sklearn.gaussian_process.gpr": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_gaussian_process_models"),
+    "sklearn.dummy": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_dummy_models"),
+    "sklearn.feature_selection._rfe": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_feature_selection_rfe_models",
+    ),
+    "sklearn.feature_selection.rfe": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_feature_selection_rfe_models",
+    ),
+    "sklearn.feature_selection._variance_threshold": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_feature_selection_models",
+    ),
+    "sklearn.feature_selection.variance_threshold": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_feature_selection_models",
+    ),
+    "sklearn.feature_selection._from_model": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_feature_selection_models",
+    ),
+    "sklearn.feature_selection.from_model": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_feature_selection_models",
+    ),
+    "sklearn.feature_selection._sequential": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_feature_selection_models",
+    ),
+    "sklearn.kernel_ridge": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_kernel_ridge_models"),
+    "sklearn.neural_network._multilayer_perceptron": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_neural_network_models",
+    ),
+    "sklearn.neural_network.multilayer_perceptron": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_neural_network_models",
+    ),
+    "sklearn.neural_network._rbm": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neural_network_models"),
+    "sklearn.neural_network.rbm": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neural_network_models"),
+    "sklearn.calibration": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_calibration_models"),
+    "sklearn.cluster._affinity_propagation": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster.affinity_propagation_": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster._agglomerative": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_cluster_agglomerative_models",
+    ),
+    "sklearn.cluster.hierarchical": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_cluster_agglomerative_models",
+    ),
+    "sklearn.cluster._birch": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster.birch": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster._bisect_k_means": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_kmeans_models"),
+    "sklearn.cluster._dbscan": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster.dbscan_": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster._feature_agglomeration": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster._kmeans": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_kmeans_models"),
+    "sklearn.cluster.k_means_": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_kmeans_models"),
+    "sklearn.cluster._mean_shift": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster.mean_shift_": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster._optics": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_models"),
+    "sklearn.cluster._spectral": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_clustering_models"),
+    "sklearn.cluster.spectral": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_clustering_models"),
+    "sklearn.cluster._bicluster": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_clustering_models"),
+    "sklearn.cluster.bicluster": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_cluster_clustering_models"),
+    "sklearn.multiclass": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_multiclass_models"),
+    "sklearn.multioutput": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_multioutput_models"),
+    "sklearn.naive_bayes": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_naive_bayes_models"),
+    "sklearn.model_selection._search": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_model_selection_models"),
+    "sklearn.mixture._bayesian_mixture": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_mixture_models"),
+    "sklearn.mixture.bayesian_mixture": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_mixture_models"),
+    "sklearn.mixture._gaussian_mixture": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_mixture_models"),
+    "sklearn.mixture.gaussian_mixture": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_mixture_models"),
+    "sklearn.pipeline": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_pipeline_models"),
+    "sklearn.semi_supervised._label_propagation": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_semi_supervised_models",
+    ),
+    "sklearn.semi_supervised._self_training": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_semi_supervised_models",
+    ),
+    "sklearn.semi_supervised.label_propagation": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_semi_supervised_models",
+    ),
+    "sklearn.svm._classes": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_svm_models"),
+    "sklearn.svm.classes": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_svm_models"),
+    "sklearn.neighbors._classification": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_neighbors_KRadius_models",
+    ),
+    "sklearn.neighbors.classification": (
+        "newrelic.hooks.mlmodel_sklearn",
+        "instrument_sklearn_neighbors_KRadius_models",
+    ),
+    "sklearn.neighbors._graph": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_KRadius_models"),
+    "sklearn.neighbors._kde": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors.kde": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors._lof": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors.lof": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors._nca": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors._nearest_centroid": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors.nearest_centroid": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors._regression": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_KRadius_models"),
+    "sklearn.neighbors.regression": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_KRadius_models"),
+    "sklearn.neighbors._unsupervised": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "sklearn.neighbors.unsupervised": ("newrelic.hooks.mlmodel_sklearn", "instrument_sklearn_neighbors_models"),
+    "rest_framework.views": ("newrelic.hooks.component_djangorestframework", "instrument_rest_framework_views"),
+    "rest_framework.decorators": (
+        "newrelic.hooks.component_djangorestframework",
+        "instrument_rest_framework_decorators",
+    ),
+    "celery.task.base": ("newrelic.hooks.application_celery", "instrument_celery_app_task"),
+    "celery.app.task": ("newrelic.hooks.application_celery", "instrument_celery_app_task"),
+    "celery.worker": ("newrelic.hooks.application_celery", "instrument_celery_worker"),
+    "celery.concurrency.processes": ("newrelic.hooks.application_celery", "instrument_celery_worker"),
+    "celery.concurrency.prefork": ("newrelic.hooks.application_celery", "instrument_celery_worker"),
+    "celery.execute.trace": ("newrelic.hooks.application_celery", "instrument_celery_execute_trace"),
+    "celery.task.trace": ("newrelic.hooks.application_celery", "instrument_celery_execute_trace"),
+    "celery.app.trace": ("newrelic.hooks.application_celery", "instrument_celery_execute_trace"),
+    "billiard.pool": ("newrelic.hooks.application_celery", "instrument_billiard_pool"),
+    "flup.server.cgi": ("newrelic.hooks.adapter_flup", "instrument_flup_server_cgi"),
+    "flup.server.ajp_base": ("newrelic.hooks.adapter_flup", "instrument_flup_server_ajp_base"),
+    "flup.server.fcgi_base": ("newrelic.hooks.adapter_flup", "instrument_flup_server_fcgi_base"),
+    "flup.server.scgi_base": ("newrelic.hooks.adapter_flup", "instrument_flup_server_scgi_base"),
+    "pywapi": ("newrelic.hooks.external_pywapi", "instrument_pywapi"),
+    "meinheld.server": ("newrelic.hooks.adapter_meinheld", "instrument_meinheld_server"),
+    "waitress.server": ("newrelic.hooks.adapter_waitress", "instrument_waitress_server"),
+    "gevent.wsgi": ("newrelic.hooks.adapter_gevent", "instrument_gevent_wsgi"),
+    "gevent.pywsgi": ("newrelic.hooks.adapter_gevent", "instrument_gevent_pywsgi"),
+    "wsgiref.simple_server": ("newrelic.hooks.adapter_wsgiref", "instrument_wsgiref_simple_server"),
+    "cherrypy.wsgiserver": ("newrelic.hooks.adapter_cherrypy", "instrument_cherrypy_wsgiserver"),
+    "cheroot.wsgi": ("newrelic.hooks.adapter_cheroot", "instrument_cheroot_wsgiserver"),
+    "pyramid.router": ("newrelic.hooks.framework_pyramid", "instrument_pyramid_router"),
+    "pyramid.config": ("newrelic.hooks.framework_pyramid", "instrument_pyramid_config_views"),
+    "pyramid.config.views": ("newrelic.hooks.framework_pyramid", "instrument_pyramid_config_views"),
+    "pyramid.config.tweens": ("newrelic.hooks.framework_pyramid", "instrument_pyramid_config_tweens"),
+    "cornice.service": ("newrelic.hooks.component_cornice", "instrument_cornice_service"),
+    "gevent.monkey": ("newrelic.hooks.coroutines_gevent", "instrument_gevent_monkey"),
+    "weberror.errormiddleware": ("newrelic.hooks.middleware_weberror", "instrument_weberror_errormiddleware"),
+    "weberror.reporter": ("newrelic.hooks.middleware_weberror", "instrument_weberror_reporter"),
+    "thrift.transport.TSocket": ("newrelic.hooks.external_thrift", "instrument"),
+    "gearman.client": ("newrelic.hooks.application_gearman", "instrument_gearman_client"),
+    "gearman.connection_manager": ("newrelic.hooks.application_gearman", "instrument_gearman_connection_manager"),
+    "gearman.worker": ("newrelic.hooks.application_gearman", "instrument_gearman_worker"),
+    "botocore.endpoint": ("newrelic.hooks.external_botocore", "instrument_botocore_endpoint"),
+    "botocore.client": ("newrelic.hooks.external_botocore", "instrument_botocore_client"),
+    "tornado.httpserver": ("newrelic.hooks.framework_tornado", "instrument_tornado_httpserver"),
+    "tornado.httputil": ("newrelic.hooks.framework_tornado", "instrument_tornado_httputil"),
+    "tornado.httpclient": ("newrelic.hooks.framework_tornado", "instrument_tornado_httpclient"),
+    "tornado.routing": ("newrelic.hooks.framework_tornado", "instrument_tornado_routing"),
+    "tornado.web": ("newrelic.hooks.framework_tornado", "instrument_tornado_web"),
+}
+
+if six.PY2:
+    BUILTIN_IMPORT_HOOKS["httplib"] = ("newrelic.hooks.external_httplib", "instrument")
+    BUILTIN_IMPORT_HOOKS["urllib"] = ("newrelic.hooks.external_urllib", "instrument")
+    BUILTIN_IMPORT_HOOKS["urllib2"] = ("newrelic.hooks.external_urllib2", "instrument")
+else:
+    BUILTIN_IMPORT_HOOKS["http.client"] = ("newrelic.hooks.external_httplib", "instrument")
+    BUILTIN_IMPORT_HOOKS["urllib.request"] = ("newrelic.hooks.external_urllib", "instrument")
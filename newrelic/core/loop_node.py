@@ -41,9 +41,9 @@ class LoopNode(_LoopNode, GenericNodeMixin):
     def name(self):
         return self.fetch_name()
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        function node as well as all the child nodes.
+        function node.
 
         """
 
@@ -68,7 +68,7 @@ class LoopNode(_LoopNode, GenericNodeMixin):
             yield TimeMetric(name=name + 'Other', scope='',
                     duration=self.duration, exclusive=None)
 
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
 
         name = 'EventLoop/Wait/%s' % self.name
 
@@ -30,9 +30,9 @@ class MemcacheNode(_MemcacheNode, GenericNodeMixin):
     def name(self):
         return 'Memcache/%s' % self.command
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        memcache node as well as all the child nodes.
+        memcache node.
 
         """
 
@@ -54,7 +54,7 @@ class MemcacheNode(_MemcacheNode, GenericNodeMixin):
         yield TimeMetric(name=name, scope=root.path,
                 duration=self.duration, exclusive=self.exclusive)
 
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
         name = root.string_table.cache(self.name)
 
         start_time = newrelic.core.trace_node.node_start_time(root, self)
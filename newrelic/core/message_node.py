@@ -28,15 +28,17 @@ _MessageNode = namedtuple('_MessageNode',
 
 class MessageNode(_MessageNode, GenericNodeMixin):
 
+    time_metrics_children = True
+
     @property
     def name(self):
         name = 'MessageBroker/%s/%s/%s/Named/%s' % (self.library,
                 self.destination_type, self.operation, self.destination_name)
         return name
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        messagebroker node as well as all the child nodes.
+        messagebroker node.
 
         """
         name = self.name
@@ -51,13 +53,7 @@ class MessageNode(_MessageNode, GenericNodeMixin):
         yield TimeMetric(name=name, scope=root.path,
                 duration=self.duration, exclusive=self.exclusive)
 
-        # Now for the children, if the trace is not terminal.
-
-        for child in self.children:
-            for metric in child.time_metrics(stats, root, self):
-                yield metric
-
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
         name = root.string_table.cache(self.name)
 
         start_time = newrelic.core.trace_node.node_start_time(root, self)
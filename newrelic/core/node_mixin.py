@@ -17,6 +17,16 @@ from newrelic.core.attribute_filter import DST_SPAN_EVENTS, DST_TRANSACTION_SEGM
 
 
 class GenericNodeMixin(object):
+    # Whether the time metrics and transaction trace nodes for a node
+    # include those for its children. The tree of nodes is walked with an
+    # explicit stack rather than each node recursing into its children,
+    # so the cost is proportional to the number of nodes however deeply
+    # they are nested. Each node provides own_time_metrics() and
+    # own_trace_node() for itself alone.
+
+    time_metrics_children = False
+    trace_node_children = False
+
     @property
     def processed_user_attributes(self):
         if hasattr(self, "_processed_user_attributes"):
@@ -73,13 +83,60 @@ class GenericNodeMixin(object):
         return [i_attrs, u_attrs, a_attrs]
 
     def span_events(self, settings, base_attrs=None, parent_guid=None, attr_class=dict):
-        yield self.span_event(settings, base_attrs=base_attrs, parent_guid=parent_guid, attr_class=attr_class)
+        stack = [(self, parent_guid)]
+
+        while stack:
+            node, parent_guid = stack.pop()
+
+            yield node.span_event(settings, base_attrs=base_attrs, parent_guid=parent_guid, attr_class=attr_class)
+
+            children = node.children
+            if children:
+                guid = node.guid
+                stack.extend((child, guid) for child in reversed(children))
+
+    def time_metrics(self, stats, root, parent):
+        """Return a generator yielding the timed metrics for this node
+        as well as all the child nodes.
+
+        """
+
+        return walk_time_metrics((self,), stats, root, parent)
+
+    def trace_node(self, stats, root, connections):
+        """Return the transaction trace node for this node, with those
+        for the child nodes, up until the limit on the number of nodes
+        in the trace is reached.
+
+        """
+
+        trace_node = self.own_trace_node(stats, root, connections)
+
+        if not self.trace_node_children:
+            return trace_node
+
+        stack = [(iter(self.children), trace_node.children)]
 
-        for child in self.children:
-            for event in child.span_events(
-                settings, base_attrs=base_attrs, parent_guid=self.guid, attr_class=attr_class
-            ):
-                yield event
+        while stack:
+            children, trace_children = stack[-1]
+
+            if root.trace_node_count > root.trace_node_limit:
+                stack.pop()
+                continue
+
+            child = next(children, None)
+
+            if child is None:
+                stack.pop()
+                continue
+
+            child_trace_node = child.own_trace_node(stats, root, connections)
+            trace_children.append(child_trace_node)
+
+            if child.trace_node_children:
+                stack.append((iter(child.children), child_trace_node.children))
+
+        return trace_node
 
 
 class DatastoreNodeMixin(GenericNodeMixin):
@@ -128,3 +185,23 @@ class DatastoreNodeMixin(GenericNodeMixin):
         _, a_attrs["peer.address"] = attribute.process_user_attribute("peer.address", peer_address)
 
         return attrs
+
+
+def walk_time_metrics(nodes, stats, root, parent):
+    """Return a generator yielding the timed metrics for each of the
+    nodes in turn, as well as all their child nodes.
+
+    """
+
+    stack = [(node, parent) for node in reversed(nodes)]
+
+    while stack:
+        node, parent = stack.pop()
+
+        for metric in node.own_time_metrics(stats, root, parent):
+            yield metric
+
+        if node.time_metrics_children:
+            children = node.children
+            if children:
+                stack.extend((child, node) for child in reversed(children))
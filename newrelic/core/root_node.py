@@ -37,6 +37,8 @@ _RootNode = namedtuple(
 
 
 class RootNode(_RootNode, GenericNodeMixin):
+    trace_node_children = True
+
     def span_event(self, *args, **kwargs):
         span = super(RootNode, self).span_event(*args, **kwargs)
         i_attrs = span[0]
@@ -48,7 +50,7 @@ class RootNode(_RootNode, GenericNodeMixin):
             i_attrs["tracingVendors"] = self.tracing_vendors
         return span
 
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
         name = self.path
 
         start_time = newrelic.core.trace_node.node_start_time(root, self)
@@ -58,11 +60,6 @@ class RootNode(_RootNode, GenericNodeMixin):
 
         children = []
 
-        for child in self.children:
-            if root.trace_node_count > root.trace_node_limit:
-                break
-            children.append(child.trace_node(stats, root, connections))
-
         params = self.get_trace_segment_params(root.settings)
 
         return newrelic.core.trace_node.TraceNode(
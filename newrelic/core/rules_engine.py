@@ -54,7 +54,58 @@ class NormalizationRule(_NormalizationRule):
         return self.match_expression_re.subn(self.replacement, string, count)
 
 
+# Rules whose expressions set flags for the whole expression, or refer
+# to groups by number or name, would not match the same way once combined
+# with the expressions for other rules.
+
+_UNCOMBINABLE_RE = re.compile(r"\(\?[aiLmsux]+\)|\\[1-9]|\(\?P=|\(\?\(")
+
+
+def _never_matches(string):
+    return None
+
+
+def _combined_matcher(rules):
+    """Returns a function which searches a string for a match against
+    any of the rules, or None if the rules cannot be combined.
+
+    """
+
+    if not rules:
+        return _never_matches
+
+    expressions = [rule.match_expression for rule in rules]
+
+    if any(_UNCOMBINABLE_RE.search(expression) for expression in expressions):
+        return None
+
+    pattern = "|".join("(?:%s)" % expression for expression in expressions)
+
+    try:
+        return re.compile(pattern, re.IGNORECASE).search
+    except Exception:
+        return None
+
+
+def _split_segments(string):
+    # The leading empty segment for names starting with '/' is never
+    # matched against rules applied to each segment.
+
+    segments = string.split("/")
+
+    if segments and not segments[0]:
+        return [""], segments[1:]
+
+    return [], segments
+
+
 class RulesEngine(object):
+    # Maximum number of names for which the result of normalization is
+    # remembered. Once reached, all remembered results are discarded so
+    # that names which are no longer being used are not kept forever.
+
+    MEMO_MAXIMUM = 10000
+
     def __init__(self, rules):
         self.__rules = []
 
@@ -67,11 +118,36 @@ class RulesEngine(object):
 
         self.__rules = sorted(self.__rules, key=lambda rule: rule.eval_order)
 
+        # Names which none of the rules match are by far the most common,
+        # so the expressions for all rules are combined such that those
+        # names can be passed through after a single search, rather than
+        # a search for each rule in turn.
+
+        self.__string_matcher = _combined_matcher([rule for rule in self.__rules if not rule.each_segment])
+        self.__segment_matcher = _combined_matcher([rule for rule in self.__rules if rule.each_segment])
+
+        self.__memo = {}
+
     @property
     def rules(self):
         return self.__rules
 
     def normalize(self, string):
+        result = self.__memo.get(string)
+
+        if result is not None:
+            return result
+
+        result = self._normalize(string)
+
+        if len(self.__memo) >= self.MEMO_MAXIMUM:
+            self.__memo.clear()
+
+        self.__memo[string] = result
+
+        return result
+
+    def _normalize(self, string):
         # URLs are supposed to be ASCII but can get a
         # URL with illegal non ASCII characters. As the
         # rule patterns and replacements are Unicode
@@ -84,14 +160,29 @@ class RulesEngine(object):
         if isinstance(string, bytes):
             string = string.decode("Latin-1")
 
+        # Where no rule matches the original name, no rule can match
+        # after an earlier rule has been applied either, as none will
+        # have changed the name.
+
+        if self.__string_matcher is not None and self.__segment_matcher is not None:
+            if not self.__string_matcher(string):
+                if self.__segment_matcher is _never_matches:
+                    return (string, False)
+
+                _, segments = _split_segments(string)
+
+                if not any(self.__segment_matcher(segment) for segment in segments):
+                    return (string, False)
+
+        return self._apply_rules(string)
+
+    def _apply_rules(self, string):
         final_string = string
         ignore = False
         for rule in self.__rules:
             if rule.each_segment:
                 matched = False
 
-                segments = final_string.split("/")
-
                 # FIXME This fiddle is to skip leading segment
                 # when splitting on '/' where it is empty.
                 # Should the rule just be to skip any empty
@@ -99,11 +190,7 @@ class RulesEngine(object):
                 # but not matched. Wouldn't then have to treat
                 # this as special.
 
-                if segments and not segments[0]:
-                    rule_segments = [""]
-                    segments = segments[1:]
-                else:
-                    rule_segments = []
+                rule_segments, segments = _split_segments(final_string)
 
                 for segment in segments:
                     rule_segment, match_count = rule.apply(segment)
@@ -31,9 +31,9 @@ class SolrNode(_SolrNode, GenericNodeMixin):
     def name(self):
         return 'SolrClient/%s/%s' % (self.library, self.command)
 
-    def time_metrics(self, stats, root, parent):
+    def own_time_metrics(self, stats, root, parent):
         """Return a generator yielding the timed metrics for this
-        memcache node as well as all the child nodes.
+        memcache node.
 
         """
         yield TimeMetric(name='Solr/all', scope='',
@@ -54,7 +54,7 @@ class SolrNode(_SolrNode, GenericNodeMixin):
         yield TimeMetric(name=name, scope=root.path,
                 duration=self.duration, exclusive=self.exclusive)
 
-    def trace_node(self, stats, root, connections):
+    def own_trace_node(self, stats, root, connections):
         name = root.string_table.cache(self.name)
 
         start_time = newrelic.core.trace_node.node_start_time(root, self)
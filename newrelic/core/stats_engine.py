@@ -29,11 +29,12 @@ import time
 import traceback
 import warnings
 import zlib
+from array import array
 from heapq import heapify, heapreplace
 
 import newrelic.packages.six as six
 from newrelic.api.settings import STRIP_EXCEPTION_MESSAGE
-from newrelic.api.time_trace import get_linking_metadata
+from newrelic.api.time_trace import get_linking_metadata, get_service_linking_metadata
 from newrelic.common.encoding_utils import json_encode
 from newrelic.common.metric_utils import create_metric_identity
 from newrelic.common.object_names import parse_exc_info
@@ -54,6 +55,7 @@ from newrelic.core.error_collector import TracedError
 from newrelic.core.log_event_node import LogEventNode
 from newrelic.core.metric import TimeMetric
 from newrelic.core.stack_trace import exception_stack
+from newrelic.core.trace_encoder import encode_transaction_trace
 
 _logger = logging.getLogger(__name__)
 
@@ -69,6 +71,13 @@ EVENT_HARVEST_METHODS = {
 }
 
 
+# When merging into a full SampledDataSet, the heap is only rebuilt where the
+# number of samples being merged is at least 1/MERGE_REBUILD_RATIO of the
+# capacity. Otherwise the samples are merged into the heap one at a time.
+
+MERGE_REBUILD_RATIO = 8
+
+
 def c2t(count=0, total=0.0, min=0.0, max=0.0, sum_of_squares=0.0):
     return (count, total, total, min, max, sum_of_squares)
 
@@ -196,6 +205,269 @@ class CountStats(TimeStats):
         pass
 
 
+# Identifiers for the type of stats held in a slot of a MetricStatsTable.
+
+_TIME_STATS = 0
+_COUNT_STATS = 1
+_APDEX_STATS = 2
+
+
+def _stats_kind(stats):
+    if isinstance(stats, ApdexStats):
+        return _APDEX_STATS
+    elif isinstance(stats, CountStats):
+        return _COUNT_STATS
+    return _TIME_STATS
+
+
+def _as_count(value):
+    # Counts are held as doubles in the table columns but are reported
+    # as integers where possible, as they would have been originally.
+
+    return int(value) if value.is_integer() else value
+
+
+def _stats_from_row(kind, c0, c1, c2, c3, c4, c5):
+    # The stats classes are populated directly rather than through their
+    # constructors, as this is done for every metric when generating the
+    # metric data for a harvest.
+
+    if kind == _TIME_STATS:
+        stats = list.__new__(TimeStats)
+        stats.extend((_as_count(c0), c1, c2, c3, c4, c5))
+    elif kind == _COUNT_STATS:
+        stats = list.__new__(CountStats)
+        stats.extend((_as_count(c0), c1, c2, c3, c4, c5))
+    else:
+        stats = list.__new__(ApdexStats)
+        stats.extend((_as_count(c0), _as_count(c1), _as_count(c2), c3, c4, _as_count(c5)))
+    return stats
+
+
+class MetricStatsTable(object):
+
+    """Columnar table for accumulating apdex, time and value metrics.
+
+    Rather than each metric holding its own stats list, the (name, scope)
+    key for a metric is mapped to a slot index into six parallel arrays of
+    doubles, one for each of the fields of the stats. The type of stats
+    held in each slot is recorded so that the merge semantics of the
+    ApdexStats, TimeStats and CountStats classes can be applied.
+
+    For reading, the table behaves as a dictionary mapping each key to an
+    instance of the appropriate stats class. The stats objects returned
+    are copies, so updates must be made through the methods of the table.
+
+    """
+
+    def __init__(self):
+        self._slots = {}
+        self._kinds = array("b")
+        self._c0 = array("d")
+        self._c1 = array("d")
+        self._c2 = array("d")
+        self._c3 = array("d")
+        self._c4 = array("d")
+        self._c5 = array("d")
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __iter__(self):
+        return iter(self._slots)
+
+    def __getitem__(self, key):
+        return self._stats(self._slots[key])
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, dict(self.items()))
+
+    def get(self, key, default=None):
+        slot = self._slots.get(key)
+        if slot is None:
+            return default
+        return self._stats(slot)
+
+    def keys(self):
+        return self._slots.keys()
+
+    def values(self):
+        return [stats for _, stats in self.items()]
+
+    def items(self):
+        # Rows are read across all the columns at once rather than being
+        # indexed out of each column for each slot in turn.
+
+        rows = list(zip(self._kinds, self._c0, self._c1, self._c2, self._c3, self._c4, self._c5))
+        return [(key, _stats_from_row(*rows[slot])) for key, slot in six.iteritems(self._slots)]
+
+    iteritems = items
+
+    def _stats(self, slot):
+        return _stats_from_row(
+            self._kinds[slot],
+            self._c0[slot],
+            self._c1[slot],
+            self._c2[slot],
+            self._c3[slot],
+            self._c4[slot],
+            self._c5[slot],
+        )
+
+    def _append(self, key, kind, c0, c1, c2, c3, c4, c5):
+        self._slots[key] = len(self._kinds)
+        self._kinds.append(kind)
+        self._c0.append(c0)
+        self._c1.append(c1)
+        self._c2.append(c2)
+        self._c3.append(c3)
+        self._c4.append(c4)
+        self._c5.append(c5)
+
+    def _merge_row(self, slot, o0, o1, o2, o3, o4, o5):
+        kind = self._kinds[slot]
+
+        if kind == _TIME_STATS:
+            c0 = self._c0[slot]
+            self._c1[slot] += o1
+            self._c2[slot] += o2
+            self._c3[slot] = c0 and min(self._c3[slot], o3) or o3
+            self._c4[slot] = max(self._c4[slot], o4)
+            self._c5[slot] += o5
+            self._c0[slot] = c0 + o0
+
+        elif kind == _COUNT_STATS:
+            self._c0[slot] += o0
+
+        else:
+            c0 = self._c0[slot] + o0
+            c1 = self._c1[slot] + o1
+            c2 = self._c2[slot] + o2
+            self._c0[slot] = c0
+            self._c1[slot] = c1
+            self._c2[slot] = c2
+            self._c3[slot] = (c0 or c1 or c2) and min(self._c3[slot], o3) or o3
+            self._c4[slot] = max(self._c4[slot], o3)
+
+    def record_time_metric(self, key, duration, exclusive):
+        """Merges a single time value into the time stats for the key."""
+
+        slot = self._slots.get(key)
+        if slot is None:
+            self._append(key, _TIME_STATS, 1, duration, exclusive, duration, duration, duration**2)
+            return
+
+        if self._kinds[slot] != _TIME_STATS:
+            return
+
+        c0 = self._c0[slot]
+        self._c1[slot] += duration
+        self._c2[slot] += exclusive
+        self._c3[slot] = c0 and min(self._c3[slot], duration) or duration
+        self._c4[slot] = max(self._c4[slot], duration)
+        self._c5[slot] += duration**2
+        self._c0[slot] = c0 + 1
+
+    def record_apdex_metric(self, key, metric):
+        """Merges an apdex metric object into the apdex stats for the key."""
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._kinds)
+            self._append(key, _APDEX_STATS, 0, 0, 0, metric.apdex_t, metric.apdex_t, 0)
+
+        self._merge_row(
+            slot, metric.satisfying, metric.tolerating, metric.frustrating, metric.apdex_t, metric.apdex_t, 0
+        )
+
+    def merge_stats(self, key, stats):
+        """Merges an ApdexStats, TimeStats or CountStats object into the
+        stats for the key. Where there are no stats for the key yet, the
+        type of stats is taken from the object being merged.
+
+        """
+
+        slot = self._slots.get(key)
+        if slot is None:
+            self._append(key, _stats_kind(stats), *stats[:6])
+        else:
+            self._merge_row(slot, *stats[:6])
+
+    def merge_table(self, other):
+        """Merges all the stats from another table into this one."""
+
+        if not self._slots:
+            # Nothing to merge with, so the columns of the other table
+            # can be copied in their entirety.
+
+            self._slots = dict(other._slots)
+            self._kinds = array("b", other._kinds)
+            self._c0 = array("d", other._c0)
+            self._c1 = array("d", other._c1)
+            self._c2 = array("d", other._c2)
+            self._c3 = array("d", other._c3)
+            self._c4 = array("d", other._c4)
+            self._c5 = array("d", other._c5)
+            return
+
+        slots = self._slots
+        kinds = self._kinds
+        c0, c1, c2, c3, c4, c5 = self._c0, self._c1, self._c2, self._c3, self._c4, self._c5
+
+        rows = list(zip(other._kinds, other._c0, other._c1, other._c2, other._c3, other._c4, other._c5))
+
+        for key, i in six.iteritems(other._slots):
+            kind, o0, o1, o2, o3, o4, o5 = rows[i]
+
+            slot = slots.get(key)
+            if slot is None:
+                self._append(key, kind, o0, o1, o2, o3, o4, o5)
+
+            elif kinds[slot] == _TIME_STATS:
+                # Time stats are by far the most common, so are merged
+                # inline rather than through _merge_row().
+
+                count = c0[slot]
+                c1[slot] += o1
+                c2[slot] += o2
+                c3[slot] = count and min(c3[slot], o3) or o3
+                c4[slot] = max(c4[slot], o4)
+                c5[slot] += o5
+                c0[slot] = count + o0
+
+            else:
+                self._merge_row(slot, o0, o1, o2, o3, o4, o5)
+
+    def normalize(self, normalizer):
+        """Returns a new table in which the metric names have been passed
+        through the normalizer, dropping any which are to be ignored and
+        re-aggregating any which collapse to the same name.
+
+        """
+
+        table = MetricStatsTable()
+        slots = table._slots
+
+        for (name, scope), i in six.iteritems(self._slots):
+            normalized_name, ignored = normalizer(name)
+            if ignored:
+                continue
+
+            key = (normalized_name, scope)
+            row = (self._c0[i], self._c1[i], self._c2[i], self._c3[i], self._c4[i], self._c5[i])
+
+            slot = slots.get(key)
+            if slot is None:
+                table._append(key, self._kinds[i], *row)
+            else:
+                table._merge_row(slot, *row)
+
+        return table
+
+
 class CustomMetrics(object):
 
     """Table for collection a set of value metrics."""
@@ -234,6 +506,19 @@ class CustomMetrics(object):
 
         return six.iteritems(self.__stats_table)
 
+    def merge_custom_metrics(self, metrics):
+        """Merges in the accumulated stats for an iterable of metric name
+        and stats pairs, such as returned by metrics() for another table.
+
+        """
+
+        for name, other in metrics:
+            stats = self.__stats_table.get(name)
+            if stats is None:
+                self.__stats_table[name] = copy.copy(other)
+            else:
+                stats.merge_stats(other)
+
     def reset_metric_stats(self):
         """Resets the accumulated statistics back to initial state for
         metric data.
@@ -412,6 +697,18 @@ class SampledDataSet(object):
         self.heap = False
         self.num_seen = 0
 
+    @property
+    def minimum_priority(self):
+        """The priority which a sample must exceed to be kept, or None if
+        the reservoir isn't yet full and any sample would be kept.
+
+        """
+
+        if self.heap:
+            return self.pq[0][0]
+
+        return None
+
     def should_sample(self, priority):
         if self.heap:
             # self.pq[0] is always the minimal
@@ -430,11 +727,11 @@ class SampledDataSet(object):
             priority = random.random()  # nosec
 
         entry = (priority, self.num_seen, sample)
-        if self.num_seen == self.capacity:
-            self.pq.append(entry)
-            self.heap = self.heap or heapify(self.pq) or True
-        elif not self.heap:
+        if not self.heap:
             self.pq.append(entry)
+            if len(self.pq) >= self.capacity:
+                heapify(self.pq)
+                self.heap = True
         else:
             sampled = self.should_sample(priority)
             if not sampled:
@@ -445,13 +742,67 @@ class SampledDataSet(object):
         if priority is None:
             priority = -1
 
-        for original_priority, seen_at, sample in other_data_set.pq:
-            self.add(sample, max(priority, original_priority))
+        # Samples are numbered in the order they are merged just as if
+        # they had been added one at a time, with num_seen then including
+        # those seen but not sampled by the other_data_set.
 
-        # Merge the num_seen from the other_data_set, but take care not to
-        # double-count the actual samples of other_data_set since the .add
-        # call above will add one to self.num_seen each time
-        self.num_seen += other_data_set.num_seen - other_data_set.num_samples
+        num_seen = self.num_seen
+        self.num_seen += other_data_set.num_seen
+
+        if self.capacity <= 0:
+            return
+
+        entries = [
+            (max(priority, original_priority), num_seen + index, sample)
+            for index, (original_priority, _, sample) in enumerate(other_data_set.pq, 1)
+        ]
+
+        if not entries:
+            return
+
+        pq = self.pq
+
+        if self.heap and len(entries) * MERGE_REBUILD_RATIO < self.capacity:
+            # Where only a few samples are being merged into a full
+            # reservoir, such as when merging in the samples from a single
+            # transaction, replacing the minimal sample for each is
+            # cheaper than rebuilding the heap.
+
+            for entry in entries:
+                if entry[0] > pq[0][0]:
+                    heapreplace(pq, entry)
+            return
+
+        pq.extend(entries)
+
+        capacity = self.capacity
+
+        if len(pq) > capacity:
+            # Select the samples with highest priority in one pass.
+
+            pq.sort(key=operator.itemgetter(0), reverse=True)
+
+            # As add() never replaces a sample with one of equal priority,
+            # where samples of equal priority straddle the capacity those
+            # seen first are retained. Unless the samples were previously
+            # held as a heap they are already in the order seen, which the
+            # stable sort will have preserved.
+
+            threshold = pq[capacity][0]
+            if self.heap and pq[capacity - 1][0] == threshold:
+                start = capacity - 1
+                while start and pq[start - 1][0] == threshold:
+                    start -= 1
+                end = capacity + 1
+                while end < len(pq) and pq[end][0] == threshold:
+                    end += 1
+                pq[start:end] = sorted(pq[start:end], key=operator.itemgetter(1))
+
+            del pq[capacity:]
+
+        if len(pq) >= capacity:
+            heapify(pq)
+            self.heap = True
 
 
 class LimitedDataSet(list):
@@ -532,7 +883,7 @@ class StatsEngine(object):
 
     def __init__(self):
         self.__settings = None
-        self.__stats_table = {}
+        self.__stats_table = MetricStatsTable()
         self.__dimensional_stats_table = DimensionalMetrics()
         self._transaction_events = SampledDataSet()
         self._error_events = SampledDataSet()
@@ -541,6 +892,7 @@ class StatsEngine(object):
         self._span_events = SampledDataSet()
         self._log_events = SampledDataSet()
         self._span_stream = None
+        self._parent = None
         self.__sql_stats_table = {}
         self.__slow_transaction = None
         self.__slow_transaction_map = {}
@@ -622,11 +974,7 @@ class StatsEngine(object):
         # as an empty string anyway.
 
         key = (metric.name, "")
-        stats = self.__stats_table.get(key)
-        if stats is None:
-            stats = ApdexStats(apdex_t=metric.apdex_t)
-            self.__stats_table[key] = stats
-        stats.merge_apdex_metric(metric)
+        self.__stats_table.record_apdex_metric(key, metric)
 
         return key
 
@@ -656,19 +1004,10 @@ class StatsEngine(object):
         # scope of None is reserved for apdex metrics.
 
         key = (metric.name, metric.scope or "")
-        stats = self.__stats_table.get(key)
-        if stats is None:
-            stats = TimeStats(
-                call_count=1,
-                total_call_time=metric.duration,
-                total_exclusive_call_time=metric.exclusive,
-                min_call_time=metric.duration,
-                max_call_time=metric.duration,
-                sum_of_squares=metric.duration**2,
-            )
-            self.__stats_table[key] = stats
-        else:
-            stats.merge_time_metric(metric)
+        exclusive = metric.exclusive
+        if exclusive is None:
+            exclusive = metric.duration
+        self.__stats_table.record_time_metric(key, metric.duration, exclusive)
 
         return key
 
@@ -975,11 +1314,7 @@ class StatsEngine(object):
         else:
             new_stats = TimeStats(1, value, value, value, value, value**2)
 
-        stats = self.__stats_table.get(key)
-        if stats is None:
-            self.__stats_table[key] = new_stats
-        else:
-            stats.merge_stats(new_stats)
+        self.__stats_table.merge_stats(key, new_stats)
 
         return key
 
@@ -1147,9 +1482,15 @@ class StatsEngine(object):
             self.__transaction_errors = self.__transaction_errors[: settings.agent_limits.errors_per_harvest]
 
         if error_collector.capture_events and error_collector.enabled and settings.collect_error_events:
-            events = transaction.error_events(self.__stats_table)
-            for event in events:
-                self._error_events.add(event, priority=transaction.priority)
+            if self._should_sample_events("_error_events", transaction.priority):
+                events = transaction.error_events(self.__stats_table)
+                for event in events:
+                    self._error_events.add(event, priority=transaction.priority)
+            else:
+                # The error events would all be discarded when merged, so
+                # skip generating them and only count them as seen.
+
+                self._error_events.num_seen += len(transaction.errors)
 
         # Capture any sql traces if transaction tracer enabled.
 
@@ -1189,8 +1530,11 @@ class StatsEngine(object):
             self._synthetics_events.add(event)
 
         elif settings.collect_analytics_events and settings.transaction_events.enabled:
-            event = transaction.transaction_event(self.__stats_table)
-            self._transaction_events.add(event, priority=transaction.priority)
+            if self._should_sample_events("_transaction_events", transaction.priority):
+                event = transaction.transaction_event(self.__stats_table)
+                self._transaction_events.add(event, priority=transaction.priority)
+            else:
+                self._transaction_events.num_seen += 1
 
         # Merge in custom events
 
@@ -1209,8 +1553,14 @@ class StatsEngine(object):
                 for event in transaction.span_protos(settings):
                     self._span_stream.put(event)
             elif transaction.sampled:
-                for event in transaction.span_events(self.__settings):
-                    self._span_events.add(event, priority=transaction.priority)
+                if self._should_sample_span_events(transaction.priority):
+                    for event in transaction.span_events(self.__settings):
+                        self._span_events.add(event, priority=transaction.priority)
+                else:
+                    # The spans would all be discarded when merged, so
+                    # skip generating them and only count them as seen.
+
+                    self._span_events.num_seen += transaction.span_event_count()
 
         # Merge in log events
 
@@ -1221,9 +1571,40 @@ class StatsEngine(object):
             and settings.application_logging.forwarding
             and settings.application_logging.forwarding.enabled
         ):
+            if transaction.deferred_log_events.num_seen:
+                self._add_deferred_log_events(transaction)
+
             self._log_events.merge(transaction.log_events, priority=transaction.priority)
 
-    def record_log_event(self, message, level=None, timestamp=None, attributes=None, priority=None):
+    def _add_deferred_log_events(self, transaction):
+        """Creates the log events for which the transaction only kept what
+        was logged, adding them to the log events of the transaction.
+
+        """
+
+        log_events = transaction.log_events
+        deferred_log_events = transaction.deferred_log_events
+
+        service_linking_metadata = get_service_linking_metadata(settings=self.__settings)
+
+        for priority, _, (message, level, created, attributes, span_id) in deferred_log_events.pq:
+            linking_metadata = dict(service_linking_metadata)
+            if span_id:
+                linking_metadata["span.id"] = span_id
+                linking_metadata["trace.id"] = transaction.trace_id
+
+            event = self._create_log_event(message, level, int(created * 1000), attributes, linking_metadata)
+            if event:
+                log_events.add(event, priority=priority)
+
+        # Those dropped as the reservoir of the transaction was full still
+        # count as seen.
+
+        log_events.num_seen += deferred_log_events.num_seen - deferred_log_events.num_samples
+
+    def record_log_event(
+        self, message, level=None, timestamp=None, attributes=None, priority=None, linking_metadata=None
+    ):
         settings = self.__settings
         if not (
             settings
@@ -1234,6 +1615,22 @@ class StatsEngine(object):
         ):
             return
 
+        event = self._create_log_event(message, level, timestamp, attributes, linking_metadata)
+
+        if not event:
+            return
+
+        if priority is None:
+            # Base priority for log events outside transactions is below those inside transactions
+            priority = random.random() - 1  # nosec
+
+        self._log_events.add(event, priority=priority)
+
+        return event
+
+    def _create_log_event(self, message, level=None, timestamp=None, attributes=None, linking_metadata=None):
+        settings = self.__settings
+
         timestamp = timestamp if timestamp is not None else time.time()
         level = str(level) if level is not None else "UNKNOWN"
         context_attributes = attributes  # Name reassigned for clarity
@@ -1285,23 +1682,17 @@ class StatsEngine(object):
                 return
 
         # Finally, add in linking attributes after checking that there is a valid message or at least 1 attribute
-        collected_attributes.update(get_linking_metadata())
+        if linking_metadata is None:
+            linking_metadata = get_linking_metadata()
+        collected_attributes.update(linking_metadata)
 
-        event = LogEventNode(
+        return LogEventNode(
             timestamp=timestamp,
             level=level,
             message=message,
             attributes=collected_attributes,
         )
 
-        if priority is None:
-            # Base priority for log events outside transactions is below those inside transactions
-            priority = random.random() - 1  # nosec
-
-        self._log_events.add(event, priority=priority)
-
-        return event
-
     def metric_data(self, normalizer=None):
         """Returns a list containing the low level metric data for
         sending to the core application pertaining to the reporting
@@ -1318,7 +1709,6 @@ class StatsEngine(object):
             return []
 
         result = []
-        normalized_stats = {}
 
         # Metric Renaming and Re-Aggregation. After applying the metric
         # renaming rules, the metrics are re-aggregated to collapse the
@@ -1332,17 +1722,7 @@ class StatsEngine(object):
             )
 
         if normalizer is not None:
-            for key, value in six.iteritems(self.__stats_table):
-                normalized_name, ignored = normalizer(key[0])
-                if ignored:
-                    continue
-
-                key = (normalized_name, key[1])
-                stats = normalized_stats.get(key)
-                if stats is None:
-                    normalized_stats[key] = copy.copy(value)
-                else:
-                    stats.merge_stats(value)
+            normalized_stats = self.__stats_table.normalize(normalizer)
         else:
             normalized_stats = self.__stats_table
 
@@ -1594,27 +1974,36 @@ class StatsEngine(object):
 
         trace_data = []
 
+        level = self.__settings.agent_limits.data_compression_level
+        level = level or zlib.Z_DEFAULT_COMPRESSION
+
         for trace in traces:
-            transaction_trace = trace.transaction_trace(self, maximum_nodes, connections)
+            if self.__settings.debug.log_transaction_trace_payload:
+                # The payload can only be logged if it is first built in
+                # full, rather than encoded as the nodes are walked.
 
-            data = [transaction_trace, list(trace.string_table.values())]
+                transaction_trace = trace.transaction_trace(self, maximum_nodes, connections)
+
+                data = [transaction_trace, list(trace.string_table.values())]
 
-            if self.__settings.debug.log_transaction_trace_payload:
                 _logger.debug("Encoding slow transaction data where payload=%r.", data)
 
-            json_data = json_encode(data)
+                json_data = json_encode(data)
 
-            level = self.__settings.agent_limits.data_compression_level
-            level = level or zlib.Z_DEFAULT_COMPRESSION
+                zlib_data = zlib.compress(six.b(json_data), level)
 
-            zlib_data = zlib.compress(six.b(json_data), level)
+                pack_data = base64.standard_b64encode(zlib_data)
 
-            pack_data = base64.standard_b64encode(zlib_data)
+                if six.PY3:
+                    pack_data = pack_data.decode("Latin-1")
 
-            if six.PY3:
-                pack_data = pack_data.decode("Latin-1")
+                start_time = transaction_trace.start_time
+                duration = transaction_trace.root.end_time - transaction_trace.root.start_time
 
-            root = transaction_trace.root
+            else:
+                start_time, duration, pack_data = encode_transaction_trace(
+                    trace, self, maximum_nodes, connections, level
+                )
 
             force_persist = bool(trace.record_tt)  # Check if exists
 
@@ -1625,8 +2014,8 @@ class StatsEngine(object):
 
             trace_data.append(
                 [
-                    transaction_trace.start_time,
-                    root.end_time - root.start_time,
+                    start_time,
+                    duration,
                     trace.path,
                     request_uri,
                     pack_data,
@@ -1721,9 +2110,17 @@ class StatsEngine(object):
         self.reset_synthetics_events()
         # streams are never reset after instantiation
         if reset_stream:
-            self._span_stream = StreamBuffer(
-                settings.infinite_tracing.span_queue_size, batching=settings.infinite_tracing.batching
-            )
+            infinite_tracing = settings.infinite_tracing
+
+            if infinite_tracing.adaptive_batching:
+                self._span_stream = StreamBuffer(
+                    infinite_tracing.span_queue_size,
+                    batching=infinite_tracing.batching,
+                    max_batch_bytes=infinite_tracing.max_batch_bytes,
+                    max_batch_age=infinite_tracing.max_batch_age,
+                )
+            else:
+                self._span_stream = StreamBuffer(infinite_tracing.span_queue_size, batching=infinite_tracing.batching)
 
     def reset_metric_stats(self):
         """Resets the accumulated statistics back to initial state for
@@ -1731,7 +2128,7 @@ class StatsEngine(object):
 
         """
 
-        self.__stats_table = {}
+        self.__stats_table = MetricStatsTable()
         self.__dimensional_stats_table.reset_metric_stats()
 
     def reset_transaction_events(self):
@@ -1823,7 +2220,7 @@ class StatsEngine(object):
         self.__slow_transaction = None
         self.__synthetics_transactions = []
         self.__sql_stats_table = {}
-        self.__stats_table = {}
+        self.__stats_table = MetricStatsTable()
         self.__transaction_errors = []
 
     def harvest_snapshot(self, flexible=False):
@@ -1881,19 +2278,47 @@ class StatsEngine(object):
 
         stats = copy.copy(self)
         stats.reset_stats(self.__settings)
+        stats._parent = self
 
         return stats
 
-    def merge(self, snapshot):
+    def _should_sample_events(self, name, priority):
+        """Returns whether events for a transaction with the given
+        priority could be kept in the named reservoir once this work area
+        is merged into its parent. When the reservoir of the parent is
+        already full and the priority doesn't beat its lowest priority
+        sample, the events would all be discarded by the merge, so need
+        not be generated.
+
+        """
+
+        parent = self._parent
+        if parent is None or priority is None:
+            return True
+
+        events = getattr(parent, name, None)
+        if events is None:
+            return True
+
+        minimum_priority = events.minimum_priority
+
+        return minimum_priority is None or priority > minimum_priority
+
+    def _should_sample_span_events(self, priority):
+        return self._should_sample_events("_span_events", priority)
+
+    def merge(self, snapshot, aggregated=False):
         """Merges data from a single transaction. Snapshot is an instance of
-        StatsEngine that contains stats for the single transaction.
+        StatsEngine that contains stats for the single transaction. If
+        aggregated is True, the snapshot is instead a per thread stats
+        engine shard which has accumulated data for many transactions.
         """
 
         if not self.__settings:
             return
 
         self.merge_metric_stats(snapshot)
-        self._merge_transaction_events(snapshot)
+        self._merge_transaction_events(snapshot, rollback=aggregated)
         self._merge_synthetics_events(snapshot)
         self._merge_error_events(snapshot)
         self._merge_error_traces(snapshot)
@@ -1938,17 +2363,14 @@ class StatsEngine(object):
         if not self.__settings:
             return
 
-        for key, other in six.iteritems(snapshot.__stats_table):
-            stats = self.__stats_table.get(key)
-            if not stats:
-                self.__stats_table[key] = other
-            else:
-                stats.merge_stats(other)
+        self.__stats_table.merge_table(snapshot.__stats_table)
 
     def _merge_transaction_events(self, snapshot, rollback=False):
         # Merge in transaction events. In the normal case snapshot is a
         # StatsEngine from a single transaction, and should only have one
         # event. Just to avoid issues, if there is more than one, don't merge.
+        # There may be none if the event was skipped as it would not have
+        # been sampled, but it still needs to be counted as seen.
 
         # If this is a rollback, snapshot is a copy of a previous main
         # StatsEngine, and self is still the current main StatsEngine. Then
@@ -1960,7 +2382,7 @@ class StatsEngine(object):
         if rollback:
             self._transaction_events.merge(events)
         else:
-            if events.num_samples == 1:
+            if events.num_samples <= 1:
                 self._transaction_events.merge(events)
 
     def _merge_synthetics_events(self, snapshot, rollback=False):
@@ -2062,12 +2484,7 @@ class StatsEngine(object):
             return
 
         for name, other in metrics:
-            key = (name, "")
-            stats = self.__stats_table.get(key)
-            if not stats:
-                self.__stats_table[key] = other
-            else:
-                stats.merge_stats(other)
+            self.__stats_table.merge_stats((name, ""), other)
 
     def merge_dimensional_metrics(self, metrics):
         """
@@ -33,6 +33,11 @@ try:
 except ImportError:
     from collections import MutableMapping
 
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
 from newrelic.core.config import global_settings
 from newrelic.core.loop_node import LoopNode
 
@@ -104,6 +109,16 @@ class TraceCache(MutableMapping):
     def __init__(self):
         self._cache = weakref.WeakValueDictionary()
 
+        # Traces saved for asyncio tasks are also indexed by the ID of
+        # the event loop for the task and then by the thread ID they are
+        # saved under, so that the traces for a loop can be found when
+        # recording the time the loop was blocked without going through
+        # the traces for every thread and task. Entries aren't removed
+        # when a different trace is saved under the thread ID, so must
+        # be checked against the trace cache before being used.
+
+        self._loop_traces = {}
+
     def __repr__(self):
         return "<%s object at 0x%x %s>" % (self.__class__.__name__, id(self), str(dict(self.items())))
 
@@ -137,10 +152,36 @@ class TraceCache(MutableMapping):
 
         return thread.get_ident()
 
+    def in_coroutine(self, thread_id):
+        """Returns whether the thread ID returned by current_thread_id()
+        for the caller is that of a greenlet or task rather than that of
+        the thread itself. Must be called from the same thread, greenlet
+        or task that the thread ID was obtained in.
+
+        """
+
+        # The thread ID is only the identifier of the thread when no
+        # greenlet or task was found, so if it differs, we are running
+        # in a coroutine. Where greenlets are used the thread module may
+        # have been monkey patched so that it returns the identifier of
+        # the greenlet instead, so in that case we also need to check
+        # that we aren't running in a greenlet.
+
+        if thread_id != thread.get_ident():
+            return True
+
+        if self.greenlet:
+            current = self.greenlet.getcurrent()
+            if current is not None and current.parent:
+                return True
+
+        return False
+
     def task_start(self, task):
         trace = self.current_trace()
         if trace:
             self[id(task)] = trace
+            self._index_loop_trace(id(task), trace)
 
     def task_stop(self, task):
         self.pop(id(task), None)
@@ -246,51 +287,94 @@ class TraceCache(MutableMapping):
         thread_id = trace.thread_id
 
         if thread_id in self:
-            cache_root = self[thread_id].root
-            if cache_root and cache_root is not trace.root and not cache_root.exited:
-                # Cached trace exists and has a valid root still
-                _logger.error(
-                    "Runtime instrumentation error. Attempt to "
-                    "save a trace from an inactive transaction. "
-                    "Report this issue to New Relic support.\n%s",
-                    "".join(traceback.format_stack()[:-1]),
-                )
-
-                raise TraceCacheActiveTraceError("transaction already active")
+            self._check_active_root(self[thread_id], trace)
 
         self[thread_id] = trace
 
-        # We judge whether we are actually running in a coroutine by
-        # seeing if the current thread ID is actually listed in the set
-        # of all current frames for executing threads. If we are
-        # executing within a greenlet, then thread.get_ident() will
-        # return the greenlet identifier. This will not be a key in
-        # dictionary of all current frames because that will still be
-        # the original standard thread which all greenlets are running
-        # within.
+        self._save_coroutine(trace)
+
+    def _check_active_root(self, current, trace):
+        cache_root = current.root
+        if cache_root and cache_root is not trace.root and not cache_root.exited:
+            # Cached trace exists and has a valid root still
+            _logger.error(
+                "Runtime instrumentation error. Attempt to "
+                "save a trace from an inactive transaction. "
+                "Report this issue to New Relic support.\n%s",
+                "".join(traceback.format_stack()[:-1]),
+            )
+
+            raise TraceCacheActiveTraceError("transaction already active")
+
+    def _save_coroutine(self, trace):
+        thread_id = trace.thread_id
+
+        # We judge whether we are actually running in a coroutine from
+        # the thread ID, which when running within a greenlet or task
+        # will be the identifier of the greenlet or task rather than of
+        # the thread. This avoids needing to look up the frames of all
+        # executing threads, the cost of which grows with the number of
+        # threads, each time a trace is started.
 
         trace._greenlet = None
 
-        if hasattr(sys, "_current_frames"):
-            if thread_id not in sys._current_frames():
-                if self.greenlet:
-                    trace._greenlet = weakref.ref(self.greenlet.getcurrent())
+        if self.in_coroutine(thread_id):
+            if self.greenlet:
+                trace._greenlet = weakref.ref(self.greenlet.getcurrent())
+
+            if self.asyncio and not hasattr(trace, "_task"):
+                task = current_task(self.asyncio)
+                trace._task = task
 
-                if self.asyncio and not hasattr(trace, "_task"):
-                    task = current_task(self.asyncio)
-                    trace._task = task
+            self._index_loop_trace(thread_id, trace)
+
+    def _index_loop_trace(self, thread_id, trace):
+        task = getattr(trace, "_task", None)
+        if task is None:
+            return
+
+        loop_id = id(get_event_loop(task))
+        traces = self._loop_traces.get(loop_id)
+
+        if traces is None:
+            # Drop the index for any loops which no longer have traces,
+            # such as loops which have since been closed.
+
+            for key, value in list(self._loop_traces.items()):
+                if not value:
+                    self._loop_traces.pop(key, None)
+
+            traces = self._loop_traces.setdefault(loop_id, weakref.WeakValueDictionary())
+
+        traces[thread_id] = trace
+
+    def set_current_trace(self, thread_id, trace):
+        """Makes the trace the current trace for the caller, whose thread
+        ID is that given, or removes the current trace if the trace is
+        None.
+
+        """
+
+        if trace is None:
+            self.pop(thread_id, None)
+        else:
+            self[thread_id] = trace
 
     def pop_current(self, trace):
         """Restore the trace's parent under the thread ID of the current
         executing thread."""
 
-        if hasattr(trace, "_task"):
+        coroutine = hasattr(trace, "_task")
+        if coroutine:
             delattr(trace, "_task")
 
         thread_id = trace.thread_id
         parent = trace.parent
         self[thread_id] = parent
 
+        if coroutine:
+            self._index_loop_trace(thread_id, parent)
+
     def complete_root(self, root):
         """Completes a trace specified by the given root
 
@@ -364,8 +448,12 @@ class TraceCache(MutableMapping):
         task = getattr(transaction.root_span, "_task", None)
         loop = get_event_loop(task)
 
-        for trace in self.values():
-            if trace in seen:
+        traces = loop is not None and self._loop_traces.get(id(loop))
+
+        for ref in traces.valuerefs() if traces else ():
+            trace = ref()
+
+            if trace is None or trace in seen or self.get(ref.key) is not trace:
                 continue
 
             # If the trace is on a different transaction and it's asyncio
@@ -452,6 +540,116 @@ class TraceCache(MutableMapping):
         return bool(self._cache.__len__())
 
 
+class ContextVarTraceCache(TraceCache):
+    """A trace cache which holds the current trace for the caller in a
+    context variable, so that looking up the current trace doesn't need
+    the thread ID of the caller to be worked out first. As the context
+    for an asyncio task is a copy of that it was created in, a task will
+    also start out with the current trace of its creator without needing
+    it to be saved against the task. Traces are still saved under their
+    thread ID, as for the base class, so the traces for all threads and
+    tasks can be found when profiling or completing a transaction.
+
+    """
+
+    def __init__(self):
+        super(ContextVarTraceCache, self).__init__()
+
+        # The context variable holds a weak reference to the trace, so
+        # that a context which outlives a transaction, such as that of
+        # a task created within it, doesn't keep the transaction alive.
+
+        self._current = contextvars.ContextVar("newrelic_current_trace", default=None)
+
+    def current_transaction(self):
+        trace = self.current_trace()
+        return trace and trace.transaction
+
+    def current_trace(self):
+        trace = self._saved_trace()
+
+        # A trace may be exited in a different context to that it was
+        # entered in, such as when completing the root of a transaction
+        # exits the traces still active in other tasks. Where the trace
+        # is saved under the thread ID, its parent would then be saved
+        # in its place, so the same trace is returned here. The parent
+        # is cleared once the trace is complete, leaving no trace.
+
+        while trace is not None and trace.exited:
+            trace = trace.parent
+
+        return trace
+
+    def _saved_trace(self):
+        ref = self._current.get()
+        return ref and ref()
+
+    def task_start(self, task):
+        # The task already has the current trace in its copy of the
+        # context, so there is nothing to save.
+
+        pass
+
+    def prepare_for_root(self):
+        trace = self.current_trace()
+        if not trace:
+            return None
+
+        if not hasattr(trace, "_task"):
+            return trace
+
+        task = current_task(self.asyncio)
+        if (task is not None and id(trace._task) != id(task)) or (trace.root and trace.root.exited):
+            self.set_current_trace(self.current_thread_id(), None)
+            return None
+
+        return trace
+
+    def save_trace(self, trace):
+        current = self.current_trace()
+
+        if current is not None:
+            self._check_active_root(current, trace)
+
+        self[trace.thread_id] = trace
+        self._current.set(weakref.ref(trace))
+
+        self._save_coroutine(trace)
+
+    def set_current_trace(self, thread_id, trace):
+        super(ContextVarTraceCache, self).set_current_trace(thread_id, trace)
+        self._current.set(trace and weakref.ref(trace))
+
+    def pop_current(self, trace):
+        super(ContextVarTraceCache, self).pop_current(trace)
+
+        # The trace may be exited in a different context to that it was
+        # entered in, in which case the current trace in this context
+        # is left alone.
+
+        if self._saved_trace() is trace:
+            self._current.set(weakref.ref(trace.parent))
+
+    def complete_root(self, root):
+        # A task inherits the current trace without it being saved under
+        # the thread ID of the task, so where a transaction is completed
+        # in a different task to that it was started in, and the task it
+        # was started in is done, the root has to be saved first.
+
+        if root.thread_id not in self and self._saved_trace() is root:
+            self[self.current_thread_id()] = root
+
+        super(ContextVarTraceCache, self).complete_root(root)
+
+        if self._saved_trace() is root:
+            self._current.set(None)
+
+
+TRACE_CACHE_BACKENDS = {"weakref": TraceCache}
+
+if contextvars is not None:
+    TRACE_CACHE_BACKENDS["contextvars"] = ContextVarTraceCache
+
 _trace_cache = TraceCache()
 
 
@@ -459,6 +657,29 @@ def trace_cache():
     return _trace_cache
 
 
+def use_trace_cache_backend(backend):
+    """Replaces the global trace cache with one for the named backend, if
+    it isn't already of that type. Must be called before any traces are
+    saved, as those in the existing trace cache are not carried over.
+
+    """
+
+    global _trace_cache
+
+    cls = TRACE_CACHE_BACKENDS.get(backend)
+
+    if cls is None:
+        _logger.warning(
+            "The trace cache backend %r is not available, the %r trace cache backend will be used instead.",
+            backend,
+            "weakref",
+        )
+        cls = TraceCache
+
+    if type(_trace_cache) is not cls:
+        _trace_cache = cls()
+
+
 def greenlet_loaded(module):
     _trace_cache.greenlet = module
 
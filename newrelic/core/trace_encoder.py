@@ -0,0 +1,197 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""This module implements the encoding of a transaction trace into the
+compressed and base64 encoded payload sent to the data collector. The
+JSON for the trace is written out a segment at a time as the tree of
+nodes is walked, straight into an incremental zlib compressor, rather
+than first building the whole tree of trace nodes and then the whole
+JSON string for it.
+
+"""
+
+import base64
+import zlib
+
+from newrelic.common.encoding_utils import json_encoder
+from newrelic.core.trace_node import root_start_time
+from newrelic.packages import six
+
+_encode = json_encoder().encode
+
+
+class TraceEncoder(object):
+    """Accumulates the fragments of JSON for a transaction trace, passing
+    them to the compressor in batches so that it isn't called for every
+    fragment. Fragments can be appended directly to the list of pending
+    fragments, provided compress() is then called once there are enough
+    of them to make a batch.
+
+    """
+
+    BATCH_SIZE = 256
+
+    # The number of trace nodes for leaves encoded together.
+
+    LEAF_BATCH_SIZE = 64
+
+    def __init__(self, level=None):
+        self._compressor = zlib.compressobj(level or zlib.Z_DEFAULT_COMPRESSION)
+        self._chunks = []
+        self.fragments = []
+
+    def write(self, fragment):
+        self.fragments.append(fragment)
+
+        if len(self.fragments) >= self.BATCH_SIZE:
+            self.compress()
+
+    def compress(self):
+        chunk = self._compressor.compress(six.b("".join(self.fragments)))
+        del self.fragments[:]
+
+        if chunk:
+            self._chunks.append(chunk)
+
+    def finish(self):
+        """Returns the compressed JSON as a base64 encoded string."""
+
+        self.compress()
+        self._chunks.append(self._compressor.flush())
+
+        pack_data = base64.standard_b64encode(b"".join(self._chunks))
+
+        if six.PY3:
+            pack_data = pack_data.decode("Latin-1")
+
+        return pack_data
+
+
+def _trace_node_start(trace_node):
+    # Everything up to the list of children, leaving that list open.
+
+    return "%s,[" % _encode(trace_node[:4])[:-1]
+
+
+def _trace_node_end(trace_node):
+    if trace_node.label is None:
+        return "],null]"
+
+    return "],%s]" % _encode(trace_node.label)
+
+
+def encode_transaction_trace(transaction, stats, limit, connections, level=None):
+    """Encodes the transaction trace for the transaction node, capped at
+    the limit on the number of nodes, in the same form as from encoding
+    the result of transaction.transaction_trace() along with the values
+    from the string table. Returns a tuple of the start time of the
+    trace, the duration of the root segment and the encoded payload.
+
+    """
+
+    transaction.trace_node_count = 0
+    transaction.trace_node_limit = limit
+
+    start_time = root_start_time(transaction)
+
+    encoder = TraceEncoder(level)
+    write = encoder.write
+
+    root = transaction.root
+    trace_node = root.own_trace_node(stats, transaction, connections)
+
+    # There is an additional trace node labeled as 'ROOT' above the node
+    # for the root of the transaction, with the same start and end time.
+
+    write("[[%s,{},{}," % _encode(start_time))
+    write(_encode([trace_node.start_time, trace_node.end_time, "ROOT", {}])[:-1])
+    write(",[")
+    write(_trace_node_start(trace_node))
+
+    # Walk the tree of nodes with an explicit stack, the same as when
+    # the trace nodes are built by trace_node(). Each entry holds the
+    # iterator over the children of a node, its trace node, and whether
+    # any of the children has been written yet. Trace nodes for children
+    # which are leaves are collected and encoded together, as encoding
+    # them one at a time is much slower.
+
+    fragments = encoder.fragments
+    append = fragments.append
+    batch_size = encoder.BATCH_SIZE
+    leaf_batch_size = encoder.LEAF_BATCH_SIZE
+
+    leaves = []
+
+    def write_leaves(entry):
+        if entry[2]:
+            append(",")
+        else:
+            entry[2] = True
+
+        append(_encode(leaves)[1:-1])
+        del leaves[:]
+
+    empty = iter(())
+
+    stack = [[iter(root.children) if root.trace_node_children else empty, trace_node, False]]
+
+    while stack:
+        entry = stack[-1]
+
+        child = None
+
+        if transaction.trace_node_count <= transaction.trace_node_limit:
+            child = next(entry[0], None)
+
+        if child is None:
+            if leaves:
+                write_leaves(entry)
+
+            stack.pop()
+            append(_trace_node_end(entry[1]))
+            continue
+
+        child_trace_node = child.own_trace_node(stats, transaction, connections)
+
+        if not child.trace_node_children or not child.children:
+            leaves.append(child_trace_node)
+
+            if len(leaves) >= leaf_batch_size:
+                write_leaves(entry)
+                encoder.compress()
+
+            continue
+
+        if leaves:
+            write_leaves(entry)
+
+        if entry[2]:
+            append(",")
+        else:
+            entry[2] = True
+
+        append(_trace_node_start(child_trace_node))
+
+        if len(fragments) >= batch_size:
+            encoder.compress()
+
+        stack.append([iter(child.children), child_trace_node, False])
+
+    write("],null],")
+    write(_encode(transaction.transaction_trace_attributes()))
+    write("],")
+    write(_encode(transaction.string_table.values()))
+    write("]")
+
+    return start_time, trace_node.end_time - trace_node.start_time, encoder.finish()
@@ -32,6 +32,7 @@ from newrelic.core.attribute_filter import (
     DST_TRANSACTION_TRACER,
 )
 from newrelic.core.metric import ApdexMetric, TimeMetric
+from newrelic.core.node_mixin import walk_time_metrics
 from newrelic.core.string_table import StringTable
 
 try:
@@ -64,6 +65,7 @@ _TransactionNode = namedtuple(
         "custom_events",
         "ml_events",
         "log_events",
+        "deferred_log_events",
         "apdex_t",
         "suppress_apdex",
         "custom_metrics",
@@ -257,9 +259,8 @@ class TransactionNode(_TransactionNode):
                 yield TimeMetric(name="ErrorsExpected/all", scope="", duration=0.0, exclusive=None)
 
         # Now for the children.
-        for child in self.root.children:
-            for metric in child.time_metrics(stats, self, self):
-                yield metric
+        for metric in walk_time_metrics(self.root.children, stats, self, self):
+            yield metric
 
     def apdex_metrics(self, stats):
         """Return a generator yielding the apdex metrics for this node."""
@@ -389,21 +390,7 @@ class TransactionNode(_TransactionNode):
 
         trace_node = self.root.trace_node(stats, self, connections)
 
-        attributes = {}
-
-        attributes["intrinsics"] = self.trace_intrinsics
-
-        attributes["agentAttributes"] = {}
-        for attr in self.agent_attributes:
-            if attr.destinations & DST_TRANSACTION_TRACER:
-                attributes["agentAttributes"][attr.name] = attr.value
-                if attr.name == "request.uri":
-                    self.include_transaction_trace_request_uri = True
-
-        attributes["userAttributes"] = {}
-        for attr in self.user_attributes:
-            if attr.destinations & DST_TRANSACTION_TRACER:
-                attributes["userAttributes"][attr.name] = attr.value
+        attributes = self.transaction_trace_attributes()
 
         # There is an additional trace node labeled as 'ROOT'
         # that needs to be inserted below the root node object
@@ -423,6 +410,25 @@ class TransactionNode(_TransactionNode):
             start_time=start_time, empty0={}, empty1={}, root=root, attributes=attributes
         )
 
+    def transaction_trace_attributes(self):
+        attributes = {}
+
+        attributes["intrinsics"] = self.trace_intrinsics
+
+        attributes["agentAttributes"] = {}
+        for attr in self.agent_attributes:
+            if attr.destinations & DST_TRANSACTION_TRACER:
+                attributes["agentAttributes"][attr.name] = attr.value
+                if attr.name == "request.uri":
+                    self.include_transaction_trace_request_uri = True
+
+        attributes["userAttributes"] = {}
+        for attr in self.user_attributes:
+            if attr.destinations & DST_TRANSACTION_TRACER:
+                attributes["userAttributes"][attr.name] = attr.value
+
+        return attributes
+
     def slow_sql_nodes(self, stats):
         for item in self.slow_sql:
             yield item.slow_sql_node(stats, self)
@@ -641,6 +647,20 @@ class TransactionNode(_TransactionNode):
         for i_attrs, u_attrs, a_attrs in self.span_events(settings, attr_class=SpanProtoAttrs):
             yield Span(trace_id=self.trace_id, intrinsics=i_attrs, user_attributes=u_attrs, agent_attributes=a_attrs)
 
+    def span_event_count(self):
+        """Returns the number of span events span_events() would yield,
+        without generating them.
+
+        """
+
+        count = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+        return count
+
     def span_events(self, settings, attr_class=dict):
         base_attrs = attr_class(
             (
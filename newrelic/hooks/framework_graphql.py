@@ -377,15 +377,18 @@ def wrap_resolve_field(wrapped, instance, args, kwargs):
     else:
         field_path = field_path.key
 
-    trace = GraphQLResolverTrace(
-        field_name, field_parent_type=parent_type.name, field_return_type=field_return_type, field_path=field_path
-    )
+    def resolver_trace():
+        return GraphQLResolverTrace(
+            field_name, field_parent_type=parent_type.name, field_return_type=field_return_type, field_path=field_path
+        )
+
     start_time = time.time()
 
     try:
         result = wrapped(*args, **kwargs)
     except Exception:
         # Synchonous resolver with exception raised
+        trace = resolver_trace()
         with trace:
             trace.start_time = start_time
             notice_error(ignore=ignore_graphql_duplicate_exception)
@@ -394,13 +397,29 @@ def wrap_resolve_field(wrapped, instance, args, kwargs):
     if isawaitable(result):
         # Asynchronous resolvers (returned coroutines from non-coroutine functions)
         # Return a coroutine that handles wrapping in a resolver trace
-        return nr_coro_resolver_wrapper(wrapped, trace, ignore_graphql_duplicate_exception, result)
-    else:
-        # Synchonous resolver with no exception raised
-        with trace:
-            trace.start_time = start_time
+        return nr_coro_resolver_wrapper(wrapped, resolver_trace(), ignore_graphql_duplicate_exception, result)
+
+    rollup_settings = transaction.settings.instrumentation.graphql.resolver_rollup
+    if rollup_settings.enabled:
+        # Fast resolutions are folded into the operation instead of each
+        # being given a trace of their own.
+        duration = time.time() - start_time
+        parent = current_trace()
+        if (
+            duration < rollup_settings.threshold
+            and isinstance(parent, GraphQLOperationTrace)
+            and parent.activated
+            and not parent.exited
+        ):
+            parent.rollup_resolver(field_name, parent_type.name, field_return_type, field_path, start_time, duration)
             return result
 
+    # Synchonous resolver with no exception raised
+    trace = resolver_trace()
+    with trace:
+        trace.start_time = start_time
+        return result
+
 
 def bind_graphql_impl_query(schema, source, *args, **kwargs):
     return schema, source
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from newrelic.api.application import application_instance
-from newrelic.api.time_trace import get_linking_metadata
+from newrelic.api.time_trace import current_trace, get_linking_metadata
 from newrelic.api.transaction import current_transaction, record_log_event
 from newrelic.common.object_wrapper import function_wrapper, wrap_function_wrapper
 from newrelic.core.config import global_settings
@@ -39,6 +39,31 @@ def add_nr_linking_metadata(message):
     return "%s %s|" % (message, nr_linking_str)
 
 
+def defer_log_event(transaction, record, message, level_name, settings):
+    """Captures only what was logged, leaving the log event to be created
+    later. Log events in a transaction are kept on the transaction, so they
+    take its final priority and are dropped along with it if it is ignored.
+    Those outside of a transaction are handed to the application to be
+    recorded in the background.
+
+    """
+    if settings.application_logging.forwarding.context_data.enabled:
+        context_attrs = record.__dict__.copy()
+        for key in IGNORED_LOG_RECORD_KEYS:
+            context_attrs.pop(key, None)
+    else:
+        context_attrs = None
+
+    if transaction:
+        transaction._defer_log_event(message, level_name, record.created, context_attrs, current_trace())
+        return
+
+    application = application_instance(activate=False)
+
+    if application and application.enabled:
+        application.defer_log_event(message, level_name, int(record.created * 1000), attributes=context_attrs)
+
+
 @function_wrapper
 def wrap_getMessage(wrapped, instance, args, kwargs):
     message = wrapped(*args, **kwargs)
@@ -82,13 +107,19 @@ def wrap_callHandlers(wrapped, instance, args, kwargs):
                     # Allow python to convert the message to a string and template it with args.
                     message = record.getMessage()
 
-                # Grab and filter context attributes from log record
-                record_attrs = vars(record)
-                context_attrs = {k: record_attrs[k] for k in record_attrs if k not in IGNORED_LOG_RECORD_KEYS}
-
-                record_log_event(
-                    message=message, level=level_name, timestamp=int(record.created * 1000), attributes=context_attrs
-                )
+                if settings.application_logging.forwarding.deferred.enabled:
+                    defer_log_event(transaction, record, message, level_name, settings)
+                else:
+                    # Grab and filter context attributes from log record
+                    record_attrs = vars(record)
+                    context_attrs = {k: record_attrs[k] for k in record_attrs if k not in IGNORED_LOG_RECORD_KEYS}
+
+                    record_log_event(
+                        message=message,
+                        level=level_name,
+                        timestamp=int(record.created * 1000),
+                        attributes=context_attrs,
+                    )
             except Exception:
                 pass
 
@@ -21,6 +21,7 @@ from newrelic.api.message_trace import MessageTrace
 from newrelic.api.message_transaction import MessageTransaction
 from newrelic.api.time_trace import notice_error
 from newrelic.api.transaction import current_transaction
+from newrelic.common.encoding_utils import payload_size
 from newrelic.common.object_wrapper import function_wrapper, wrap_function_wrapper
 from newrelic.common.package_version_utils import get_package_version
 
@@ -113,62 +114,98 @@ def wrap_Consumer_poll(wrapped, instance, args, kwargs):
     #      Since it's not running inside of an existing transaction, we
     #      want to create a new background transaction for it.
 
+    # Steps 1 and 2: Stop existing transactions and poll for records
+    record = _poll_for_records(wrapped, instance, args, kwargs)
+
+    # Step 3: Start new transaction for received record
+    if record:
+        _start_message_transaction(wrapped, instance, [record])
+
+    return record
+
+
+def wrap_Consumer_consume(wrapped, instance, args, kwargs):
+    # Batch polling is handled as for poll() above, except that a single
+    # transaction is started for the whole batch of records received
+    # rather than one for each record.
+
+    # Steps 1 and 2: Stop existing transactions and poll for records
+    records = _poll_for_records(wrapped, instance, args, kwargs)
+
+    # Step 3: Start new transaction for received records
+    if records:
+        _start_message_transaction(wrapped, instance, records)
+
+    return records
+
+
+def _poll_for_records(wrapped, instance, args, kwargs):
     # Step 1: Stop existing transactions
     if hasattr(instance, "_nr_transaction") and not instance._nr_transaction.stopped:
         instance._nr_transaction.__exit__(*sys.exc_info())
 
     # Step 2: Poll for records
     try:
-        record = wrapped(*args, **kwargs)
-    except Exception as e:
+        return wrapped(*args, **kwargs)
+    except Exception:
         if current_transaction():
             notice_error()
         else:
             notice_error(application=application_instance(activate=False))
         raise
 
-    # Step 3: Start new transaction for received record
-    if record:
-        library = "Kafka"
-        destination_type = "Topic"
-        destination_name = record.topic()
-        received_bytes = len(str(record.value()).encode("utf-8"))
-        message_count = 1
-
-        headers = record.headers()
-        headers = dict(headers) if headers else {}
-
-        transaction = current_transaction(active_only=False)
-        if not transaction:
-            transaction = MessageTransaction(
-                application=application_instance(),
-                library=library,
-                destination_type=destination_type,
-                destination_name=destination_name,
-                headers=headers,
-                transport_type="Kafka",
-                routing_key=record.key(),
-                source=wrapped,
-            )
-            instance._nr_transaction = transaction
-            transaction.__enter__()  # pylint: disable=C2801
-
-            transaction._add_agent_attribute("kafka.consume.byteCount", received_bytes)
-
-        transaction = current_transaction()
-
-        if transaction:  # If there is an active transaction now.
-            # Add metrics whether or not a transaction was already active, or one was just started.
-            # Don't add metrics if there was an inactive transaction.
-            # Name the metrics using the same format as the transaction, but in case the active transaction
-            # was an existing one and not a message transaction, reproduce the naming logic here.
-            group = "Message/%s/%s" % (library, destination_type)
-            name = "Named/%s" % destination_name
+
+def _start_message_transaction(wrapped, instance, records):
+    # The transaction is named for, and continues any distributed trace
+    # of, the first record. Metrics are recorded for each topic received
+    # from.
+    record = records[0]
+
+    library = "Kafka"
+    destination_type = "Topic"
+    destination_name = record.topic()
+
+    received = {}
+    for _record in records:
+        topic = _record.topic()
+        received_bytes, message_count = received.get(topic, (0, 0))
+        received[topic] = (received_bytes + payload_size(_record.value()), message_count + 1)
+
+    headers = record.headers()
+    headers = dict(headers) if headers else {}
+
+    transaction = current_transaction(active_only=False)
+    if not transaction:
+        transaction = MessageTransaction(
+            application=application_instance(),
+            library=library,
+            destination_type=destination_type,
+            destination_name=destination_name,
+            headers=headers,
+            transport_type="Kafka",
+            routing_key=record.key(),
+            source=wrapped,
+        )
+        instance._nr_transaction = transaction
+        transaction.__enter__()  # pylint: disable=C2801
+
+        transaction._add_agent_attribute(
+            "kafka.consume.byteCount", sum(received_bytes for received_bytes, _ in received.values())
+        )
+
+    transaction = current_transaction()
+
+    if transaction:  # If there is an active transaction now.
+        # Add metrics whether or not a transaction was already active, or one was just started.
+        # Don't add metrics if there was an inactive transaction.
+        # Name the metrics using the same format as the transaction, but in case the active transaction
+        # was an existing one and not a message transaction, reproduce the naming logic here.
+        group = "Message/%s/%s" % (library, destination_type)
+        for topic, (received_bytes, message_count) in received.items():
+            name = "Named/%s" % topic
             transaction.record_custom_metric("%s/%s/Received/Bytes" % (group, name), received_bytes)
             transaction.record_custom_metric("%s/%s/Received/Messages" % (group, name), message_count)
-            transaction.add_messagebroker_info("Confluent-Kafka", get_package_version("confluent-kafka"))
-
-    return record
+        transaction.add_messagebroker_info("Confluent-Kafka", get_package_version("confluent-kafka"))
 
 
 def wrap_DeserializingConsumer_poll(wrapped, instance, args, kwargs):
@@ -234,6 +271,7 @@ def instrument_confluentkafka_cimpl(module):
     if hasattr(module, "Consumer"):
         wrap_immutable_class(module, "Consumer")
         wrap_function_wrapper(module, "Consumer.poll", wrap_Consumer_poll)
+        wrap_function_wrapper(module, "Consumer.consume", wrap_Consumer_consume)
 
 
 def instrument_confluentkafka_serializing_producer(module):
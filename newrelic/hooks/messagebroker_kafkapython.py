@@ -21,6 +21,7 @@ from newrelic.api.message_trace import MessageTrace
 from newrelic.api.message_transaction import MessageTransaction
 from newrelic.api.time_trace import current_trace, notice_error
 from newrelic.api.transaction import current_transaction
+from newrelic.common.encoding_utils import payload_size
 from newrelic.common.object_wrapper import (
     ObjectProxy,
     function_wrapper,
@@ -116,7 +117,7 @@ def wrap_kafkaconsumer_next(wrapped, instance, args, kwargs):
         library = "Kafka"
         destination_type = "Topic"
         destination_name = record.topic
-        received_bytes = len(str(record.value).encode("utf-8"))
+        received_bytes = payload_size(record.value)
         message_count = 1
 
         transaction = current_transaction(active_only=False)
@@ -24,7 +24,7 @@ from newrelic.common.stopwatch import start_timer
 
 from newrelic.samplers.decorators import data_source_factory
 
-@data_source_factory(name='CPU Usage')
+@data_source_factory(name='CPU Usage', high_frequency=True)
 class _CPUUsageDataSource(object):
 
     def __init__(self, settings, environ):
@@ -18,13 +18,79 @@ manages the consumption of data from a data source.
 """
 
 import logging
+import threading
+from array import array
 
 from newrelic.common.object_names import callable_name
+from newrelic.core.config import global_settings
 
 _logger = logging.getLogger(__name__)
 
+class SampleBuffer(object):
+
+    """Accumulates the values polled from a data source for one metric
+    between harvests. The count, total, min, max and sum of squares are
+    kept over all values, with the most recent values also retained in
+    a fixed size ring buffer from which percentiles are calculated.
+
+    """
+
+    def __init__(self, size):
+        self.values = array('d', [0.0]) * size
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        self.sum_of_squares = 0.0
+        self.index = 0
+        self.retained = 0
+
+    def append(self, value):
+        if self.count:
+            if value < self.min:
+                self.min = value
+            elif value > self.max:
+                self.max = value
+        else:
+            self.min = self.max = value
+
+        self.count += 1
+        self.total += value
+        self.sum_of_squares += value * value
+
+        size = len(self.values)
+
+        self.values[self.index] = value
+        self.index = (self.index + 1) % size
+
+        if self.retained < size:
+            self.retained += 1
+
+    def summary(self):
+        return dict(count=self.count, total=self.total, min=self.min,
+                max=self.max, sum_of_squares=self.sum_of_squares)
+
+    def percentiles(self, percentiles):
+        values = sorted(self.values[:self.retained])
+
+        if not values:
+            return []
+
+        last = len(values) - 1
+
+        return [(percentile, values[int(round(last * percentile / 100.0))])
+                for percentile in percentiles]
+
 class DataSampler(object):
 
+    # The percentiles reported for data sources being polled between
+    # harvests, in addition to the min, max and mean of the values.
+
+    PERCENTILES = (50, 95, 99)
+
     def __init__(self, consumer, source, name, settings, **properties):
         self.consumer = consumer
 
@@ -55,6 +121,16 @@ class DataSampler(object):
         if self.version is None and hasattr(source, 'version'):
             self.version = source.version
 
+        # Data sources flagged as high frequency can be polled between
+        # harvests, with what is reported at harvest then derived from
+        # all of the values collected.
+
+        self.high_frequency = self.merged_properties.get(
+                'high_frequency', False)
+
+        self.buffers = {}
+        self.lock = threading.Lock()
+
         environ = {}
 
         environ['consumer.name'] = consumer
@@ -83,17 +159,59 @@ class DataSampler(object):
             self.instance.start()
 
     def stop(self):
+        with self.lock:
+            self.buffers = {}
+
         if hasattr(self.instance, 'stop'):
             self.instance.stop()
         else:
             self.instance = None
 
+    def sample(self):
+        """Polls the data source, adding the values to those collected
+        for each metric since the last harvest.
+
+        """
+
+        if self.instance is None:
+            return
+
+        with self.lock:
+            buffers = self.buffers
+
+            for name, value in self.instance() or ():
+                buffer = buffers.get(name)
+
+                if buffer is None:
+                    size = global_settings().high_frequency_sampling.buffer_size
+                    buffer = buffers[name] = SampleBuffer(max(size, 1))
+
+                buffer.append(value)
+
+    def _sampled_metrics(self):
+        for name, buffer in self.buffers.items():
+            if not buffer.count:
+                continue
+
+            yield name, buffer.summary()
+
+            for percentile, value in buffer.percentiles(self.PERCENTILES):
+                yield '%s/Percentile/%d' % (name, percentile), value
+
+            buffer.reset()
+
     def metrics(self):
         if self.instance is None:
             return []
 
+        with self.lock:
+            if any(buffer.count for buffer in self.buffers.values()):
+                metrics = list(self._sampled_metrics())
+            else:
+                metrics = list(self.instance() or ())
+
         if self.group:
             return (('%s/%s' % (self.group, key), value)
-                    for key, value in self.instance())
+                    for key, value in metrics)
         else:
-            return self.instance()
+            return metrics
@@ -15,6 +15,7 @@
 import gc
 import os
 import platform
+import random
 import time
 from collections import Counter
 
@@ -45,6 +46,37 @@ class _GCDataSource(object):
         settings = global_settings()
         return settings.gc_runtime_metrics.top_object_count_limit
 
+    @property
+    def top_object_sample_size(self):
+        settings = global_settings()
+        return settings.gc_runtime_metrics.top_object_sample_size
+
+    def object_type_counts(self):
+        """Returns the number of objects tracked by the garbage collector
+        for each type. When there are more objects than the sample size,
+        the types of only an evenly spaced subset of the objects, from a
+        random starting point, are counted and the counts scaled up. This
+        bounds the time spent holding the GIL counting types, which for
+        millions of objects would otherwise take hundreds of milliseconds.
+
+        """
+
+        objects = gc.get_objects()
+
+        total = len(objects)
+        sample_size = self.top_object_sample_size
+
+        step = total // sample_size if sample_size > 0 else 0
+
+        if step < 2:
+            return Counter(map(type, objects))
+
+        objects = objects[random.randrange(step) :: step]
+
+        scale = float(total) / len(objects)
+
+        return Counter({obj_type: int(round(count * scale)) for obj_type, count in Counter(map(type, objects)).items()})
+
     def record_gc(self, phase, info):
         if not self.enabled:
             return
@@ -92,9 +124,8 @@ class _GCDataSource(object):
 
         # Record object count for top five types with highest count
         if hasattr(gc, "get_objects"):
-            object_types = map(type, gc.get_objects())
             if self.top_object_count_limit > 0:
-                highest_types = Counter(object_types).most_common(self.top_object_count_limit)
+                highest_types = self.object_type_counts().most_common(self.top_object_count_limit)
                 for obj_type, count in highest_types:
                     yield (
                         "GC/objects/%d/type/%s" % (self.pid, callable_name(obj_type)),
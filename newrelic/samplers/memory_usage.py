@@ -22,7 +22,7 @@ from newrelic.common.system_info import physical_memory_used, total_physical_mem
 from newrelic.samplers.decorators import data_source_generator
 
 
-@data_source_generator(name="Memory Usage")
+@data_source_generator(name="Memory Usage", high_frequency=True)
 def memory_usage_data_source():
     memory = physical_memory_used()
     total_memory = total_physical_memory()
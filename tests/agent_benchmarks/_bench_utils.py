@@ -0,0 +1,210 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared helpers for the agent benchmarks in this directory.
+
+The benchmarks are standalone scripts rather than test cases, so are not
+collected by pytest. Run them directly from the repository root with the
+tests directory on the path, for example:
+
+    PYTHONPATH=tests python tests/agent_benchmarks/bench_stats_sharding.py
+
+"""
+
+import copy
+import time
+from contextlib import contextmanager
+
+from newrelic.core.config import (
+    apply_config_setting,
+    finalize_application_settings,
+    global_settings,
+)
+from newrelic.core.function_node import FunctionNode
+from newrelic.core.root_node import RootNode
+from newrelic.core.stats_engine import CustomMetrics, DimensionalMetrics, SampledDataSet
+from newrelic.core.transaction_node import TransactionNode
+
+
+@contextmanager
+def override_settings(overrides, settings_object=None):
+    """Temporarily applies the dotted name overrides to the global
+    settings, restoring the original settings on exit.
+
+    """
+
+    settings_object = settings_object or global_settings()
+    backup = copy.deepcopy(settings_object.__dict__)
+
+    try:
+        for name, value in overrides.items():
+            apply_config_setting(settings_object, name, value)
+        yield settings_object
+    finally:
+        settings_object.__dict__.clear()
+        settings_object.__dict__.update(backup)
+
+
+def best_of(func, repeat=5, number=1):
+    """Returns the best wall clock time in seconds for a single call of
+    func, taken over repeat runs of number calls each.
+
+    """
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = (time.perf_counter() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def report(title, headers, rows):
+    """Prints the rows of results as a simple aligned table."""
+
+    rows = [[str(column) for column in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+
+    print(title)
+    print("  ".join(str(header).rjust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(column.rjust(width) for column, width in zip(row, widths)))
+    print()
+
+
+def make_function_node(name, children=(), start_time=0.0, duration=0.001, exclusive=None):
+    return FunctionNode(
+        group="Function",
+        name=name,
+        children=tuple(children),
+        start_time=start_time,
+        end_time=start_time + duration,
+        duration=duration,
+        exclusive=duration if exclusive is None else exclusive,
+        label=None,
+        params=None,
+        rollup=None,
+        guid="%016x" % (id(children) & 0xFFFFFFFFFFFFFFFF),
+        agent_attributes={},
+        user_attributes={},
+    )
+
+
+def make_deep_tree(depth, start_time=1524764430.0):
+    """Returns a chain of nested function nodes depth levels deep."""
+
+    node = None
+    for level in reversed(range(depth)):
+        children = (node,) if node is not None else ()
+        node = make_function_node("deep_%d" % level, children, start_time=start_time)
+    return (node,) if node is not None else ()
+
+
+def make_wide_tree(width, start_time=1524764430.0):
+    """Returns width sibling function nodes with no children."""
+
+    return tuple(make_function_node("wide_%d" % i, start_time=start_time) for i in range(width))
+
+
+def make_transaction_node(children=(), settings=None, sampled=True, priority=1.0, errors=(), duration=0.1):
+    """Builds a TransactionNode for a background task whose root node
+    has the supplied function nodes as children.
+
+    """
+
+    settings = settings or finalize_application_settings({"agent_run_id": "1234567"})
+    start_time = 1524764430.0
+
+    root = RootNode(
+        name="Function/main",
+        children=tuple(children),
+        start_time=start_time,
+        end_time=start_time + duration,
+        duration=duration,
+        exclusive=duration,
+        guid=None,
+        agent_attributes={},
+        user_attributes={},
+        path="OtherTransaction/Function/main",
+        trusted_parent_span=None,
+        tracing_vendors=None,
+    )
+
+    return TransactionNode(
+        settings=settings,
+        path="OtherTransaction/Function/main",
+        type="OtherTransaction",
+        group="Function",
+        base_name="main",
+        name_for_metric="Function/main",
+        port=None,
+        request_uri=None,
+        queue_start=0.0,
+        start_time=start_time,
+        end_time=start_time + duration,
+        last_byte_time=0.0,
+        total_time=duration,
+        response_time=duration,
+        duration=duration,
+        exclusive=duration,
+        root=root,
+        errors=tuple(errors),
+        slow_sql=(),
+        custom_events=SampledDataSet(),
+        ml_events=SampledDataSet(),
+        log_events=SampledDataSet(),
+        deferred_log_events=SampledDataSet(),
+        apdex_t=0.5,
+        suppress_apdex=False,
+        custom_metrics=CustomMetrics(),
+        dimensional_metrics=DimensionalMetrics(),
+        guid="4485b89db608aece",
+        cpu_time=0.0,
+        suppress_transaction_trace=False,
+        client_cross_process_id=None,
+        referring_transaction_guid=None,
+        record_tt=False,
+        synthetics_resource_id=None,
+        synthetics_job_id=None,
+        synthetics_monitor_id=None,
+        synthetics_header=None,
+        synthetics_type=None,
+        synthetics_initiator=None,
+        synthetics_attributes=None,
+        synthetics_info_header=None,
+        is_part_of_cat=False,
+        trip_id="4485b89db608aece",
+        path_hash=None,
+        referring_path_hash=None,
+        alternate_path_hashes=[],
+        trace_intrinsics={},
+        distributed_trace_intrinsics={},
+        agent_attributes=[],
+        user_attributes=[],
+        priority=priority,
+        parent_transport_duration=None,
+        parent_span=None,
+        parent_type=None,
+        parent_account=None,
+        parent_app=None,
+        parent_tx=None,
+        parent_transport_type=None,
+        sampled=sampled,
+        root_span_guid=None,
+        trace_id="4485b89db608aece",
+        loop_time=0.0,
+    )
@@ -0,0 +1,86 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the cold start time of newrelic.agent.initialize(), with
+the import hooks for the builtin instrumentation registered lazily as
+target modules are imported, against registering all of them up front
+as was done before. Each sample is taken in a fresh interpreter, as the
+agent can only be initialized once in a process.
+
+"""
+
+import os
+import subprocess
+import sys
+
+from _bench_utils import report
+
+SAMPLES = 15
+
+SCRIPT = """
+import time
+
+start = time.perf_counter()
+
+import newrelic.agent
+import newrelic.config
+
+if %(eager)r:
+    from newrelic.core.instrumentation_registry import BUILTIN_IMPORT_HOOKS
+
+    def _process_module_builtin_defaults():
+        for target, (module, function) in BUILTIN_IMPORT_HOOKS.items():
+            newrelic.config._process_module_definition(target, module, function)
+
+    newrelic.config._process_module_builtin_defaults = _process_module_builtin_defaults
+
+imported = time.perf_counter()
+
+newrelic.agent.initialize()
+
+initialized = time.perf_counter()
+
+print("%%f %%f" %% (imported - start, initialized - imported))
+"""
+
+
+def sample(eager):
+    environ = dict(os.environ)
+    environ.pop("NEW_RELIC_CONFIG_FILE", None)
+    environ["NEW_RELIC_STARTUP_TIMEOUT"] = "0"
+
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT % {"eager": eager}], env=environ)
+    imported, initialized = output.split()
+    return float(imported), float(initialized)
+
+
+def main():
+    rows = []
+
+    for name, eager in (("eager", True), ("lazy", False)):
+        samples = [sample(eager) for _ in range(SAMPLES)]
+        imported = sorted(imported for imported, _ in samples)[SAMPLES // 2]
+        initialized = sorted(initialized for _, initialized in samples)[SAMPLES // 2]
+
+        rows.append((name, "%.2f" % (imported * 1000.0), "%.2f" % (initialized * 1000.0)))
+
+    report(
+        "Agent startup, median of %d fresh interpreters (ms)" % SAMPLES,
+        ("import hooks", "import newrelic.agent", "initialize()"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
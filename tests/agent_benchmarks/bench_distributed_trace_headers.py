@@ -0,0 +1,145 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of inserting the outbound distributed tracing headers for
+the external calls made by a transaction, with the text of the headers
+rendered from a template kept for the transaction, against building the
+traceparent, tracestate and newrelic headers from scratch for each call
+as was done before. Also shows the cost with the newrelic header left out.
+
+"""
+
+import random
+
+from _bench_utils import best_of, override_settings, report
+
+from newrelic.api.application import Application
+from newrelic.api.background_task import BackgroundTask
+from newrelic.common.encoding_utils import (
+    DistributedTracePayload,
+    NrTraceState,
+    W3CTraceParent,
+)
+from newrelic.core.config import finalize_application_settings
+from newrelic.core.trace_cache import trace_cache
+
+CALLS = 30
+
+
+class Span(object):
+    def __init__(self):
+        self.guid = "%016x" % random.getrandbits(64)
+
+
+class LegacyBackgroundTask(BackgroundTask):
+    def _generate_distributed_trace_headers(self, data=None):
+        try:
+            data = data or self._create_distributed_trace_data()
+            if data:
+                traceparent = W3CTraceParent(data).text()
+                yield ("traceparent", traceparent)
+
+                tracestate = NrTraceState(data).text()
+                if self.tracestate:
+                    tracestate += "," + self.tracestate
+                yield ("tracestate", tracestate)
+
+                self._record_supportability("Supportability/TraceContext/Create/Success")
+
+                if not self._settings.distributed_tracing.exclude_newrelic_header:
+                    payload = DistributedTracePayload(
+                        v=DistributedTracePayload.version,
+                        d=data,
+                    )
+                    yield ("newrelic", payload.http_safe())
+                    self._record_supportability("Supportability/DistributedTrace/CreatePayload/Success")
+
+        except:
+            self._record_supportability("Supportability/TraceContext/Create/Exception")
+
+            if not self._settings.distributed_tracing.exclude_newrelic_header:
+                self._record_supportability("Supportability/DistributedTrace/CreatePayload/Exception")
+
+
+def make_transaction(cls, application, settings):
+    transaction = cls(application, "bench")
+
+    transaction._settings = settings
+    transaction.enabled = True
+    transaction._sampled = True
+    transaction._priority = 1.123456
+    transaction.tracestate = "rojo=00f067aa0ba902b7"
+
+    return transaction
+
+
+def fan_out(transaction, spans):
+    cache = trace_cache()
+    thread_id = cache.current_thread_id()
+
+    for span in spans:
+        # Each external call is made from its own span.
+
+        cache[thread_id] = span
+        headers = []
+        transaction.insert_distributed_trace_headers(headers)
+
+    cache.pop(thread_id, None)
+
+
+def main():
+    spans = [Span() for _ in range(CALLS)]
+    rows = []
+
+    # The application is disabled so that it isn't registered with the
+    # data collector, the settings being supplied for each transaction.
+
+    application = Application("bench")
+    application.enabled = False
+
+    for exclude in (False, True):
+        with override_settings({"distributed_tracing.exclude_newrelic_header": exclude}):
+            settings = finalize_application_settings(
+                {
+                    "account_id": "33",
+                    "trusted_account_key": "1",
+                    "primary_application_id": "51424",
+                    "distributed_tracing.enabled": True,
+                    "span_events.enabled": True,
+                }
+            )
+
+            before = best_of(
+                lambda: fan_out(make_transaction(LegacyBackgroundTask, application, settings), spans), repeat=200
+            )
+            after = best_of(lambda: fan_out(make_transaction(BackgroundTask, application, settings), spans), repeat=200)
+
+        rows.append(
+            (
+                "traceparent, tracestate" if exclude else "traceparent, tracestate, newrelic",
+                "%.2f" % (before * 1e6 / CALLS),
+                "%.2f" % (after * 1e6 / CALLS),
+                "%.1fx" % (before / after),
+            )
+        )
+
+    report(
+        "Inserting distributed tracing headers, %d calls per transaction (us per call)" % CALLS,
+        ("headers", "from scratch", "template", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of attributing the time an event loop was blocked to the
+traces of the tasks on that loop, with the traces for the loop found
+from the index of traces by event loop in the trace cache, against going
+through every trace in the trace cache as was done before.
+
+"""
+
+import random
+
+from _bench_utils import best_of, report
+
+from newrelic.core.loop_node import LoopNode
+from newrelic.core.trace_cache import TraceCache, get_event_loop
+
+LOOPS = 8
+
+TASKS = (100, 1000, 5000)
+
+TRANSACTIONS = 10
+
+
+class Namespace(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class Loop(object):
+    pass
+
+
+class Task(object):
+    def __init__(self, loop):
+        self._loop = loop
+
+
+class Transaction(object):
+    def __init__(self):
+        self.settings = Namespace(event_loop_visibility=Namespace(enabled=True, blocking_threshold=0.0))
+        self._cached_path = Namespace(path="bench")
+        self._loop_time = 0.0
+        self.root_span = None
+
+    def _process_node(self, node):
+        pass
+
+
+class Trace(object):
+    def __init__(self, transaction, root=None):
+        self.transaction = transaction
+        self.root = root or self
+        self.parent = root
+        self.exclusive = 0.0
+        self.exited = False
+
+    def _is_leaf(self):
+        return True
+
+    def increment_child_count(self):
+        pass
+
+    def add_child(self, node):
+        pass
+
+
+class ScanningTraceCache(TraceCache):
+    def record_event_loop_wait(self, start_time, end_time):
+        transaction = self.current_transaction()
+        if not transaction or not transaction.settings:
+            return
+
+        settings = transaction.settings.event_loop_visibility
+
+        if not settings.enabled:
+            return
+
+        duration = end_time - start_time
+        transaction._loop_time += duration
+
+        if duration < settings.blocking_threshold:
+            return
+
+        fetch_name = transaction._cached_path.path
+        roots = set()
+        seen = set()
+
+        task = getattr(transaction.root_span, "_task", None)
+        loop = get_event_loop(task)
+
+        for trace in self.values():
+            if trace in seen:
+                continue
+
+            if (
+                trace.transaction is not transaction
+                and getattr(trace, "_task", None) is not None
+                and get_event_loop(trace._task) is loop
+                and trace._is_leaf()
+            ):
+                trace.exclusive -= duration
+                roots.add(trace.root)
+                seen.add(trace)
+
+        seen = None
+
+        for root in roots:
+            guid = "%016x" % random.getrandbits(64)
+            node = LoopNode(
+                fetch_name=fetch_name,
+                start_time=start_time,
+                end_time=end_time,
+                duration=duration,
+                guid=guid,
+            )
+            transaction = root.transaction
+            transaction._process_node(node)
+            root.increment_child_count()
+            root.add_child(node)
+
+
+def populate(cache, tasks):
+    """Saves a trace for each task across the loops, along with the root
+    for a transaction which blocks the first loop. Returns the objects
+    which need to be kept alive while the trace cache is used."""
+
+    live = []
+
+    for _ in range(LOOPS):
+        loop = Loop()
+        roots = [Trace(Transaction()) for _ in range(TRANSACTIONS)]
+
+        for i in range(tasks):
+            task = Task(loop)
+            trace = Trace(roots[i % TRANSACTIONS].transaction, roots[i % TRANSACTIONS])
+            trace._task = task
+            trace.thread_id = id(task)
+            cache.save_trace(trace)
+            live.append((loop, task, trace))
+
+        live.extend(roots)
+
+    loop, task, _ = live[0]
+    blocking = Transaction()
+    root = Trace(blocking)
+    root._task = task = Task(loop)
+    root.thread_id = id(task)
+    blocking.root_span = root
+    cache.save_trace(root)
+
+    cache.asyncio = Namespace(current_task=lambda: task)
+
+    live.append(root)
+
+    return live
+
+
+def main():
+    rows = []
+
+    for tasks in TASKS:
+        timings = []
+
+        for cls in (ScanningTraceCache, TraceCache):
+            cache = cls()
+            cache.asyncio = Namespace(current_task=lambda: None)
+            live = populate(cache, tasks)
+
+            timings.append(best_of(lambda: cache.record_event_loop_wait(0.0, 1.0), repeat=7, number=5))
+
+            del live
+
+        before, after = timings
+
+        rows.append(
+            (
+                LOOPS * tasks,
+                "%.1f" % (before * 1e6),
+                "%.1f" % (after * 1e6),
+                "%.1fx" % (before / after),
+            )
+        )
+
+    report(
+        "Attributing a blocked event loop to the traces of %d loops (us per blocking callback)" % LOOPS,
+        ("traces", "scan all traces", "loop index", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the census of object types done by the garbage collector
+data source at harvest, counting the types of a sample of the objects
+tracked by the garbage collector and scaling the counts, against
+counting the types of every object as was done before.
+
+"""
+
+import gc
+from collections import Counter
+
+from _bench_utils import best_of, override_settings, report
+
+from newrelic.samplers.gc_data import garbage_collector_data_source
+
+SIZES = (100000, 1000000, 3000000)
+
+
+def main():
+    data_source = garbage_collector_data_source(settings=None)["factory"](environ=None)
+
+    rows = []
+    live = []
+
+    for size in SIZES:
+        live.extend([i] for i in range(size - len(live)))
+
+        def full():
+            return Counter(map(type, gc.get_objects()))
+
+        with override_settings({"gc_runtime_metrics.top_object_sample_size": 100000}):
+            before = best_of(full, repeat=3)
+            after = best_of(data_source.object_type_counts, repeat=3)
+
+            exact = full()[list]
+            estimate = data_source.object_type_counts()[list]
+
+        rows.append(
+            (
+                len(gc.get_objects()),
+                "%.1f" % (before * 1000.0),
+                "%.1f" % (after * 1000.0),
+                "%.1fx" % (before / after),
+                "%.2f%%" % (abs(estimate - exact) * 100.0 / exact),
+            )
+        )
+
+    report(
+        "Census of object types tracked by the garbage collector (ms per harvest)",
+        ("objects", "full count", "sampled", "speedup", "list count error"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
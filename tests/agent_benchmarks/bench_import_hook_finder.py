@@ -0,0 +1,173 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of importing a large package tree with an import hook
+registered for every module in it, with the import hook finder asking
+the finders following it in sys.meta_path for the spec directly, against
+calling back into importlib.util.find_spec() as was done before.
+
+"""
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+from importlib.util import find_spec
+
+from _bench_utils import best_of, report
+
+import newrelic.api.import_hook as import_hook
+
+PACKAGE = "_bench_hooked_package"
+
+SHAPES = (
+    ("10 x 10 modules", 10, 10),
+    ("20 x 25 modules", 20, 25),
+)
+
+
+class ReentrantImportHookFinder(import_hook.ImportHookFinder):
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname not in import_hook._import_hooks:
+            return None
+
+        if fullname in self._skip:
+            return None
+
+        self._skip[fullname] = True
+
+        try:
+            spec = find_spec(fullname)
+            loader = getattr(spec, "loader", None)
+
+            if loader and not isinstance(loader, import_hook._ImportHookChainedLoader):
+                spec.loader = import_hook._ImportHookChainedLoader(loader)
+
+            return spec
+
+        finally:
+            del self._skip[fullname]
+
+
+def make_package_tree(root, packages, modules):
+    names = [PACKAGE]
+
+    os.mkdir(os.path.join(root, PACKAGE))
+    open(os.path.join(root, PACKAGE, "__init__.py"), "w").close()
+
+    for i in range(packages):
+        package = "sub%d" % i
+        os.mkdir(os.path.join(root, PACKAGE, package))
+        names.append("%s.%s" % (PACKAGE, package))
+
+        with open(os.path.join(root, PACKAGE, package, "__init__.py"), "w") as f:
+            for j in range(modules):
+                f.write("from . import mod%d\n" % j)
+                names.append("%s.%s.mod%d" % (PACKAGE, package, j))
+
+        for j in range(modules):
+            with open(os.path.join(root, PACKAGE, package, "mod%d.py" % j), "w") as f:
+                f.write("VALUE = %d\n" % j)
+
+    with open(os.path.join(root, PACKAGE, "__init__.py"), "w") as f:
+        for i in range(packages):
+            f.write("from . import sub%d\n" % i)
+
+    return names
+
+
+def import_tree(finder, names):
+    for name in names:
+        sys.modules.pop(name, None)
+        import_hook._import_hooks[name] = [hook]
+
+    sys.meta_path.insert(0, finder)
+
+    try:
+        importlib.import_module(PACKAGE)
+    finally:
+        sys.meta_path.remove(finder)
+
+
+def find_tree(finder, names):
+    sys.meta_path.insert(0, finder)
+
+    try:
+        for name in names[1:]:
+            module = sys.modules.pop(name)
+            path = sys.modules[name.rpartition(".")[0]].__path__
+            import_hook._import_hooks[name] = [hook]
+
+            try:
+                finder.find_spec(name, path)
+            finally:
+                sys.modules[name] = module
+
+    finally:
+        sys.meta_path.remove(finder)
+
+
+def hook(module):
+    pass
+
+
+def main():
+    rows = []
+
+    for name, packages, modules in SHAPES:
+        root = tempfile.mkdtemp()
+        sys.path.insert(0, root)
+
+        try:
+            names = make_package_tree(root, packages, modules)
+            importlib.invalidate_caches()
+
+            # Warm the bytecode cache so only the finding and loading of
+            # the modules is measured.
+
+            import_tree(import_hook.ImportHookFinder(), names)
+
+            import_before = best_of(lambda: import_tree(ReentrantImportHookFinder(), names), repeat=7)
+            import_after = best_of(lambda: import_tree(import_hook.ImportHookFinder(), names), repeat=7)
+
+            find_before = best_of(lambda: find_tree(ReentrantImportHookFinder(), names), repeat=7)
+            find_after = best_of(lambda: find_tree(import_hook.ImportHookFinder(), names), repeat=7)
+
+        finally:
+            sys.path.remove(root)
+            shutil.rmtree(root)
+
+            for module in names:
+                sys.modules.pop(module, None)
+                import_hook._import_hooks.pop(module, None)
+
+        rows.append(
+            (
+                name,
+                "%.2f / %.2f" % (import_before * 1000.0, import_after * 1000.0),
+                "%.2f / %.2f" % (find_before * 1000.0, find_after * 1000.0),
+                "%.1fx" % (find_before / find_after),
+            )
+        )
+
+    report(
+        "Package tree with every module hooked, re-entrant / direct (ms per tree)",
+        ("tree", "import", "find specs", "find speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
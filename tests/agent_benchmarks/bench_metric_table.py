@@ -0,0 +1,124 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the columnar MetricStatsTable against the dictionary of
+TimeStats lists it replaced, for memory use, recording, merging and the
+generation of metric data at harvest.
+
+"""
+
+import tracemalloc
+
+from _bench_utils import best_of, report
+
+from newrelic.core.stats_engine import MetricStatsTable, TimeStats
+
+METRIC_COUNTS = (1000, 10000, 50000)
+
+
+def build_dict(keys):
+    table = {}
+    for i, key in enumerate(keys):
+        duration = 0.5 + i * 1e-6
+        stats = table.get(key)
+        if stats is None:
+            table[key] = TimeStats(1, duration, duration / 2, duration, duration, duration**2)
+        else:
+            stats.merge_raw_time_metric(duration, duration / 2)
+    return table
+
+
+def merge_dict(table, other):
+    for key, value in other.items():
+        stats = table.get(key)
+        if not stats:
+            table[key] = value
+        else:
+            stats.merge_stats(value)
+
+
+def build_table(keys):
+    table = MetricStatsTable()
+    for i, key in enumerate(keys):
+        duration = 0.5 + i * 1e-6
+        table.record_time_metric(key, duration, duration / 2)
+    return table
+
+
+def memory(func, *args):
+    tracemalloc.start()
+    result = func(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    rows = []
+
+    for count in METRIC_COUNTS:
+        keys = [("Custom/Metric/%d" % i, "") for i in range(count)]
+
+        dict_memory = memory(build_dict, keys)
+        table_memory = memory(build_table, keys)
+
+        dict_build = best_of(lambda: build_dict(keys), repeat=3)
+        table_build = best_of(lambda: build_table(keys), repeat=3)
+
+        dict_a, dict_b = build_dict(keys), build_dict(keys)
+        table_a, table_b = build_table(keys), build_table(keys)
+
+        dict_merge = best_of(lambda: merge_dict(dict_a, dict_b), repeat=3)
+        table_merge = best_of(lambda: table_a.merge_table(table_b), repeat=3)
+        table_copy = best_of(lambda: MetricStatsTable().merge_table(table_b), repeat=3)
+
+        dict_data = best_of(lambda: [(dict(name=k[0], scope=k[1]), v) for k, v in dict_a.items()], repeat=3)
+        table_data = best_of(lambda: [(dict(name=k[0], scope=k[1]), v) for k, v in table_a.items()], repeat=3)
+
+        rows.append(
+            (
+                count,
+                "%.1f" % (dict_memory / 1024.0 / 1024.0),
+                "%.1f" % (table_memory / 1024.0 / 1024.0),
+                "%.1f" % (dict_build * 1000.0),
+                "%.1f" % (table_build * 1000.0),
+                "%.1f" % (dict_merge * 1000.0),
+                "%.1f" % (table_merge * 1000.0),
+                "%.1f" % (table_copy * 1000.0),
+                "%.1f" % (dict_data * 1000.0),
+                "%.1f" % (table_data * 1000.0),
+            )
+        )
+
+    report(
+        "Metric stats table (memory in MiB, times in ms)",
+        (
+            "metrics",
+            "dict MiB",
+            "table MiB",
+            "dict record",
+            "table record",
+            "dict merge",
+            "table merge",
+            "table copy",
+            "dict data",
+            "table data",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of generating the span events and time metrics for a
+transaction by walking the tree of nodes with an explicit stack, against
+each node recursing into its children through nested generators as was
+done before, for deep and wide trees of function nodes.
+
+"""
+
+from _bench_utils import best_of, make_deep_tree, make_transaction_node, make_wide_tree, report
+
+from newrelic.core.config import finalize_application_settings
+from newrelic.core.stats_engine import StatsEngine
+
+SHAPES = (
+    ("wide 1000", lambda: make_wide_tree(1000)),
+    ("deep 40", lambda: make_deep_tree(40)),
+    ("deep 400", lambda: make_deep_tree(400)),
+    ("25 x deep 40", lambda: tuple(make_deep_tree(40)[0] for _ in range(25))),
+)
+
+
+def recursive_span_events(node, settings, base_attrs, parent_guid):
+    yield node.span_event(settings, base_attrs=base_attrs, parent_guid=parent_guid)
+
+    for child in node.children:
+        for event in recursive_span_events(child, settings, base_attrs, node.guid):
+            yield event
+
+
+def recursive_time_metrics(node, stats, root, parent):
+    for metric in node.own_time_metrics(stats, root, parent):
+        yield metric
+
+    for child in node.children:
+        for metric in recursive_time_metrics(child, stats, root, node):
+            yield metric
+
+
+def main():
+    settings = finalize_application_settings({"agent_run_id": "1234567"})
+    stats = StatsEngine()
+    stats.reset_stats(settings)
+
+    rows = []
+
+    for name, shape in SHAPES:
+        transaction = make_transaction_node(shape(), settings=settings)
+        root = transaction.root
+
+        def recursive():
+            list(recursive_span_events(root, settings, None, None))
+            for child in root.children:
+                list(recursive_time_metrics(child, stats, transaction, transaction))
+
+        def iterative():
+            list(root.span_events(settings))
+            list(transaction.time_metrics(stats))
+
+        before = best_of(recursive, repeat=5)
+        after = best_of(iterative, repeat=5)
+
+        rows.append(
+            (
+                name,
+                "%.3f" % (before * 1000.0),
+                "%.3f" % (after * 1000.0),
+                "%.1fx" % (before / after),
+            )
+        )
+
+    report(
+        "Span events and time metrics for a transaction (ms per transaction)",
+        ("tree", "recursive", "iterative", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
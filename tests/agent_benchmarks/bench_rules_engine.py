@@ -0,0 +1,121 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of RulesEngine.normalize applying metric name rules to the
+metrics of a harvest, for rule sets of increasing size. Rules are applied
+in turn as was done before, by the combined matcher alone for names seen
+for the first time, and with the remembered results for names seen in
+an earlier harvest.
+
+"""
+
+from _bench_utils import best_of, report
+
+from newrelic.core.rules_engine import RulesEngine
+
+RULE_COUNTS = (3, 30, 300)
+METRIC_COUNT = 2000
+
+# The default URL rules sent by the data collector.
+
+DEFAULT_RULES = [
+    {
+        "match_expression": r".*\.(css|gif|ico|jpe?g|js|png|swf)$",
+        "replacement": r"/*.\1",
+        "eval_order": 1000,
+        "terminate_chain": True,
+    },
+    {
+        "match_expression": r"^[0-9][0-9a-f_,.-]*$",
+        "replacement": "*",
+        "eval_order": 1001,
+        "each_segment": True,
+    },
+    {
+        "match_expression": r"^(.*)/[0-9][0-9a-f_,-]*\.([0-9a-z][0-9a-z]*)$",
+        "replacement": r"\1/.*\2",
+        "eval_order": 1002,
+    },
+]
+
+
+def rules(count):
+    result = list(DEFAULT_RULES)
+    for i in range(count - len(DEFAULT_RULES)):
+        result.append(
+            {
+                "match_expression": r"^Custom/Tenant%d/(.*)$" % i,
+                "replacement": r"Custom/Tenant/\1",
+                "eval_order": i,
+                "terminate_chain": True,
+            }
+        )
+    return result
+
+
+def metric_names():
+    names = []
+    for i in range(METRIC_COUNT):
+        if i % 10 == 0:
+            names.append("Custom/Tenant%d/orders" % (i % 50))
+        elif i % 10 == 1:
+            names.append("WebTransaction/Uri/users/%d/profile" % i)
+        else:
+            names.append("Function/myapp.views:handler_%d" % i)
+    return names
+
+
+def main():
+    names = metric_names()
+    rows = []
+
+    for count in RULE_COUNTS:
+        engine = RulesEngine(rules(count))
+
+        def linear():
+            for name in names:
+                engine._apply_rules(name)
+
+        def combined():
+            for name in names:
+                engine._normalize(name)
+
+        def remembered():
+            for name in names:
+                engine.normalize(name)
+
+        before = best_of(linear, repeat=3) / METRIC_COUNT
+        first = best_of(combined, repeat=3) / METRIC_COUNT
+        again = best_of(remembered, repeat=3) / METRIC_COUNT
+
+        rows.append(
+            (
+                count,
+                "%.2f" % (before * 1e6),
+                "%.2f" % (first * 1e6),
+                "%.2f" % (again * 1e6),
+                "%.1fx" % (before / first),
+                "%.1fx" % (before / again),
+            )
+        )
+
+    report(
+        "RulesEngine.normalize over %d metric names (us per name)" % METRIC_COUNT,
+        ("rules", "linear", "combined", "remembered", "speedup", "speedup (remembered)"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
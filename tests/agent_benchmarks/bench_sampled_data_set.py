@@ -0,0 +1,108 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmark of SampledDataSet.merge for span event reservoirs, against
+merging each sample in turn through SampledDataSet.add as was done before.
+
+"""
+
+import random
+
+from _bench_utils import best_of, report
+
+from newrelic.core.stats_engine import SampledDataSet
+
+CAPACITIES = (2000, 5000, 10000)
+
+
+def sequential_merge(data_set, other_data_set, priority=-1):
+    for original_priority, _, sample in other_data_set.pq:
+        data_set.add(sample, max(priority, original_priority))
+    data_set.num_seen += other_data_set.num_seen - other_data_set.num_samples
+
+
+def populated(capacity, count, priority=None):
+    data_set = SampledDataSet(capacity=capacity)
+    for i in range(count):
+        data_set.add({"guid": "%016x" % i}, priority if priority is not None else random.random())
+    return data_set
+
+
+def copied(data_set):
+    copy = SampledDataSet(capacity=data_set.capacity)
+    copy.pq = list(data_set.pq)
+    copy.heap = data_set.heap
+    copy.num_seen = data_set.num_seen
+    return copy
+
+
+def timed(merge, target, other):
+    targets = []
+
+    def setup():
+        targets.append(copied(target))
+
+    def run():
+        merge(targets.pop(), other)
+
+    # Copy the target outside of the timed call so only the merge is measured.
+
+    total = None
+    for _ in range(5):
+        setup()
+        elapsed = best_of(run, repeat=1)
+        total = elapsed if total is None else min(total, elapsed)
+    return total
+
+
+def main():
+    random.seed(0)
+    rows = []
+
+    for capacity in CAPACITIES:
+        full = populated(capacity, capacity * 2)
+
+        scenarios = (
+            # Rollback of a failed harvest into a freshly filled reservoir.
+            ("rollback", full, populated(capacity, capacity * 2)),
+            # Draining a stats shard into the main stats engine.
+            ("shard drain", populated(capacity, capacity // 2), populated(capacity, capacity)),
+            # A single transaction with 50 spans.
+            ("50 spans", full, populated(capacity, 50, priority=1.5)),
+            # A single transaction whose spans overflow the reservoir.
+            ("overflow", SampledDataSet(capacity=capacity), populated(capacity * 2, capacity * 2, priority=1.0)),
+        )
+
+        for name, target, other in scenarios:
+            before = timed(sequential_merge, target, other)
+            after = timed(SampledDataSet.merge, target, other)
+            rows.append(
+                (
+                    capacity,
+                    name,
+                    "%.3f" % (before * 1000.0),
+                    "%.3f" % (after * 1000.0),
+                    "%.1fx" % (before / after),
+                )
+            )
+
+    report(
+        "SampledDataSet.merge (ms per merge)",
+        ("capacity", "scenario", "sequential", "bulk", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of Application.record_transaction for sampled transactions
+once the span events reservoir is full, with and without span events
+being skipped for transactions whose priority means they would all be
+discarded.
+
+"""
+
+from _bench_utils import best_of, make_transaction_node, make_wide_tree, override_settings, report
+
+from newrelic.core.application import Application
+from newrelic.core.stats_engine import StatsEngine
+
+SPAN_COUNTS = (10, 100, 1000)
+
+
+def run(span_count, prefilter):
+    overrides = {
+        "developer_mode": True,
+        "license_key": "**NOT A LICENSE KEY**",
+        "feature_flag": set(),
+        "distributed_tracing.enabled": True,
+        "event_harvest_config.harvest_limits.span_event_data": 2000,
+    }
+
+    should_sample = StatsEngine._should_sample_span_events
+    if not prefilter:
+        StatsEngine._should_sample_span_events = lambda self, priority: True
+
+    try:
+        with override_settings(overrides):
+            app = Application("Python Agent Benchmark (Span Prefilter)")
+            app.connect_to_data_collector(None)
+
+            children = make_wide_tree(span_count - 1)
+
+            # Fill the reservoir with spans from high priority transactions.
+
+            high = make_transaction_node(children, priority=2.0)
+            while app._stats_engine.span_events.num_samples < 2000:
+                app.record_transaction(high)
+
+            low = make_transaction_node(children, priority=0.5)
+            return best_of(lambda: app.record_transaction(low), repeat=5, number=20)
+    finally:
+        StatsEngine._should_sample_span_events = should_sample
+
+
+def main():
+    rows = []
+    for span_count in SPAN_COUNTS:
+        before = run(span_count, prefilter=False)
+        after = run(span_count, prefilter=True)
+        rows.append(
+            (
+                span_count,
+                "%.3f" % (before * 1000.0),
+                "%.3f" % (after * 1000.0),
+                "%.1fx" % (before / after),
+            )
+        )
+
+    report(
+        "record_transaction with a full span reservoir (ms per transaction)",
+        ("spans", "generated", "skipped", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
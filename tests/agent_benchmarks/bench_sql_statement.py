@@ -0,0 +1,79 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of deriving the obfuscated and normalized forms, operation
+and target of SQL statements as is done when recording database nodes,
+for a set of statements executed repeatedly, with and without the SQL
+statement cache.
+
+"""
+
+from _bench_utils import best_of, override_settings, report
+
+from newrelic.core.database_utils import _sql_statements, sql_statement
+
+STATEMENT_COUNTS = (10, 100, 1000)
+
+
+class DBAPI2Module(object):
+    pass
+
+
+def statements(count):
+    return [
+        "SELECT u.id, u.name, u.email FROM users_%d u WHERE u.id = %d AND u.name = 'user-%d' "
+        "AND u.created > '2020-01-01' AND u.active = true ORDER BY u.name LIMIT 10" % (i, i, i)
+        for i in range(count)
+    ]
+
+
+def run(count, cache_size):
+    module = DBAPI2Module()
+    sqls = statements(count)
+
+    def record():
+        for sql in sqls:
+            statement = sql_statement(sql, module)
+            statement.operation, statement.target, statement.normalized, statement.identifier
+
+    _sql_statements.clear()
+
+    with override_settings({"agent_limits.sql_statement_cache_size": cache_size}):
+        record()
+        return best_of(record, repeat=5, number=5) / count
+
+
+def main():
+    rows = []
+    for count in STATEMENT_COUNTS:
+        before = run(count, cache_size=0)
+        after = run(count, cache_size=1000)
+        rows.append(
+            (
+                count,
+                "%.2f" % (before * 1e6),
+                "%.2f" % (after * 1e6),
+                "%.1fx" % (before / after),
+            )
+        )
+
+    report(
+        "sql_statement for repeated statements (us per statement)",
+        ("statements", "uncached", "cached", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
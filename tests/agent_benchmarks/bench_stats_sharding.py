@@ -0,0 +1,107 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Contention benchmark for Application.record_transaction, comparing
+throughput with and without sharded accumulation of transaction stats as
+the number of recording threads increases. The time taken by the
+harvest which follows is also reported, as with sharding enabled the cost
+of combining the per thread shards moves to the harvest thread.
+
+Note that under the GIL, generating the metrics and events for each
+transaction does not run in parallel, so throughput will not scale
+linearly with thread count in either mode. What sharding removes is the
+time threads spend blocked on the application stats lock.
+
+"""
+
+import threading
+import time
+
+from _bench_utils import make_transaction_node, make_wide_tree, override_settings, report
+
+from newrelic.core.application import Application
+
+DURATION = 2.0
+THREAD_COUNTS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def run(thread_count, sharding):
+    overrides = {
+        "developer_mode": True,
+        "license_key": "**NOT A LICENSE KEY**",
+        "feature_flag": set(),
+        "stats_engine.sharding.enabled": sharding,
+    }
+
+    with override_settings(overrides):
+        app = Application("Python Agent Benchmark (Stats Sharding)")
+        app.connect_to_data_collector(None)
+
+        node = make_transaction_node(make_wide_tree(10))
+
+        counts = [0] * thread_count
+        start = threading.Event()
+        stop = threading.Event()
+
+        def worker(index):
+            start.wait()
+            count = 0
+            while not stop.is_set():
+                app.record_transaction(node)
+                count += 1
+            counts[index] = count
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(thread_count)]
+        for thread in threads:
+            thread.start()
+
+        start.set()
+        time.sleep(DURATION)
+        stop.set()
+
+        for thread in threads:
+            thread.join()
+
+        harvest_start = time.perf_counter()
+        app.harvest()
+        harvest_time = time.perf_counter() - harvest_start
+
+    return sum(counts) / DURATION, harvest_time
+
+
+def main():
+    rows = []
+    for thread_count in THREAD_COUNTS:
+        locked, locked_harvest = run(thread_count, sharding=False)
+        sharded, sharded_harvest = run(thread_count, sharding=True)
+        rows.append(
+            (
+                thread_count,
+                "%.0f" % locked,
+                "%.0f" % sharded,
+                "%.2fx" % (sharded / locked),
+                "%.1f" % (locked_harvest * 1000.0),
+                "%.1f" % (sharded_harvest * 1000.0),
+            )
+        )
+
+    report(
+        "record_transaction throughput (transactions/s)",
+        ("threads", "locked", "sharded", "speedup", "harvest ms (locked)", "harvest ms (sharded)"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the trace cache backends under asyncio, with many tasks
+running at once each looking up the current trace and entering and
+exiting segments, for the trace cache holding the current trace in a
+context variable against looking it up under the ID of the current task
+in the weak value dictionary.
+
+"""
+
+import asyncio
+import time
+
+from _bench_utils import report
+
+from newrelic.core.trace_cache import ContextVarTraceCache, TraceCache
+
+TASKS = 10000
+
+SEGMENTS = 5
+
+LOOKUPS = 20
+
+
+class Segment(object):
+    def __init__(self, parent):
+        self.parent = parent
+        self.root = parent.root if parent else self
+        self.exited = False
+
+    def has_outstanding_children(self):
+        return False
+
+
+def run_tasks(cls):
+    """Returns the time taken to run the tasks, and the time taken by
+    the lookups of the current trace within them."""
+
+    cache = cls()
+    cache.asyncio = asyncio
+    lookup_times = []
+
+    # Tasks are started and stopped in the trace cache as is done by
+    # the instrumentation for asyncio.
+
+    def task_factory(loop, coro):
+        task = asyncio.Task(coro, loop=loop)
+        cache.task_start(task)
+        task.add_done_callback(cache.task_stop)
+        return task
+
+    async def child():
+        for _ in range(SEGMENTS):
+            segment = Segment(cache.current_trace())
+            segment.thread_id = cache.current_thread_id()
+            cache.save_trace(segment)
+
+            await asyncio.sleep(0)
+
+            start = time.perf_counter()
+            for _ in range(LOOKUPS):
+                cache.current_trace()
+            lookup_times.append(time.perf_counter() - start)
+
+            segment.exited = True
+            cache.pop_current(segment)
+
+    async def parent():
+        root = Segment(None)
+        root.thread_id = cache.current_thread_id()
+        cache.save_trace(root)
+
+        await asyncio.gather(*[asyncio.ensure_future(child()) for _ in range(TASKS)])
+
+        root.exited = True
+        cache.complete_root(root)
+
+    loop = asyncio.new_event_loop()
+    loop.set_task_factory(task_factory)
+
+    try:
+        start = time.perf_counter()
+        loop.run_until_complete(parent())
+        return time.perf_counter() - start, sum(lookup_times)
+    finally:
+        loop.close()
+
+
+def main():
+    rows = []
+
+    for name, cls in (("weakref", TraceCache), ("contextvars", ContextVarTraceCache)):
+        total, lookups = min(run_tasks(cls) for _ in range(5))
+
+        rows.append(
+            (
+                name,
+                "%.1f" % (total * 1000.0),
+                "%.0f" % (lookups * 1e9 / (TASKS * SEGMENTS * LOOKUPS)),
+            )
+        )
+
+    report(
+        "%d concurrent asyncio tasks of %d segments each" % (TASKS, SEGMENTS),
+        ("backend", "total ms", "current trace ns"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
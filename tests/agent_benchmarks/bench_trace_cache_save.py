@@ -0,0 +1,114 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the cost of entering and exiting a segment in the trace
+cache as the number of threads in the process grows, with whether the
+trace is in a coroutine judged from the thread ID, against looking the
+thread ID up in sys._current_frames() as was done before.
+
+"""
+
+import asyncio
+import sys
+import threading
+import weakref
+
+from _bench_utils import best_of, report
+
+from newrelic.core.trace_cache import TraceCache, current_task
+
+THREADS = (1, 50, 200)
+
+SEGMENTS = 10000
+
+
+class FramesTraceCache(TraceCache):
+    def save_trace(self, trace):
+        self[trace.thread_id] = trace
+
+        trace._greenlet = None
+
+        if hasattr(sys, "_current_frames"):
+            if trace.thread_id not in sys._current_frames():
+                if self.greenlet:
+                    trace._greenlet = weakref.ref(self.greenlet.getcurrent())
+
+                if self.asyncio and not hasattr(trace, "_task"):
+                    trace._task = current_task(self.asyncio)
+
+
+class Segment(object):
+    def __init__(self, parent):
+        self.parent = parent
+        self.root = None
+
+
+def enter_segments(cache):
+    root = Segment(None)
+
+    for _ in range(SEGMENTS):
+        segment = Segment(root)
+        segment.thread_id = cache.current_thread_id()
+        cache.save_trace(segment)
+        cache.pop_current(segment)
+
+
+def make_cache(cls):
+    cache = cls()
+    cache.asyncio = asyncio
+    return cache
+
+
+def main():
+    rows = []
+    threads = []
+    shutdown = threading.Event()
+
+    try:
+        for count in THREADS:
+            # The main thread counts as one of the threads.
+
+            while len(threads) < count - 1:
+                thread = threading.Thread(target=shutdown.wait)
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+
+            before = best_of(lambda: enter_segments(make_cache(FramesTraceCache)), repeat=5)
+            after = best_of(lambda: enter_segments(make_cache(TraceCache)), repeat=5)
+
+            rows.append(
+                (
+                    count,
+                    "%.2f" % (before * 1e6 / SEGMENTS),
+                    "%.2f" % (after * 1e6 / SEGMENTS),
+                    "%.1fx" % (before / after),
+                )
+            )
+
+    finally:
+        shutdown.set()
+
+        for thread in threads:
+            thread.join()
+
+    report(
+        "Entering and exiting a segment in the trace cache (us per segment)",
+        ("threads", "current frames", "thread ID", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
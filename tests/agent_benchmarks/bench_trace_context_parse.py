@@ -0,0 +1,110 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of parsing the inbound traceparent and tracestate headers,
+with the traceparent validated by a single regular expression and only
+the trusted New Relic entry sliced out of the tracestate, against
+splitting and checking each field of the traceparent and decoding every
+entry of the tracestate before encoding the others again as was done
+before.
+
+"""
+
+from _bench_utils import best_of, report
+
+from newrelic.common.encoding_utils import HEXDIGLC_RE, W3CTraceParent, W3CTraceState
+
+ITERATIONS = 10000
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-01"
+NR_ENTRY = "33@nr=0-0-33-2827902-7d3efb1b173fecfa-e8b91a159289ff74-1-1.23456-1518469636035"
+
+SHAPES = (
+    ("nr only", NR_ENTRY),
+    ("nr + 2 vendors", NR_ENTRY + ",rojo=00f067aa0ba902b7,congo=t61rcWkgMzE"),
+    ("nr + 16 vendors", ",".join([NR_ENTRY] + ["vendor%d=%016x" % (i, i) for i in range(16)])),
+)
+
+
+def decode_traceparent(payload):
+    if len(payload) < 55:
+        return None
+
+    fields = payload.split("-", 4)
+
+    if len(fields) < 4:
+        return None
+
+    version = fields[0]
+
+    if len(version) != 2 or not HEXDIGLC_RE.match(version):
+        return None
+
+    if version == "ff":
+        return None
+
+    if version == "00" and len(fields) != 4:
+        return None
+
+    for field, expected_length in zip(fields[1:4], (32, 16, 2)):
+        if len(field) != expected_length or not HEXDIGLC_RE.match(field):
+            return None
+
+    trace_id, parent_id = fields[1:3]
+    if parent_id == "0" * 16 or trace_id == "0" * 32:
+        return None
+
+    return W3CTraceParent(tr=trace_id, id=parent_id)
+
+
+def parse_decoded(tracestate):
+    for _ in range(ITERATIONS):
+        decode_traceparent(TRACEPARENT)
+        vendors = W3CTraceState.decode(tracestate)
+        vendors.pop("33@nr", "")
+        ",".join(vendors.keys())
+        vendors.text(limit=31)
+
+
+def parse_extracted(tracestate):
+    for _ in range(ITERATIONS):
+        W3CTraceParent.decode(TRACEPARENT)
+        W3CTraceState.extract(tracestate, "33@nr")
+
+
+def main():
+    rows = []
+
+    for name, tracestate in SHAPES:
+        before = best_of(lambda: parse_decoded(tracestate), repeat=7)
+        after = best_of(lambda: parse_extracted(tracestate), repeat=7)
+
+        rows.append(
+            (
+                name,
+                "%.2f" % (before * 1e6 / ITERATIONS),
+                "%.2f" % (after * 1e6 / ITERATIONS),
+                "%.1fx" % (before / after),
+            )
+        )
+
+    report(
+        "Parsing inbound traceparent and tracestate headers (us per request)",
+        ("tracestate", "decoded", "extracted", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
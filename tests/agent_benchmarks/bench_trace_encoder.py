@@ -0,0 +1,107 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the time taken and peak memory allocated to encode a
+transaction trace, with the JSON written straight into an incremental
+compressor as the tree of nodes is walked, against building the full
+tree of trace nodes and the full JSON string before compressing it as
+was done before.
+
+"""
+
+import base64
+import tracemalloc
+import zlib
+
+from _bench_utils import best_of, make_deep_tree, make_function_node, make_transaction_node, make_wide_tree, report
+
+from newrelic.common.encoding_utils import json_encode
+from newrelic.core.config import finalize_application_settings
+from newrelic.core.stats_engine import StatsEngine
+from newrelic.core.trace_encoder import encode_transaction_trace
+from newrelic.packages import six
+
+LIMIT = 2000
+
+
+def make_mixed_tree(width, depth):
+    return tuple(make_deep_tree(depth)[0]._replace(name="branch_%d" % i) for i in range(width))
+
+
+SHAPES = (
+    ("wide 2000", lambda: make_wide_tree(2000)),
+    ("deep 200", lambda: make_deep_tree(200)),
+    ("50 x deep 40", lambda: make_mixed_tree(50, 40)),
+    ("params 2000", lambda: tuple(make_function_node("params_%d" % i)._replace(params={"i": i}) for i in range(2000))),
+)
+
+
+def encode_materialized(transaction, stats):
+    transaction_trace = transaction.transaction_trace(stats, LIMIT, None)
+    data = [transaction_trace, list(transaction.string_table.values())]
+
+    zlib_data = zlib.compress(six.b(json_encode(data)), zlib.Z_DEFAULT_COMPRESSION)
+
+    return base64.standard_b64encode(zlib_data)
+
+
+def encode_streaming(transaction, stats):
+    return encode_transaction_trace(transaction, stats, LIMIT, None)[2]
+
+
+def peak_memory(func):
+    tracemalloc.start()
+
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    settings = finalize_application_settings({"agent_run_id": "1234567"})
+    stats = StatsEngine()
+    stats.reset_stats(settings)
+
+    rows = []
+
+    for name, shape in SHAPES:
+        transaction = make_transaction_node(shape(), settings=settings)
+
+        before = best_of(lambda: encode_materialized(transaction, stats), repeat=5)
+        after = best_of(lambda: encode_streaming(transaction, stats), repeat=5)
+
+        memory_before = peak_memory(lambda: encode_materialized(transaction, stats))
+        memory_after = peak_memory(lambda: encode_streaming(transaction, stats))
+
+        rows.append(
+            (
+                name,
+                "%.2f" % (before * 1000.0),
+                "%.2f" % (after * 1000.0),
+                "%.0f" % (memory_before / 1024.0),
+                "%.0f" % (memory_after / 1024.0),
+            )
+        )
+
+    report(
+        "Encoding a transaction trace of up to %d nodes" % LIMIT,
+        ("tree", "materialized ms", "streaming ms", "materialized KiB", "streaming KiB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
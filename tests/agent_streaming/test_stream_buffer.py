@@ -85,3 +85,74 @@ def test_stream_buffer_queue_size():
     assert len(stream_buffer) == 1
     assert stream_buffer._dropped == 1
     assert stream_buffer._seen == 2
+
+
+def test_stream_buffer_iterator_adaptive_batch_bytes(stop_iteration_on_wait):
+    span = Span(intrinsics={}, agent_attributes={}, user_attributes={"key": "value"})
+    span_size = span.ByteSize()
+
+    # Batches are sized by bytes, and are sent as soon as they are full
+    stream_buffer = StreamBuffer(100, batching=True, max_batch_bytes=span_size * 10, max_batch_age=60.0)
+    for _ in range(25):
+        stream_buffer.put(span)
+
+    buffer_contents = list(stream_buffer)
+    assert [len(batch.spans) for batch in buffer_contents] == [10, 10]
+
+    # The remaining spans are held until the batch is old enough
+    assert len(stream_buffer) == 5
+
+
+def test_stream_buffer_iterator_adaptive_batch_age(stop_iteration_on_wait):
+    stream_buffer = StreamBuffer(100, batching=True, max_batch_bytes=1024 * 1024, max_batch_age=0.0)
+    for _ in range(5):
+        span = Span(intrinsics={}, agent_attributes={}, user_attributes={})
+        stream_buffer.put(span)
+
+    buffer_contents = list(stream_buffer)
+    assert len(buffer_contents) == 1
+    assert len(buffer_contents[0].spans) == 5
+    assert not stream_buffer
+
+
+def test_stream_buffer_queue_size_adaptive():
+    span = Span(intrinsics={}, agent_attributes={}, user_attributes={})
+    stream_buffer = StreamBuffer(1, batching=True, max_batch_bytes=1024 * 1024, max_batch_age=1.0)
+
+    for _ in range(2):
+        stream_buffer.put(span)
+
+    # Bytes for dropped spans are no longer counted as pending
+    assert len(stream_buffer) == 1
+    assert stream_buffer._dropped == 1
+    assert stream_buffer._pending_bytes == span.ByteSize()
+
+
+def test_stream_buffer_put_notifies_only_waiting_consumer(monkeypatch):
+    notified = []
+
+    class CountingCondition(CONDITION_CLS):
+        def notify_all(self, *args, **kwargs):
+            notified.append(True)
+            return super(CountingCondition, self).notify_all(*args, **kwargs)
+
+    @staticmethod
+    def condition(*args, **kwargs):
+        return CountingCondition(*args, **kwargs)
+
+    monkeypatch.setattr(StreamBuffer, "condition", condition)
+
+    stream_buffer = StreamBuffer(10)
+    for _ in range(5):
+        span = Span(intrinsics={}, agent_attributes={}, user_attributes={})
+        stream_buffer.put(span)
+
+    assert not notified
+
+    # Only the first span added while the consumer waits wakes it
+    stream_buffer._waiting = True
+    for _ in range(5):
+        span = Span(intrinsics={}, agent_attributes={}, user_attributes={})
+        stream_buffer.put(span)
+
+    assert len(notified) == 1
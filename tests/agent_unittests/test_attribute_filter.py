@@ -0,0 +1,69 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from newrelic.core.attribute_filter import (
+    DST_ALL,
+    DST_ERROR_COLLECTOR,
+    DST_NONE,
+    DST_SPAN_EVENTS,
+    DST_TRANSACTION_EVENTS,
+    AttributeFilter,
+)
+
+_SETTINGS = {
+    "attributes.enabled": True,
+    "transaction_events.attributes.enabled": True,
+    "span_events.attributes.enabled": True,
+    "error_collector.attributes.enabled": True,
+    "attributes.exclude": ["request.parameters.*", "request.headers.*"],
+    "attributes.include": ["request.parameters.page"],
+    "span_events.attributes.exclude": ["request.parameters.page"],
+    "error_collector.attributes.include": ["request.headers.user*"],
+}
+
+_ENABLED = DST_TRANSACTION_EVENTS | DST_SPAN_EVENTS | DST_ERROR_COLLECTOR
+
+
+@pytest.mark.parametrize(
+    "name,default_destinations,expected",
+    (
+        ("response.status", DST_ALL, _ENABLED),
+        ("response.status", DST_SPAN_EVENTS, DST_SPAN_EVENTS),
+        ("request.parameters.id", DST_ALL, DST_NONE),
+        ("request.parameters.page", DST_NONE, DST_TRANSACTION_EVENTS | DST_ERROR_COLLECTOR),
+        ("request.headers.userAgent", DST_ALL, DST_ERROR_COLLECTOR),
+        ("request.headers.host", DST_ALL, DST_NONE),
+    ),
+)
+def test_attribute_filter_apply(name, default_destinations, expected):
+    attribute_filter = AttributeFilter(_SETTINGS)
+
+    assert attribute_filter.apply(name, default_destinations) == expected
+
+    # The second call is served from the cache.
+
+    assert attribute_filter.apply(name, default_destinations) == expected
+
+
+def test_attribute_filter_cache_bounded(monkeypatch):
+    monkeypatch.setattr(AttributeFilter, "CACHE_MAXIMUM", 10)
+    attribute_filter = AttributeFilter(_SETTINGS)
+
+    for i in range(100):
+        assert attribute_filter.apply("request.parameters.id%d" % i, DST_ALL) == DST_NONE
+        assert attribute_filter.apply("custom.attribute%d" % i, DST_ALL) == _ENABLED
+
+    assert len(attribute_filter.cache) <= 10
@@ -0,0 +1,100 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from testing_support.fixtures import override_generic_settings
+
+from newrelic.core.config import global_settings
+from newrelic.core.database_utils import (
+    SQLStatementCache,
+    _sql_statements,
+    sql_statement,
+)
+
+
+class FakeDBAPI2Module(object):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def clear_sql_statements():
+    _sql_statements.clear()
+    yield
+    _sql_statements.clear()
+
+
+def test_sql_statement_cached():
+    module = FakeDBAPI2Module()
+
+    first = sql_statement("SELECT * FROM users WHERE id = 1", module)
+    second = sql_statement("SELECT * FROM users WHERE id = 1", module)
+
+    assert first is second
+    assert first.obfuscated == "SELECT * FROM users WHERE id = ?"
+    assert first.operation == "select"
+    assert first.target == "users"
+
+
+def test_sql_statement_cached_per_module():
+    first = sql_statement("SELECT 1", FakeDBAPI2Module())
+    second = sql_statement("SELECT 1", FakeDBAPI2Module())
+
+    assert first is not second
+
+
+@override_generic_settings(global_settings(), {"agent_limits.sql_statement_cache_size": 2})
+def test_sql_statement_cache_evicts_least_recently_used():
+    module = FakeDBAPI2Module()
+
+    first = sql_statement("SELECT 1", module)
+    sql_statement("SELECT 2", module)
+
+    # Using the first statement again means the second is the least
+    # recently used and is the one discarded.
+
+    assert sql_statement("SELECT 1", module) is first
+    sql_statement("SELECT 3", module)
+
+    assert len(_sql_statements) == 2
+    assert _sql_statements.get(("SELECT 1", module)) is first
+    assert _sql_statements.get(("SELECT 2", module)) is None
+
+
+@override_generic_settings(global_settings(), {"agent_limits.sql_statement_cache_size": 0})
+def test_sql_statement_cache_disabled():
+    module = FakeDBAPI2Module()
+
+    assert sql_statement("SELECT 1", module) is not sql_statement("SELECT 1", module)
+    assert len(_sql_statements) == 0
+
+
+@override_generic_settings(global_settings(), {"agent_limits.sql_query_length_maximum": 10})
+def test_sql_statement_too_long_not_cached():
+    module = FakeDBAPI2Module()
+
+    assert sql_statement("SELECT * FROM users", module) is not sql_statement("SELECT * FROM users", module)
+    assert len(_sql_statements) == 0
+
+
+def test_sql_statement_cache_put_replaces():
+    cache = SQLStatementCache()
+
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+    cache.put("a", 3, 10)
+    cache.put("c", 4, 2)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 3
+    assert cache.get("b") is None
@@ -14,7 +14,17 @@
 
 import pytest
 
-from newrelic.common.encoding_utils import camel_case, snake_case
+from newrelic.common import encoding_utils
+from newrelic.common.encoding_utils import (
+    DistributedTraceHeaderTemplate,
+    DistributedTracePayload,
+    NrTraceState,
+    W3CTraceParent,
+    W3CTraceState,
+    camel_case,
+    payload_size,
+    snake_case,
+)
 
 
 @pytest.mark.parametrize("input_,expected,upper", [
@@ -50,3 +60,151 @@ def test_camel_case(input_, expected, upper):
 def test_snake_case(input_, expected):
     output = snake_case(input_)
     assert output == expected
+
+
+class Payload(object):
+    def __str__(self):
+        return "payload"
+
+
+@pytest.mark.parametrize("value,expected", [
+    (None, 0),
+    (b"", 0),
+    (b"\x00\xff" * 512, 1024),
+    (bytearray(b"abc"), 3),
+    (memoryview(b"abcdef")[2:], 4),
+    (u"plain", 5),
+    (u"caf\u00e9", 5),
+    (Payload(), 7),
+    ({"a": 1}, 8),
+])
+def test_payload_size(value, expected):
+    assert payload_size(value) == expected
+
+
+class Py2MemoryView(object):
+    # Memory views on Python 2 have no nbytes.
+    def __init__(self, value):
+        self._view = memoryview(value)
+        self.itemsize = self._view.itemsize
+
+    def __len__(self):
+        return len(self._view)
+
+    def tobytes(self):
+        raise AssertionError("The payload was copied.")
+
+
+@pytest.mark.parametrize("value,expected", [
+    (b"\x00\xff" * 512, 1024),
+    (bytearray(b"abc"), 3),
+])
+def test_payload_size_without_nbytes(monkeypatch, value, expected):
+    monkeypatch.setattr(encoding_utils, "memoryview", Py2MemoryView, raising=False)
+    assert payload_size(value) == expected
+
+
+DT_DATA = {
+    "ty": "App",
+    "ac": "1",
+    "ap": "51424",
+    "tr": "6e2fea0b173fdad0",
+    "sa": True,
+    "pr": 1.1234321,
+    "tx": "27856f70d3d314b7",
+    "ti": 1482959525577,
+    "id": "5f474d64b9cc9b2a",
+}
+
+
+@pytest.mark.parametrize("data", [
+    DT_DATA,
+    dict(DT_DATA, tk="33"),
+    dict(DT_DATA, sa=False, pr=0.5),
+    dict((k, v) for k, v in DT_DATA.items() if k != "id"),
+])
+@pytest.mark.parametrize("tracestate", ["", "rojo=00f067aa0ba902b7,congo=t61rcWkgMzE%"])
+def test_distributed_trace_header_template(data, tracestate):
+    template = DistributedTraceHeaderTemplate(data, tracestate)
+
+    # The template is used for data which differs only in the span ID
+    # and timestamp.
+    for span_id, timestamp in (("5f474d64b9cc9b2a", 1482959525577), ("00f067aa0ba902b7", 1482959525999)):
+        data = dict(data, ti=timestamp)
+        if "id" in data:
+            data["id"] = span_id
+
+        assert DistributedTraceHeaderTemplate.template_key(data, tracestate) == template.key
+
+        traceparent, tracestate_text, newrelic = template.render(data)
+
+        if "id" in data:
+            assert traceparent == W3CTraceParent(data).text()
+        else:
+            assert len(traceparent) == 55
+            assert traceparent.split("-")[1] == W3CTraceParent(data).text().split("-")[1]
+
+        expected_tracestate = NrTraceState(data).text()
+        if tracestate:
+            expected_tracestate += "," + tracestate
+
+        assert tracestate_text == expected_tracestate
+        assert newrelic == DistributedTracePayload(v=DistributedTracePayload.version, d=data).http_safe()
+
+
+def test_distributed_trace_header_template_key():
+    key = DistributedTraceHeaderTemplate.template_key(DT_DATA)
+
+    assert DistributedTraceHeaderTemplate.template_key(dict(DT_DATA, sa=False)) != key
+    assert DistributedTraceHeaderTemplate.template_key(dict(DT_DATA, pr=0.5)) != key
+    assert DistributedTraceHeaderTemplate.template_key(DT_DATA, "rojo=00f067aa0ba902b7") != key
+    assert DistributedTraceHeaderTemplate.template_key(DT_DATA, newrelic_header=False) != key
+
+
+def test_distributed_trace_header_template_without_newrelic_header():
+    template = DistributedTraceHeaderTemplate(DT_DATA, newrelic_header=False)
+
+    assert template.render(DT_DATA)[2] is None
+
+
+@pytest.mark.parametrize("traceparent,expected", [
+    ("00-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-01", ("0af7651916cd43dd8448eb211c80319c", "00f067aa0ba902b7")),
+    ("01-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-00-what-the-future", ("0af7651916cd43dd8448eb211c80319c", "00f067aa0ba902b7")),
+    ("00-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-01-what-the-future", None),
+    ("ff-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-01", None),
+    ("00-0AF7651916CD43DD8448EB211C80319C-00f067aa0ba902b7-01", None),
+    ("00-0af7651916cd43dd8448eb211c80319-00f067aa0ba902b7-01", None),
+    ("00-00000000000000000000000000000000-00f067aa0ba902b7-01", None),
+    ("00-0af7651916cd43dd8448eb211c80319c-0000000000000000-01", None),
+    ("00-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-1", None),
+    ("00-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-01\n", None),
+])
+def test_w3c_traceparent_decode(traceparent, expected):
+    data = W3CTraceParent.decode(traceparent)
+
+    if expected is None:
+        assert data is None
+    else:
+        assert data == {"tr": expected[0], "id": expected[1]}
+
+
+@pytest.mark.parametrize("tracestate", [
+    "33@nr=payload",
+    "33@nr=payload,rojo=00f067aa0ba902b7,congo=t61rcWkgMzE",
+    "rojo=00f067aa0ba902b7,33@nr=payload,congo=t61rcWkgMzE",
+    "rojo=00f067aa0ba902b7,congo=t61rcWkgMzE,33@nr=payload",
+    "rojo=00f067aa0ba902b7,congo=t61rcWkgMzE",
+    "rojo=00f067aa0ba902b7,x33@nr=payload",
+    "rojo=00f067aa0ba902b7 , 33@nr=payload\t,congo=t61rcWkgMzE ",
+    "rojo=00f067aa0ba902b7,,33@nr=payload,congo",
+    "rojo=1,33@nr=first,congo=2,33@nr=second",
+    "rojo=1,congo=2,rojo=3",
+    "rojo=%s,congo=2" % ("x" * 257),
+    ",".join("vendor%d=%d" % (i, i) for i in range(32)),
+    ",".join("vendor%d=%d" % (i, i) for i in range(31)) + ",33@nr=payload",
+])
+def test_w3c_tracestate_extract(tracestate):
+    vendors = W3CTraceState.decode(tracestate)
+    payload = vendors.pop("33@nr", "")
+
+    assert W3CTraceState.extract(tracestate, "33@nr") == (payload, vendors.text(limit=31), ",".join(vendors.keys()))
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
 import random
 import tempfile
+import threading
 import time
+import zlib
 
 import pytest
 from testing_support.fixtures import (
@@ -24,6 +27,7 @@ from testing_support.fixtures import (
 )
 
 from newrelic.common.agent_http import DeveloperModeClient
+from newrelic.common.encoding_utils import json_decode, json_encode
 from newrelic.common.object_wrapper import function_wrapper, transient_function_wrapper
 from newrelic.core.application import Application
 from newrelic.core.config import finalize_application_settings, global_settings
@@ -32,7 +36,8 @@ from newrelic.core.error_node import ErrorNode
 from newrelic.core.function_node import FunctionNode
 from newrelic.core.log_event_node import LogEventNode
 from newrelic.core.root_node import RootNode
-from newrelic.core.stats_engine import CustomMetrics, SampledDataSet, DimensionalMetrics
+from newrelic.core.stats_engine import CustomMetrics, SampledDataSet, DimensionalMetrics, StatsEngine
+from newrelic.core.trace_encoder import encode_transaction_trace
 from newrelic.core.transaction_node import TransactionNode
 from newrelic.network.exceptions import RetryDataForRequest
 
@@ -129,6 +134,7 @@ def transaction_node(request):
         custom_events=custom_events,
         ml_events=ml_events,
         log_events=log_events,
+        deferred_log_events=SampledDataSet(),
         apdex_t=0.5,
         suppress_apdex=False,
         custom_metrics=CustomMetrics(),
@@ -483,6 +489,163 @@ def test_transaction_count(transaction_node):
     assert app._transaction_count == 0
 
 
+@override_generic_settings(
+    settings,
+    {
+        "developer_mode": True,
+        "license_key": "**NOT A LICENSE KEY**",
+        "feature_flag": set(),
+        "collect_custom_events": False,
+        "application_logging.forwarding.enabled": False,
+        "stats_engine.sharding.enabled": True,
+    },
+)
+def test_sharded_transaction_count(transaction_node):
+    app = Application("Python Agent Test (Harvest Loop)")
+    app.connect_to_data_collector(None)
+
+    def _record():
+        app.record_transaction(transaction_node)
+
+    _record()
+    thread = threading.Thread(target=_record)
+    thread.start()
+    thread.join()
+
+    # Transactions are only accumulated in the per thread shards
+    assert len(app._stats_shards) == 2
+    assert app._transaction_count == 0
+    assert app._stats_engine.transaction_events.num_samples == 0
+
+    with app._stats_lock:
+        app._merge_stats_shards()
+
+    assert app._transaction_count == 2
+    assert app._stats_engine.transaction_events.num_samples == 2
+    assert app._stats_engine.stats_table[("OtherTransaction/all", "")].call_count == 2
+
+    # Shards which recorded nothing since the last merge are retired
+    with app._stats_lock:
+        app._merge_stats_shards()
+
+    assert not app._stats_shards
+
+    _record()
+    app.harvest()
+
+    assert app._transaction_count == 0
+    assert all(not shard.transaction_count for shard in app._stats_shards.values())
+
+
+@override_generic_settings(
+    settings,
+    {
+        "developer_mode": True,
+        "license_key": "**NOT A LICENSE KEY**",
+        "feature_flag": set(),
+        "stats_engine.sharding.enabled": True,
+    },
+)
+def test_sharded_stats_reset_on_connect(transaction_node):
+    app = Application("Python Agent Test (Harvest Loop)")
+    app.connect_to_data_collector(None)
+
+    app.record_transaction(transaction_node)
+    shard = app._stats_shards[threading.current_thread().ident]
+
+    # Simulate a reconnect following a forced agent restart
+    app._active_session = None
+    app.connect_to_data_collector(None)
+
+    assert shard.retired
+    assert not app._stats_shards
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@override_generic_settings(
+    settings,
+    {
+        "developer_mode": True,
+        "license_key": "**NOT A LICENSE KEY**",
+        "feature_flag": set(),
+        "stats_engine.deferred_recording.enabled": True,
+    },
+)
+def test_deferred_transaction_recording(transaction_node):
+    app = Application("Python Agent Test (Harvest Loop)")
+    app.connect_to_data_collector(None)
+
+    app.record_transaction(transaction_node)
+
+    assert app._deferred_thread.name == "NR-Transaction-Recorder-Thread"
+    assert _wait_for(lambda: app._transaction_count == 1)
+    assert app._stats_engine.transaction_events.num_samples == 1
+
+
+@override_generic_settings(
+    settings,
+    {
+        "developer_mode": True,
+        "license_key": "**NOT A LICENSE KEY**",
+        "feature_flag": set(),
+        "stats_engine.deferred_recording.enabled": True,
+        "stats_engine.deferred_recording.queue_size": 1,
+    },
+)
+def test_deferred_transaction_recording_queue_full(transaction_node, monkeypatch):
+    app = Application("Python Agent Test (Harvest Loop)")
+    app.connect_to_data_collector(None)
+
+    record_transaction = app._record_transaction
+    recording = threading.Event()
+    release = threading.Event()
+
+    def _record_transaction(data):
+        # Block the background thread on the first transaction only.
+        if not recording.is_set():
+            recording.set()
+            release.wait(5.0)
+        record_transaction(data)
+
+    monkeypatch.setattr(app, "_record_transaction", _record_transaction)
+
+    app.record_transaction(transaction_node)
+    assert recording.wait(5.0)
+
+    # With the background thread busy, the second transaction fills the
+    # queue and the third is dropped.
+    app.record_transaction(transaction_node)
+    app.record_transaction(transaction_node)
+
+    assert len(app._deferred_transactions) == 1
+    assert app._deferred_dropped == 1
+
+    # A harvest records transactions still queued before the snapshot.
+    merge_stats_shards = app._merge_stats_shards
+    transaction_count = []
+
+    def _merge_stats_shards():
+        transaction_count.append(app._transaction_count)
+        merge_stats_shards()
+
+    monkeypatch.setattr(app, "_merge_stats_shards", _merge_stats_shards)
+
+    app.harvest()
+
+    assert transaction_count == [1]
+    assert not app._deferred_transactions
+    assert app._deferred_dropped == 0
+
+    release.set()
+    assert _wait_for(lambda: app._transaction_count == 1)
+
+
 @override_generic_settings(
     settings,
     {
@@ -551,6 +714,138 @@ def test_reservoir_sizes(transaction_node):
     assert app._stats_engine.span_events.num_samples == 102
 
 
+@pytest.mark.parametrize("limit", (2000, 10))
+@pytest.mark.parametrize("nested", (True, False))
+def test_encode_transaction_trace(transaction_node, limit, nested):
+    node = transaction_node
+
+    if nested:
+        function = node.root.children[0]
+        children = (function._replace(children=(function._replace(name="bar", children=(function,)), function)),) * 10
+        node = node._replace(root=node.root._replace(children=children))
+
+    stats = StatsEngine()
+    stats.reset_stats(node.settings)
+
+    start_time, duration, pack_data = encode_transaction_trace(node, stats, limit, None)
+
+    # The trace is encoded as the nodes are walked, with the same result
+    # as building the trace in full before encoding it.
+
+    trace = node.transaction_trace(stats, limit, None)
+    expected = json_decode(json_encode([trace, list(node.string_table.values())]))
+
+    assert json_decode(zlib.decompress(base64.standard_b64decode(pack_data))) == expected
+    assert start_time == trace.start_time
+    assert duration == trace.root.end_time - trace.root.start_time
+
+
+@pytest.mark.parametrize("sharding", (False, True))
+def test_span_events_skipped_when_reservoir_full(transaction_node, monkeypatch, sharding):
+    @override_generic_settings(
+        settings,
+        {
+            "developer_mode": True,
+            "license_key": "**NOT A LICENSE KEY**",
+            "feature_flag": set(),
+            "distributed_tracing.enabled": True,
+            "event_harvest_config.harvest_limits.span_event_data": 102,
+            "stats_engine.sharding.enabled": sharding,
+        },
+    )
+    def _test():
+        app = Application("Python Agent Test (Harvest Loop)")
+        app.connect_to_data_collector(None)
+
+        span_events = TransactionNode.span_events
+        calls = []
+
+        def _span_events(self, *args, **kwargs):
+            calls.append(self.priority)
+            return span_events(self, *args, **kwargs)
+
+        monkeypatch.setattr(TransactionNode, "span_events", _span_events)
+
+        # The first transaction fills the reservoir, so the spans for a
+        # second with the same priority would all be discarded.
+        app.record_transaction(transaction_node)
+        app.record_transaction(transaction_node)
+        app.record_transaction(transaction_node._replace(priority=2.0))
+
+        assert calls == [1.0, 2.0]
+
+        with app._stats_lock:
+            app._merge_stats_shards()
+
+        span_events = app._stats_engine.span_events
+        assert span_events.num_seen == 3 * 102
+        assert span_events.num_samples == 102
+        assert all(intrinsics["priority"] == 2.0 for intrinsics, _, _ in span_events)
+
+    _test()
+
+
+@pytest.mark.parametrize("sharding", (False, True))
+def test_events_skipped_when_reservoir_full(transaction_node, monkeypatch, sharding):
+    @override_generic_settings(
+        settings,
+        {
+            "developer_mode": True,
+            "license_key": "**NOT A LICENSE KEY**",
+            "feature_flag": set(),
+            "distributed_tracing.enabled": True,
+            "event_harvest_config.harvest_limits.analytic_event_data": 1,
+            "event_harvest_config.harvest_limits.error_event_data": 101,
+            "stats_engine.sharding.enabled": sharding,
+        },
+    )
+    def _test():
+        app = Application("Python Agent Test (Harvest Loop)")
+        app.connect_to_data_collector(None)
+
+        transaction_event = TransactionNode.transaction_event
+        error_events = TransactionNode.error_events
+        calls = []
+
+        def _transaction_event(self, *args, **kwargs):
+            calls.append(("transaction_event", self.priority))
+            return transaction_event(self, *args, **kwargs)
+
+        def _error_events(self, *args, **kwargs):
+            calls.append(("error_events", self.priority))
+            return error_events(self, *args, **kwargs)
+
+        monkeypatch.setattr(TransactionNode, "transaction_event", _transaction_event)
+        monkeypatch.setattr(TransactionNode, "error_events", _error_events)
+
+        # The first transaction fills the reservoirs, so the events for a
+        # second with the same priority would all be discarded.
+        app.record_transaction(transaction_node)
+        app.record_transaction(transaction_node)
+        app.record_transaction(transaction_node._replace(priority=2.0))
+
+        assert calls == [
+            ("error_events", 1.0),
+            ("transaction_event", 1.0),
+            ("error_events", 2.0),
+            ("transaction_event", 2.0),
+        ]
+
+        with app._stats_lock:
+            app._merge_stats_shards()
+
+        transaction_events = app._stats_engine.transaction_events
+        assert transaction_events.num_seen == 3
+        assert [priority for priority, _, _ in transaction_events.pq] == [2.0]
+
+        error_events = app._stats_engine.error_events
+        assert error_events.num_seen == 3 * 101
+        assert error_events.num_samples == 101
+        assert all(priority == 2.0 for priority, _, _ in error_events.pq)
+
+    _test()
+
+
 @pytest.mark.parametrize(
     "harvest_name, event_name",
     [
@@ -909,7 +1204,9 @@ def test_default_events_harvested(allowlist_event):
     num_seen = 0 if (allowlist_event != "span_event_data") else 1
     assert app._stats_engine.span_events.num_seen == num_seen
 
-    assert app._stats_engine.metrics_count() == 4
+    # Output bytes and duration supportability metrics for the
+    # metric_data and get_agent_commands calls
+    assert app._stats_engine.metrics_count() == 6
 
 
 @failing_endpoint("analytic_event_data")
@@ -996,3 +1293,44 @@ def test_get_agent_commands_raises():
     app.connect_to_data_collector(None)
     with pytest.raises(RetryDataForRequest):
         app.process_agent_commands()
+
+
+@failing_endpoint("span_event_data")
+@override_generic_settings(
+    settings,
+    {
+        "developer_mode": True,
+        "license_key": "**NOT A LICENSE KEY**",
+        "distributed_tracing.enabled": True,
+        "application_logging.forwarding.enabled": True,
+        "harvest_pipeline.enabled": True,
+        "harvest_pipeline.max_workers": 4,
+    },
+)
+def test_harvest_pipeline_rollback():
+    app = Application("Python Agent Test (Harvest Loop)")
+    app.connect_to_data_collector(None)
+
+    app._stats_engine.transaction_events.add("transaction event")
+    app._stats_engine.error_events.add("error event")
+    app._stats_engine.custom_events.add("custom event")
+    app._stats_engine.log_events.add(LogEventNode(1653609717, "WARNING", "A", {}))
+    app._stats_engine.span_events.add("span event")
+    app._stats_engine.record_custom_metric("Custom/test_harvest_pipeline_rollback", 1)
+
+    app.harvest()
+
+    # All endpoints are attempted concurrently, so only the data for the
+    # failed send is rolled back, along with the metric data which is
+    # not sent when any other send fails.
+    assert app._stats_engine.transaction_events.num_seen == 0
+    assert app._stats_engine.error_events.num_seen == 0
+    assert app._stats_engine.custom_events.num_seen == 0
+    assert app._stats_engine.log_events.num_seen == 0
+    assert app._stats_engine.span_events.num_seen == 1
+    assert ("Custom/test_harvest_pipeline_rollback", "") in app._stats_engine.stats_table
+
+    stats_table = app._stats_engine.stats_table
+    for method in ("analytic_event_data", "error_event_data", "custom_event_data", "log_event_data"):
+        assert ("Supportability/Python/Collector/%s/Duration" % method, "") in stats_table
+    assert ("Supportability/Python/Collector/metric_data/Duration", "") not in stats_table
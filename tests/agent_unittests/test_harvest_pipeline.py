@@ -0,0 +1,108 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from newrelic.core.harvest_pipeline import HarvestPipeline
+from newrelic.core.internal_metrics import internal_metric
+from newrelic.core.stats_engine import CustomMetrics
+from newrelic.network.exceptions import (
+    DiscardDataForRequest,
+    ForceAgentRestart,
+    RetryDataForRequest,
+)
+
+
+def _succeed(name, sent):
+    sent.append(name)
+    internal_metric("Supportability/Test/%s" % name, 1)
+
+
+def _fail(exc):
+    raise exc()
+
+
+def test_sequential_send_aborts_on_failure():
+    sent = []
+    succeeded = []
+    pipeline = HarvestPipeline(CustomMetrics())
+
+    pipeline.send(_succeed, ("a", sent), lambda: succeeded.append("a"))
+    pipeline.send(_fail, (RetryDataForRequest,), lambda: succeeded.append("b"))
+    pipeline.send(_succeed, ("c", sent), lambda: succeeded.append("c"))
+
+    with pytest.raises(RetryDataForRequest):
+        pipeline.flush()
+
+    assert sent == ["a"]
+    assert succeeded == ["a"]
+
+
+def test_concurrent_send_attempts_all():
+    internal_metrics = CustomMetrics()
+    sent = []
+    succeeded = []
+    threads = set()
+    pipeline = HarvestPipeline(internal_metrics, max_workers=4)
+
+    def _on_success(name):
+        threads.add(threading.current_thread())
+        succeeded.append(name)
+
+    pipeline.send(_succeed, ("a", sent), lambda: _on_success("a"))
+    pipeline.send(_fail, (RetryDataForRequest,), lambda: _on_success("b"))
+    pipeline.send(_succeed, ("c", sent), lambda: _on_success("c"))
+
+    with pytest.raises(RetryDataForRequest):
+        pipeline.flush()
+
+    assert sorted(sent) == ["a", "c"]
+
+    # Callbacks are only made for successful sends, in the order queued,
+    # on the thread doing the flush.
+    assert succeeded == ["a", "c"]
+    assert threads == {threading.current_thread()}
+
+    # Internal metrics recorded by the workers are merged in
+    assert "Supportability/Test/a" in internal_metrics
+    assert "Supportability/Test/c" in internal_metrics
+
+
+@pytest.mark.parametrize(
+    "exceptions,expected",
+    (
+        ((DiscardDataForRequest, RetryDataForRequest), DiscardDataForRequest),
+        ((RetryDataForRequest, ForceAgentRestart), ForceAgentRestart),
+    ),
+)
+def test_concurrent_send_failure_precedence(exceptions, expected):
+    pipeline = HarvestPipeline(CustomMetrics(), max_workers=2)
+    for exc in exceptions:
+        pipeline.send(_fail, (exc,))
+
+    with pytest.raises(expected):
+        pipeline.flush()
+
+
+def test_flush_clears_queue():
+    sent = []
+    pipeline = HarvestPipeline(CustomMetrics(), max_workers=2)
+    pipeline.send(_succeed, ("a", sent))
+    pipeline.send(_succeed, ("b", sent))
+    pipeline.flush()
+    pipeline.flush()
+
+    assert sorted(sent) == ["a", "b"]
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import sys
+import threading
+import time
 
 import newrelic.api.import_hook as import_hook
 import newrelic.packages.six as six
@@ -63,6 +65,187 @@ def test_import_hook_finder(monkeypatch):
     assert module is not None
 
 
+class LoadedModuleSpec(object):
+    # The import system marks the spec of a module once it has finished
+    # executing the module.
+    _initializing = False
+
+
+def loaded_module(name):
+    module = type(sys)(name)
+    module.__spec__ = LoadedModuleSpec()
+    return module
+
+
+def test_lazy_import_hooks(monkeypatch):
+    """
+    This asserts that import hooks registered lazily are only registered
+    once the module they are for is looked for, and only the once.
+    """
+    finder = import_hook.ImportHookFinder()
+
+    monkeypatch.setattr(import_hook, "_import_hooks", {})
+    monkeypatch.setattr(import_hook, "_lazy_import_hooks", [])
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+    registered = []
+
+    def register(name, module, function):
+        registered.append((name, module, function))
+        import_hook._import_hooks[name] = [hook]
+
+    import_hook.register_lazy_import_hooks({"colorsys": ("hook_module", "instrument")}, register)
+
+    # Finding a module without a lazy import hook registers nothing.
+    assert finder.find_spec("newrelic") is None
+    assert registered == []
+
+    # Finding the module registers the hook, which is then used.
+    assert finder.find_spec("colorsys") is not None
+    assert registered == [("colorsys", "hook_module", "instrument")]
+
+    finder.find_spec("colorsys")
+    assert len(registered) == 1
+
+
+def test_lazy_import_hooks_loaded_elsewhere(monkeypatch):
+    """
+    This asserts that import hooks registered lazily for a module added to
+    sys.modules without going through our finder are registered, and
+    called, once the finder is next used.
+    """
+    finder = import_hook.ImportHookFinder()
+
+    monkeypatch.setattr(import_hook, "_import_hooks", {})
+    monkeypatch.setattr(import_hook, "_pending_import_hooks", set())
+    monkeypatch.setattr(import_hook, "_lazy_import_hooks", [])
+
+    called = []
+
+    def register(name, function):
+        import_hook.register_import_hook(name, function)
+
+    import_hook.register_lazy_import_hooks({"_test_lazy_loaded_elsewhere": (called.append,)}, register)
+
+    module = loaded_module("_test_lazy_loaded_elsewhere")
+    monkeypatch.setitem(sys.modules, "_test_lazy_loaded_elsewhere", module)
+
+    finder.find_module("module_does_not_exist")
+    assert called == [module]
+    assert import_hook._lazy_import_hooks[0][0] == {}
+
+
+@pytest.mark.skipif(six.PY2, reason="Python 2 has no find_spec()")
+def test_import_hook_finder_find_spec(monkeypatch):
+    """
+    This asserts that ImportHookFinder.find_spec finds the spec using the
+    finders following it in sys.meta_path without calling back into the
+    import system, and chains our loader onto the loader found.
+    """
+    finder = import_hook.ImportHookFinder()
+
+    monkeypatch.setattr(import_hook, "_import_hooks", {"colorsys": [hook]})
+    monkeypatch.setattr(sys, "meta_path", [finder] + [f for f in sys.meta_path if f.__class__ is not finder.__class__])
+
+    def find_spec(*args, **kwargs):
+        raise AssertionError("find_spec() called back into import.")
+
+    monkeypatch.setattr(import_hook, "find_spec", find_spec)
+
+    spec = finder.find_spec("colorsys")
+    assert spec.name == "colorsys"
+    assert isinstance(spec.loader, import_hook._ImportHookChainedLoader)
+
+
+def test_import_hook_loaded_elsewhere(monkeypatch):
+    """
+    This asserts that import hooks are called for a module added to
+    sys.modules without going through our loader, once the finder is
+    next used.
+    """
+    finder = import_hook.ImportHookFinder()
+
+    monkeypatch.setattr(import_hook, "_import_hooks", {})
+    monkeypatch.setattr(import_hook, "_pending_import_hooks", set())
+
+    called = []
+
+    import_hook.register_import_hook("_test_loaded_elsewhere", called.append)
+    assert called == []
+
+    module = loaded_module("_test_loaded_elsewhere")
+    monkeypatch.setitem(sys.modules, "_test_loaded_elsewhere", module)
+
+    finder.find_module("module_does_not_exist")
+    assert called == [module]
+    assert import_hook._pending_import_hooks == set()
+
+
+@pytest.mark.parametrize(
+    "spec", [None, type("ModuleSpec", (object,), {"_initializing": True})()], ids=["no_spec", "initializing"]
+)
+def test_import_hook_loaded_elsewhere_not_finished(monkeypatch, spec):
+    """
+    This asserts that import hooks are not called for a module added to
+    sys.modules without going through our loader until the module has
+    finished being executed. A module without a spec, as on Python 2, is
+    never known to have finished, so is left for our loader.
+    """
+    finder = import_hook.ImportHookFinder()
+
+    monkeypatch.setattr(import_hook, "_import_hooks", {})
+    monkeypatch.setattr(import_hook, "_pending_import_hooks", set())
+
+    called = []
+
+    import_hook.register_import_hook("_test_loaded_elsewhere", called.append)
+
+    module = type(sys)("_test_loaded_elsewhere")
+    if spec is not None:
+        module.__spec__ = spec
+    monkeypatch.setitem(sys.modules, "_test_loaded_elsewhere", module)
+
+    finder.find_module("module_does_not_exist")
+    assert called == []
+    assert import_hook._pending_import_hooks == {"_test_loaded_elsewhere"}
+
+
+class SlowImportHooks(dict):
+    def get(self, *args):
+        # Widens the window in which two threads could both see the
+        # import hooks for a module as pending.
+        value = dict.get(self, *args)
+        time.sleep(0.01)
+        return value
+
+
+def test_import_hook_loaded_elsewhere_threads(monkeypatch):
+    """
+    This asserts that import hooks for a module loaded without going
+    through our loader are called only once when several threads notice
+    it at the same time.
+    """
+    monkeypatch.setattr(import_hook, "_import_hooks", SlowImportHooks())
+    monkeypatch.setattr(import_hook, "_pending_import_hooks", set())
+
+    called = []
+
+    import_hook.register_import_hook("_test_loaded_elsewhere", called.append)
+
+    module = loaded_module("_test_loaded_elsewhere")
+    monkeypatch.setitem(sys.modules, "_test_loaded_elsewhere", module)
+
+    threads = [threading.Thread(target=import_hook._notify_loaded_import_hooks) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert called == [module]
+
+
 @pytest.mark.parametrize("input,expected", [
     ("*", {"run", "A.run", "B.run"}),
     ("NotFound.*", set()),
@@ -0,0 +1,103 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+
+import pytest
+
+from newrelic.core.config import finalize_application_settings
+from newrelic.core.function_node import FunctionNode
+from newrelic.core.message_node import MessageNode
+from newrelic.core.node_mixin import walk_time_metrics
+
+
+class Root(object):
+    path = "OtherTransaction/Function/main"
+    type = "OtherTransaction"
+
+
+def function_node(name, children=()):
+    return FunctionNode(
+        group="Function",
+        name=name,
+        children=list(children),
+        start_time=0.0,
+        end_time=1.0,
+        duration=1.0,
+        exclusive=1.0,
+        label=None,
+        params=None,
+        rollup=None,
+        guid=name,
+        agent_attributes={},
+        user_attributes={},
+    )
+
+
+def message_node(name, children=()):
+    return MessageNode(
+        library="Library",
+        operation="Produce",
+        children=list(children),
+        start_time=0.0,
+        end_time=1.0,
+        duration=1.0,
+        exclusive=1.0,
+        destination_name=name,
+        destination_type="Queue",
+        params={},
+        guid=name,
+        agent_attributes={},
+        user_attributes={},
+    )
+
+
+def deep_tree(depth):
+    node = function_node("deep%d" % depth)
+    for level in reversed(range(depth)):
+        node = function_node("deep%d" % level, [node])
+    return node
+
+
+def test_walk_time_metrics_order():
+    tree = [
+        function_node("a", [function_node("b", [function_node("c")]), function_node("d")]),
+        function_node("e"),
+    ]
+
+    names = [metric.name for metric in walk_time_metrics(tree, None, Root(), None) if not metric.scope]
+
+    assert names == ["Function/a", "Function/b", "Function/c", "Function/d", "Function/e"]
+
+
+def test_span_events_parent_ids():
+    settings = finalize_application_settings({})
+    tree = function_node("a", [function_node("b", [function_node("c")]), message_node("d")])
+
+    events = [(intrinsics["guid"], intrinsics.get("parentId")) for intrinsics, _, _ in tree.span_events(settings)]
+
+    assert events == [("a", None), ("b", "a"), ("c", "b"), ("d", "a")]
+
+
+@pytest.mark.parametrize("method", ("span_events", "time_metrics"))
+def test_deep_tree_not_limited_by_recursion(method):
+    depth = sys.getrecursionlimit() + 100
+    tree = deep_tree(depth)
+
+    if method == "span_events":
+        results = list(tree.span_events(finalize_application_settings({})))
+        assert len(results) == depth + 1
+    else:
+        results = list(tree.time_metrics(None, Root(), None))
+        assert len(results) == 2 * (depth + 1)
@@ -0,0 +1,80 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from newrelic.core.rules_engine import RulesEngine
+
+_RULES = [
+    {
+        "match_expression": r".*\.(css|gif|ico|jpe?g|js|png|swf)$",
+        "replacement": r"/*.\1",
+        "eval_order": 1000,
+        "terminate_chain": True,
+    },
+    {
+        "match_expression": r"^[0-9][0-9a-f_,.-]*$",
+        "replacement": "*",
+        "eval_order": 1001,
+        "each_segment": True,
+    },
+    {
+        "match_expression": r"^/health$",
+        "replacement": "/health",
+        "eval_order": 1,
+        "ignore": True,
+    },
+]
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    (
+        ("/static/site.css", ("/*.css", False)),
+        ("/users/1234/profile", ("/users/*/profile", False)),
+        ("/users/1234/profile/", ("/users/*/profile/", False)),
+        ("/health", ("/health", True)),
+        ("/users/me/profile", ("/users/me/profile", False)),
+        (b"/users/1234", (u"/users/*", False)),
+    ),
+)
+def test_rules_engine_normalize(name, expected):
+    engine = RulesEngine(_RULES)
+
+    assert engine.normalize(name) == expected
+
+    # The second call is served from the remembered results.
+
+    assert engine.normalize(name) == expected
+
+
+def test_rules_engine_uncombinable_rules():
+    # A back reference in an expression cannot be combined with the
+    # expressions for other rules, so the rules are applied in turn.
+
+    rules = _RULES + [{"match_expression": r"/(\w+)/\1$", "replacement": "/twice", "eval_order": 2}]
+    engine = RulesEngine(rules)
+
+    assert engine.normalize("/users/users") == ("/twice", False)
+    assert engine.normalize("/users/admin") == ("/users/admin", False)
+
+
+def test_rules_engine_memo_bounded(monkeypatch):
+    monkeypatch.setattr(RulesEngine, "MEMO_MAXIMUM", 5)
+    engine = RulesEngine(_RULES)
+
+    for i in range(20):
+        assert engine.normalize("/users/%d" % i) == ("/users/*", False)
+
+    assert len(engine._RulesEngine__memo) <= 5
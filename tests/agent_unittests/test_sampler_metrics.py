@@ -22,6 +22,8 @@ from testing_support.fixtures import override_generic_settings
 from newrelic.core.config import global_settings
 from newrelic.packages import six
 from newrelic.samplers.cpu_usage import cpu_usage_data_source
+from newrelic.samplers.data_sampler import DataSampler, SampleBuffer
+from newrelic.samplers.decorators import data_source_generator
 from newrelic.samplers.gc_data import garbage_collector_data_source
 from newrelic.samplers.memory_usage import memory_usage_data_source
 
@@ -133,6 +135,18 @@ def test_gc_metrics_config(gc_data_source, enabled):
     _test()
 
 
+@pytest.mark.parametrize("sample_size,expected", ((0, {int: 9000, str: 1000}), (100, {int: 9000, str: 1000})))
+def test_gc_object_type_counts(gc_data_source, monkeypatch, sample_size, expected):
+    objects = [1] * 9000 + ["a"] * 1000
+    monkeypatch.setattr(gc, "get_objects", lambda: list(objects))
+
+    @override_generic_settings(settings, {"gc_runtime_metrics.top_object_sample_size": sample_size})
+    def _test():
+        assert gc_data_source.object_type_counts() == expected
+
+    _test()
+
+
 EXPECTED_CPU_METRICS = (
     "CPU/User Time",
     "CPU/User/Utilization",
@@ -163,3 +177,51 @@ def test_memory_metrics_collection(memory_data_source):
 
     for metric in EXPECTED_MEMORY_METRICS:
         assert metric in metrics_table
+
+
+def test_sample_buffer():
+    buffer = SampleBuffer(4)
+
+    for value in (5.0, 1.0, 9.0, 3.0, 7.0, 2.0):
+        buffer.append(value)
+
+    # The summary covers all values, while percentiles are taken from
+    # the most recent values retained in the buffer.
+
+    assert buffer.summary() == dict(count=6, total=27.0, min=1.0, max=9.0, sum_of_squares=169.0)
+    assert buffer.percentiles((0, 50, 100)) == [(0, 2.0), (50, 7.0), (100, 9.0)]
+
+    buffer.reset()
+    assert buffer.count == 0
+    assert buffer.percentiles((50,)) == []
+
+
+def test_high_frequency_data_sampler():
+    values = iter(range(1, 11))
+
+    @data_source_generator(name="Counter", high_frequency=True)
+    def counter_data_source():
+        yield ("Counter/Value", float(next(values)))
+
+    @override_generic_settings(settings, {"high_frequency_sampling.buffer_size": 8})
+    def _test():
+        data_sampler = DataSampler("App", counter_data_source, None, None)
+        data_sampler.start()
+
+        assert data_sampler.high_frequency
+
+        for _ in range(9):
+            data_sampler.sample()
+
+        metrics = dict(data_sampler.metrics())
+
+        assert metrics["Counter/Value"] == dict(count=9, total=45.0, min=1.0, max=9.0, sum_of_squares=285.0)
+        assert metrics["Counter/Value/Percentile/50"] == 6.0
+        assert metrics["Counter/Value/Percentile/99"] == 9.0
+
+        # Without values collected since the last harvest the data
+        # source is called directly.
+
+        assert list(data_sampler.metrics()) == [("Counter/Value", 10.0)]
+
+    _test()
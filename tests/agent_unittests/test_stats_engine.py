@@ -0,0 +1,238 @@
+# Copyright 2010 New Relic, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+import pytest
+
+from newrelic.core.metric import ApdexMetric
+from newrelic.core.stats_engine import (
+    ApdexStats,
+    CountStats,
+    MetricStatsTable,
+    SampledDataSet,
+    TimeStats,
+)
+
+
+def test_metric_stats_table_time_metrics():
+    table = MetricStatsTable()
+    expected = TimeStats(1, 2.0, 1.0, 2.0, 2.0, 4.0)
+
+    table.record_time_metric(("Function/a", ""), 2.0, 1.0)
+    table.record_time_metric(("Function/a", ""), 3.0, 3.0)
+    expected.merge_raw_time_metric(3.0, 3.0)
+
+    stats = table[("Function/a", "")]
+    assert type(stats) is TimeStats
+    assert stats == expected
+    assert stats.call_count == 2
+    assert isinstance(stats.call_count, int)
+
+
+def test_metric_stats_table_apdex_metrics():
+    table = MetricStatsTable()
+    expected = ApdexStats(apdex_t=0.5)
+
+    for metric in (
+        ApdexMetric("Apdex", satisfying=1, tolerating=0, frustrating=0, apdex_t=0.5),
+        ApdexMetric("Apdex", satisfying=0, tolerating=1, frustrating=0, apdex_t=0.25),
+    ):
+        table.record_apdex_metric(("Apdex", ""), metric)
+        expected.merge_apdex_metric(metric)
+
+    stats = table[("Apdex", "")]
+    assert type(stats) is ApdexStats
+    assert stats == expected
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    (
+        (TimeStats(1, -5, -5, -5, -5, 25), TimeStats(1, 2, 2, 2, 2, 4)),
+        (CountStats(call_count=3), CountStats(call_count=4)),
+        (ApdexStats(1, 2, 3, 0.5), ApdexStats(0, 1, 0, 0.25)),
+    ),
+)
+def test_metric_stats_table_merge_stats(first, second):
+    table = MetricStatsTable()
+    expected = type(first)()
+    expected[:] = first
+
+    table.merge_stats(("Custom/a", ""), first)
+    table.merge_stats(("Custom/a", ""), second)
+    expected.merge_stats(second)
+
+    stats = table[("Custom/a", "")]
+    assert type(stats) is type(first)
+    assert stats == expected
+
+
+def test_metric_stats_table_merge_table():
+    table = MetricStatsTable()
+    table.record_time_metric(("Function/a", ""), 1.0, 1.0)
+
+    other = MetricStatsTable()
+    other.record_time_metric(("Function/a", ""), 2.0, 2.0)
+    other.merge_stats(("Custom/b", ""), CountStats(call_count=2))
+
+    table.merge_table(other)
+
+    assert len(table) == 2
+    assert table[("Function/a", "")] == [2, 3.0, 3.0, 1.0, 2.0, 5.0]
+    assert table[("Custom/b", "")] == [2, 0, 0, 0, 0, 0]
+
+    # Merging into an empty table copies the other table, which must not
+    # then be affected by later updates.
+
+    empty = MetricStatsTable()
+    empty.merge_table(other)
+    empty.record_time_metric(("Function/a", ""), 2.0, 2.0)
+
+    assert other[("Function/a", "")].call_count == 1
+    assert empty[("Function/a", "")].call_count == 2
+
+
+def test_metric_stats_table_normalize():
+    table = MetricStatsTable()
+    table.record_time_metric(("Function/a", ""), 1.0, 1.0)
+    table.record_time_metric(("Function/b", ""), 2.0, 2.0)
+    table.record_time_metric(("Function/ignore", ""), 2.0, 2.0)
+
+    def normalizer(name):
+        if name == "Function/ignore":
+            return name, True
+        return "Function/*", False
+
+    normalized = table.normalize(normalizer)
+
+    assert list(normalized.keys()) == [("Function/*", "")]
+    assert normalized[("Function/*", "")] == [2, 3.0, 3.0, 1.0, 2.0, 5.0]
+
+
+def test_metric_stats_table_mapping_interface():
+    table = MetricStatsTable()
+    table.record_time_metric(("Function/a", "Scope"), 1.0, 1.0)
+
+    assert ("Function/a", "Scope") in table
+    assert ("Function/a", "") not in table
+    assert table.get(("Function/a", "")) is None
+    assert list(table) == [("Function/a", "Scope")]
+    assert dict(table.items()) == {("Function/a", "Scope"): [1, 1.0, 1.0, 1.0, 1.0, 1.0]}
+
+    with pytest.raises(KeyError):
+        table[("Function/a", "")]
+
+
+def _sequential_merge(data_set, other_data_set, priority=-1):
+    # Reference implementation merging each sample in turn through add().
+    for original_priority, _, sample in other_data_set.pq:
+        data_set.add(sample, max(priority, original_priority))
+    data_set.num_seen += other_data_set.num_seen - other_data_set.num_samples
+
+
+def _populate(data_set, count, priorities):
+    for i in range(count):
+        data_set.add("sample-%d" % i, next(priorities))
+    return data_set
+
+
+@pytest.mark.parametrize(
+    "capacity,existing,merged",
+    (
+        (10, 0, 5),
+        (10, 3, 7),
+        (10, 5, 20),
+        (10, 10, 1),
+        (10, 10, 30),
+        (100, 100, 2),
+        (100, 100, 100),
+    ),
+)
+def test_sampled_data_set_merge(capacity, existing, merged):
+    rng = random.Random(capacity + existing + merged)
+    priorities = iter(lambda: rng.random(), None)
+
+    other = _populate(SampledDataSet(capacity=max(merged, 1)), merged, priorities)
+    other.num_seen += 3
+
+    data_set = _populate(SampledDataSet(capacity=capacity), existing, priorities)
+    expected = SampledDataSet(capacity=capacity)
+    expected.pq = list(data_set.pq)
+    expected.heap = data_set.heap
+    expected.num_seen = data_set.num_seen
+
+    data_set.merge(other)
+    _sequential_merge(expected, other)
+
+    assert data_set.num_seen == expected.num_seen == existing + merged + 3
+    assert data_set.num_samples == expected.num_samples == min(capacity, existing + merged)
+    assert sorted(data_set.pq) == sorted(expected.pq)
+    assert data_set.heap == (data_set.num_samples == capacity)
+
+
+def test_sampled_data_set_merge_equal_priorities():
+    # Spans from a single transaction share its priority. Where more are
+    # merged than can be held, those seen first are kept.
+    other = SampledDataSet(capacity=20)
+    for i in range(20):
+        other.add(i, priority=1.0)
+
+    data_set = SampledDataSet(capacity=10)
+    data_set.merge(other)
+
+    assert sorted(data_set) == list(range(10))
+
+
+def test_sampled_data_set_merge_equal_priorities_into_full():
+    data_set = SampledDataSet(capacity=10)
+    for i in range(10):
+        data_set.add(i, priority=0.5)
+
+    other = SampledDataSet(capacity=20)
+    for i in range(10, 30):
+        other.add(i, priority=0.5)
+
+    data_set.merge(other)
+
+    assert sorted(data_set) == list(range(10))
+
+
+def test_sampled_data_set_merge_zero_capacity():
+    other = SampledDataSet(capacity=10)
+    for i in range(5):
+        other.add(i)
+
+    data_set = SampledDataSet(capacity=0)
+    data_set.merge(other)
+
+    assert data_set.num_seen == 5
+    assert data_set.num_samples == 0
+
+
+def test_sampled_data_set_add_after_merge_of_unsampled():
+    # Merging in events seen but not sampled must not stop the reservoir
+    # being capped when it does later fill up.
+    other = SampledDataSet(capacity=1)
+    for i in range(50):
+        other.add(i)
+
+    data_set = SampledDataSet(capacity=10)
+    data_set.merge(other)
+
+    for i in range(20):
+        data_set.add(i)
+
+    assert data_set.num_samples == 10
+    assert data_set.num_seen == 70
@@ -16,7 +16,13 @@ import threading
 
 import pytest
 
-from newrelic.core.trace_cache import TraceCache
+import newrelic.core.trace_cache as trace_cache_module
+from newrelic.core.trace_cache import ContextVarTraceCache, TraceCache
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
 
 _TEST_CONCURRENT_ITERATION_TC_SIZE = 20
 
@@ -127,3 +133,211 @@ def test_concurrent_iteration(iterate_trace_cache, change_weakref_dict_size):
     t2.join(timeout=1)
     assert not t1.is_alive(), "Thread failed to exit."
     assert not t2.is_alive(), "Thread failed to exit."
+
+
+class DummyGreenlet(object):
+    def __init__(self, parent=None):
+        self.parent = parent
+
+
+class DummyGreenletModule(object):
+    def __init__(self, current):
+        self.current = current
+
+    def getcurrent(self):
+        return self.current
+
+
+class DummyTask(object):
+    def __init__(self, loop=None):
+        self._loop = loop
+
+
+class DummyAsyncioModule(object):
+    def __init__(self, task):
+        self.task = task
+
+    def current_task(self):
+        return self.task
+
+
+def test_save_trace_in_thread(trace_cache):
+    trace = DummyTrace()
+    trace.root = None
+    trace.thread_id = trace_cache.current_thread_id()
+
+    trace_cache.save_trace(trace)
+
+    assert not trace_cache.in_coroutine(trace.thread_id)
+    assert trace._greenlet is None
+    assert not hasattr(trace, "_task")
+
+
+def test_save_trace_in_greenlet(trace_cache):
+    greenlet = DummyGreenlet(parent=DummyGreenlet())
+    trace_cache.greenlet = DummyGreenletModule(greenlet)
+
+    trace = DummyTrace()
+    trace.root = None
+    trace.thread_id = trace_cache.current_thread_id()
+
+    trace_cache.save_trace(trace)
+
+    assert trace.thread_id == id(greenlet)
+    assert trace_cache.in_coroutine(trace.thread_id)
+    assert trace._greenlet() is greenlet
+
+
+def test_save_trace_in_root_greenlet(trace_cache):
+    trace_cache.greenlet = DummyGreenletModule(DummyGreenlet())
+
+    trace = DummyTrace()
+    trace.root = None
+    trace.thread_id = trace_cache.current_thread_id()
+
+    trace_cache.save_trace(trace)
+
+    assert not trace_cache.in_coroutine(trace.thread_id)
+    assert trace._greenlet is None
+
+
+def test_save_trace_in_task(trace_cache):
+    task = DummyTask()
+    trace_cache.asyncio = DummyAsyncioModule(task)
+
+    trace = DummyTrace()
+    trace.root = None
+    trace.thread_id = trace_cache.current_thread_id()
+
+    trace_cache.save_trace(trace)
+
+    assert trace.thread_id == id(task)
+    assert trace_cache.in_coroutine(trace.thread_id)
+    assert trace._task is task
+
+
+class DummyNode(object):
+    def __init__(self, parent=None, root=None):
+        self.parent = parent
+        self.root = root or self
+        self.exited = False
+        self.thread_id = None
+
+
+@pytest.mark.skipif(contextvars is None, reason="contextvars not available")
+def test_context_var_trace_cache_save_and_pop():
+    cache = ContextVarTraceCache()
+    root = DummyNode()
+    trace = DummyNode(parent=root, root=root)
+
+    def _test():
+        root.thread_id = trace.thread_id = cache.current_thread_id()
+
+        cache.save_trace(root)
+        assert cache.current_trace() is root
+
+        cache.save_trace(trace)
+        assert cache.current_trace() is trace
+        assert cache[trace.thread_id] is trace
+
+        # A copy of the context, as for a task created now, starts out
+        # with the same current trace.
+        assert contextvars.copy_context().run(cache.current_trace) is trace
+
+        cache.pop_current(trace)
+        assert cache.current_trace() is root
+
+        cache.complete_root(root)
+        assert cache.current_trace() is None
+        assert trace.thread_id not in cache
+
+    contextvars.copy_context().run(_test)
+
+
+@pytest.mark.skipif(contextvars is None, reason="contextvars not available")
+def test_context_var_trace_cache_exited_elsewhere():
+    cache = ContextVarTraceCache()
+    root = DummyNode()
+    trace = DummyNode(parent=root, root=root)
+
+    def _test():
+        root.thread_id = trace.thread_id = cache.current_thread_id()
+        cache.save_trace(root)
+        cache.save_trace(trace)
+
+        # Exiting the trace in a different context leaves the current
+        # trace in this context to fall back to the parent.
+        trace.exited = True
+        contextvars.copy_context().run(cache.pop_current, trace)
+        assert cache.current_trace() is root
+
+        trace.parent = None
+        root.exited = True
+        assert cache.current_trace() is None
+
+    contextvars.copy_context().run(_test)
+
+
+@pytest.mark.skipif(contextvars is None, reason="contextvars not available")
+def test_context_var_trace_cache_set_current_trace():
+    cache = ContextVarTraceCache()
+    trace = DummyNode()
+
+    def _test():
+        thread_id = cache.current_thread_id()
+
+        cache.set_current_trace(thread_id, trace)
+        assert cache.current_trace() is trace
+        assert cache[thread_id] is trace
+
+        cache.set_current_trace(thread_id, None)
+        assert cache.current_trace() is None
+        assert thread_id not in cache
+
+    contextvars.copy_context().run(_test)
+
+
+@pytest.mark.parametrize(
+    "backend,cls",
+    (
+        ("weakref", TraceCache),
+        pytest.param(
+            "contextvars",
+            ContextVarTraceCache,
+            marks=pytest.mark.skipif(contextvars is None, reason="contextvars not available"),
+        ),
+        ("unknown", TraceCache),
+    ),
+)
+def test_use_trace_cache_backend(monkeypatch, backend, cls):
+    monkeypatch.setattr(trace_cache_module, "_trace_cache", TraceCache())
+
+    trace_cache_module.use_trace_cache_backend(backend)
+
+    assert type(trace_cache_module.trace_cache()) is cls
+
+
+def test_loop_trace_index(trace_cache):
+    loops = [object(), object()]
+    saved = []
+
+    for loop in loops:
+        trace_cache.asyncio = DummyAsyncioModule(DummyTask(loop))
+
+        parent = DummyNode()
+        trace = DummyNode(parent=parent, root=parent)
+        parent.thread_id = trace.thread_id = trace_cache.current_thread_id()
+
+        trace_cache.save_trace(parent)
+        trace_cache.save_trace(trace)
+        saved.append((parent, trace))
+
+    for loop, (parent, trace) in zip(loops, saved):
+        assert list(trace_cache._loop_traces[id(loop)].values()) == [trace]
+
+    # Exiting the trace restores the parent in the index for the loop.
+    parent, trace = saved[0]
+    trace_cache.pop_current(trace)
+
+    assert list(trace_cache._loop_traces[id(loops[0])].values()) == [parent]
+    assert list(trace_cache._loop_traces[id(loops[1])].values()) == [saved[1][1]]
@@ -34,7 +34,9 @@ from testing_support.validators.validate_transaction_metrics import (
 
 from newrelic.api.background_task import background_task
 from newrelic.common.object_names import callable_name
+from newrelic.common.object_wrapper import transient_function_wrapper
 from newrelic.common.package_version_utils import get_package_version
+from newrelic.core.graphql_node import GraphQLOperationNode
 
 
 graphql_version = get_package_version("graphql-core")
@@ -468,6 +470,74 @@ def test_field_resolver_metrics_and_attrs(target_application):
     _test()
 
 
+@dt_enabled
+def test_field_resolver_rollup(target_application):
+    framework, version, target_application, is_bg, schema_type, extra_spans = target_application
+
+    # Both books resolve their name field, which is rolled up into one node.
+    field_resolver_metrics = [("GraphQL/resolve/%s/name" % framework, 2)]
+    rollup_attrs = {
+        "graphql.field.name": "name",
+        "graphql.field.parentType": "Book",
+        "graphql.field.callCount": 2,
+    }
+
+    @override_application_settings(
+        {
+            "instrumentation.graphql.resolver_rollup.enabled": True,
+            "instrumentation.graphql.resolver_rollup.threshold": 60.0,
+        }
+    )
+    @validate_transaction_metrics(
+        "query/MyQuery/library",
+        "GraphQL",
+        scoped_metrics=field_resolver_metrics,
+        rollup_metrics=field_resolver_metrics + _graphql_base_rollup_metrics(framework, version, is_bg),
+        background_task=is_bg,
+    )
+    @validate_span_events(count=1, exact_agents=rollup_attrs)
+    @conditional_decorator(background_task(), is_bg)
+    def _test():
+        response = target_application("query MyQuery { library(index: 0) { branch, book { id, name } } }")
+
+    _test()
+
+
+def test_field_resolver_rollup_children_order(target_application):
+    framework, version, target_application, is_bg, schema_type, extra_spans = target_application
+
+    children_start_times = []
+
+    @transient_function_wrapper("newrelic.core.stats_engine", "StatsEngine.record_transaction")
+    def _capture_operation_children(wrapped, instance, args, kwargs):
+        def _walk(node):
+            if isinstance(node, GraphQLOperationNode):
+                children_start_times.append([child.start_time for child in node.children])
+            for child in node.children:
+                _walk(child)
+
+        _walk(args[0].root)
+        return wrapped(*args, **kwargs)
+
+    @override_application_settings(
+        {
+            "instrumentation.graphql.resolver_rollup.enabled": True,
+            "instrumentation.graphql.resolver_rollup.threshold": 60.0,
+        }
+    )
+    @_capture_operation_children
+    @conditional_decorator(background_task(), is_bg)
+    def _test():
+        response = target_application("query MyQuery { library(index: 0) { branch, book { id, name } } }")
+
+    _test()
+
+    # Rollup nodes are placed among the other children by start time.
+    assert children_start_times
+    for start_times in children_start_times:
+        assert start_times == sorted(start_times)
+
+
 _test_queries = [
     ("{ hello }", "{ hello }"),  # Basic query extraction
     ("{ error }", "{ error }"),  # Extract query on field error
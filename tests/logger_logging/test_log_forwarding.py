@@ -13,8 +13,14 @@
 # limitations under the License.
 
 import logging
+import time
 
-from testing_support.fixtures import reset_core_stats_engine
+from testing_support.fixtures import (
+    core_application_stats_engine,
+    override_application_settings,
+    override_generic_settings,
+    reset_core_stats_engine,
+)
 from testing_support.validators.validate_log_event_count import validate_log_event_count
 from testing_support.validators.validate_log_event_count_outside_transaction import (
     validate_log_event_count_outside_transaction,
@@ -27,6 +33,7 @@ from testing_support.validators.validate_log_events_outside_transaction import (
 from newrelic.api.background_task import background_task
 from newrelic.api.time_trace import current_trace
 from newrelic.api.transaction import current_transaction
+from newrelic.core.config import global_settings
 
 
 def set_trace_ids():
@@ -105,3 +112,81 @@ def test_logging_newrelic_logs_not_forwarded(logger):
         assert len(logger.caplog.records) == 1
 
     test()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def _captured_log_events(count):
+    # Deferred log events are recorded against the application by a
+    # background thread rather than against the transaction.
+    stats = core_application_stats_engine()
+    assert _wait_for(lambda: stats.log_events.num_samples >= count)
+    return sorted(stats.log_events, key=lambda event: event.message)
+
+
+_deferred_settings = {"application_logging.forwarding.deferred.enabled": True}
+
+
+@reset_core_stats_engine()
+@override_application_settings(_deferred_settings)
+def test_logging_deferred_inside_transaction(instrumented_logger):
+    @background_task()
+    def test():
+        exercise_logging(instrumented_logger)
+
+        # Only what was logged is kept on the transaction, and its
+        # sampling decision is not made by logging.
+        transaction = current_transaction()
+        assert transaction._log_events.num_samples == 0
+        assert transaction._deferred_log_events.num_samples == 3
+        assert transaction.priority is None
+
+        return transaction
+
+    transaction = test()
+
+    events = sorted(core_application_stats_engine().log_events, key=lambda event: event.message)
+
+    assert [event.message for event in events] == ["C", "D", "E"]
+    for event in events:
+        assert event.attributes["span.id"] == "abcdefgh"
+        assert event.attributes["trace.id"] == "abcdefgh12345678"
+        assert event.attributes["entity.name"] == "Python Agent Test (logger_logging)"
+        assert event.attributes["context.module"] == "test_log_forwarding"
+
+    # Log events are merged with the final priority of the transaction.
+    for entry in core_application_stats_engine().log_events.pq:
+        assert entry[0] >= transaction.priority
+
+
+@reset_core_stats_engine()
+@override_application_settings(_deferred_settings)
+def test_logging_deferred_inside_ignored_transaction(instrumented_logger):
+    @background_task()
+    def test():
+        exercise_logging(instrumented_logger)
+        current_transaction().ignore_transaction = True
+
+    test()
+
+    assert core_application_stats_engine().log_events.num_samples == 0
+
+
+@reset_core_stats_engine()
+@override_application_settings(_deferred_settings)
+@override_generic_settings(global_settings(), _deferred_settings)
+def test_logging_deferred_outside_transaction(instrumented_logger):
+    exercise_logging(instrumented_logger)
+
+    events = _captured_log_events(3)
+
+    assert [event.message for event in events] == ["C", "D", "E"]
+    for event in events:
+        assert "span.id" not in event.attributes
+        assert event.attributes["entity.name"] == "Python Agent Test (logger_logging)"
+        assert event.attributes["context.module"] == "test_log_forwarding"
@@ -65,6 +65,35 @@ def test_multiple_transactions(get_consumer_record, topic):
     _test()
 
 
+def test_consume_batch(topic, consumer, client_type, send_producer_message):
+    if client_type != "cimpl":
+        pytest.skip("Only the Consumer supports consume().")
+
+    custom_metrics = [
+        ("Message/Kafka/Topic/Named/%s/Received/Bytes" % topic, 1),
+        ("Message/Kafka/Topic/Named/%s/Received/Messages" % topic, 1),
+    ]
+
+    @validate_transaction_metrics(
+        "Named/%s" % topic,
+        group="Message/Kafka/Topic",
+        custom_metrics=custom_metrics,
+        background_task=True,
+    )
+    @validate_transaction_count(1)
+    def _test():
+        send_producer_message()
+        send_producer_message()
+
+        # Both records are received in one batch, in a single transaction.
+        records = consumer.consume(num_messages=2, timeout=10)
+        assert len(records) == 2
+
+        consumer.consume(num_messages=2, timeout=0.5)  # Exit the transaction.
+
+    _test()
+
+
 def test_custom_metrics_on_existing_transaction(get_consumer_record, topic):
     from confluent_kafka import __version__ as version
 